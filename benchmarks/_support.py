@@ -0,0 +1,242 @@
+"""Shared helpers for the offline benchmarks, also used by the tests.
+
+lambda.py cannot be imported with a plain import statement (``lambda`` is a
+keyword), so it is loaded from its path. The real OpenAI client is swapped for
+FakeLLMClient, which sleeps for a configurable latency and returns a canned
+extraction, so no network access or API key is needed. FakeLLMServer does the
+same over HTTP, for exercising the real client's timeouts and error handling.
+DynamoDB is served by moto; create_tables builds the tables inside a started
+mock_aws.
+"""
+import importlib.util
+import json
+import os
+import random
+import statistics
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+LAMBDA_PATH = Path(__file__).resolve().parent.parent / 'lambda.py'
+
+def load_lambda_module(**env):
+    """Load lambda.py as a module with benchmark-safe environment defaults"""
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('API_KEY', 'benchmark')
+    os.environ.update({key: str(value) for key, value in env.items()})
+    spec = importlib.util.spec_from_file_location('fills_lambda', LAMBDA_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def create_tables():
+    """Create the two tables in moto with the GSIs lambda.py queries"""
+    import boto3
+    client = boto3.client('dynamodb')
+    client.create_table(
+        TableName='FormTemplates',
+        KeySchema=[{'AttributeName': 'templateId', 'KeyType': 'HASH'}, {'AttributeName': 'userId', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': name, 'AttributeType': 'S'} for name in ('templateId', 'userId')],
+        GlobalSecondaryIndexes=[{
+            'IndexName': 'userIdIndex',
+            'KeySchema': [{'AttributeName': 'userId', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'}
+        }],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    client.create_table(
+        TableName='FilledForms',
+        KeySchema=[{'AttributeName': 'formId', 'KeyType': 'HASH'}, {'AttributeName': 'userId', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[
+            {'AttributeName': 'formId', 'AttributeType': 'S'},
+            {'AttributeName': 'userId', 'AttributeType': 'S'},
+            {'AttributeName': 'createdAt', 'AttributeType': 'N'},
+            {'AttributeName': 'templateSortKey', 'AttributeType': 'S'},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': 'userIdIndex',
+                'KeySchema': [{'AttributeName': 'userId', 'KeyType': 'HASH'}, {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}],
+                'Projection': {'ProjectionType': 'ALL'}
+            },
+            {
+                'IndexName': 'userTemplateIndex',
+                'KeySchema': [{'AttributeName': 'userId', 'KeyType': 'HASH'}, {'AttributeName': 'templateSortKey', 'KeyType': 'RANGE'}],
+                'Projection': {'ProjectionType': 'ALL'}
+            },
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+def create_search_index_table(table_name='FormSearchIndex'):
+    """Create the optional SEARCH_INDEX_TABLE in moto"""
+    import boto3
+    boto3.client('dynamodb').create_table(
+        TableName=table_name,
+        KeySchema=[{'AttributeName': 'userId', 'KeyType': 'HASH'}, {'AttributeName': 'termKey', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': name, 'AttributeType': 'S'} for name in ('userId', 'termKey')],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+class FakeLLMClient:
+    """Stand-in for the OpenAI client with latency proportional to prompt and output size
+
+    latency = base_ms + per_1k_input_chars_ms * input_chars / 1000 + per_output_field_ms * fields
+    """
+    def __init__(self, base_ms=300.0, per_1k_input_chars_ms=40.0, per_output_field_ms=15.0, fields=None):
+        self.base_ms = base_ms
+        self.per_1k_input_chars_ms = per_1k_input_chars_ms
+        self.per_output_field_ms = per_output_field_ms
+        self.fields = fields
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        input_chars = sum(len(message['content']) for message in kwargs['messages'])
+        fields = self.fields(kwargs) if callable(self.fields) else (self.fields or {})
+        delay_ms = (
+            self.base_ms
+            + self.per_1k_input_chars_ms * input_chars / 1000
+            + self.per_output_field_ms * len(fields)
+        )
+        time.sleep(delay_ms / 1000)
+        content = json.dumps({'fields': fields})
+        if kwargs.get('stream'):
+            return (
+                types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=content[start:start + 16]))])
+                for start in range(0, len(content), 16)
+            )
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=message)],
+            usage=types.SimpleNamespace(prompt_tokens=input_chars // 4, completion_tokens=len(content) // 4)
+        )
+
+class FakeLLMServer:
+    """Local HTTP server speaking the chat completions API, for the real OpenAI client
+
+    latency_ms() and failure_status() are called per request; failure_status returns
+    an HTTP status to fail with, or None to answer with a completion of `fields`.
+    Point the client at it with OPENAI_BASE_URL=server.base_url.
+    """
+    def __init__(self, latency_ms=lambda: 50.0, failure_status=lambda: None, fields=None):
+        self.latency_ms = latency_ms
+        self.failure_status = failure_status
+        self.fields = fields or {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                with fake.lock:
+                    fake.requests += 1
+                time.sleep(fake.latency_ms() / 1000)
+                status = fake.failure_status()
+                if status is not None:
+                    body = {'error': {'message': f"fake failure {status}", 'type': 'server_error'}}
+                else:
+                    content = json.dumps({'fields': fake.fields})
+                    body = {
+                        'id': 'chatcmpl-fake',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': 'fake',
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': content},
+                            'finish_reason': 'stop'
+                        }],
+                        'usage': {'prompt_tokens': 100, 'completion_tokens': len(content) // 4, 'total_tokens': 0}
+                    }
+                raw = json.dumps(body).encode()
+                try:
+                    self.send_response(status or 200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(raw)))
+                    self.end_headers()
+                    self.wfile.write(raw)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client timed out or a hedge won; nobody is listening any more
+                    pass
+
+        return Handler
+
+GENERAL_TEMPLATE_FIELDS = {
+    'patientInfo': {
+        'fullName': {'type': 'text', 'label': 'Full Name', 'required': True},
+        'age': {'type': 'number', 'label': 'Age', 'required': True},
+        'gender': {'type': 'text', 'label': 'Gender', 'required': True}
+    },
+    'vitalSigns': {
+        'temperature': {'type': 'text', 'label': 'Temperature', 'required': True},
+        'bloodPressure': {'type': 'text', 'label': 'Blood Pressure', 'required': True},
+        'heartRate': {'type': 'text', 'label': 'Heart Rate', 'required': True}
+    }
+}
+
+_SMALL_TALK = [
+    "Doctor: How have you been feeling since the last visit?",
+    "Patient: Mostly fine, a bit tired in the afternoons.",
+    "Doctor: Any changes in your sleep or appetite?",
+    "Patient: I have been sleeping about six hours a night.",
+    "Doctor: Are you still taking the medication as prescribed?",
+    "Patient: Yes, every morning with breakfast.",
+    "Doctor: Any chest pain, shortness of breath or dizziness?",
+    "Patient: No, nothing like that.",
+]
+
+def synthetic_transcript(minutes: int, seed: int = 7) -> str:
+    """Generate a doctor/patient transcript of roughly `minutes` of speech"""
+    rng = random.Random(seed)
+    lines = [
+        "Doctor: Can you tell me your full name?",
+        "Patient: My name is Jane Smith.",
+        "Doctor: And how old are you?",
+        "Patient: I am 54 years old.",
+    ]
+    # Roughly 150 spoken words a minute, ~10 words a line
+    for _ in range(minutes * 15):
+        lines.append(rng.choice(_SMALL_TALK))
+    lines.extend([
+        "Doctor: Your blood pressure today is 128 over 82.",
+        "Doctor: Heart rate 72, temperature 36.8.",
+    ])
+    return "\n".join(lines)
+
+def summarize_ms(samples):
+    """p50/p95/p99/mean of a list of millisecond samples"""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(percentile(50), 3),
+        'p95_ms': round(percentile(95), 3),
+        'p99_ms': round(percentile(99), 3),
+    }
@@ -0,0 +1,130 @@
+"""Cold-start cost of lambda.py: module import and first request per route.
+
+Every sample runs in a fresh interpreter, as a new Lambda container would:
+
+* import: time to import lambda.py, and which heavy modules it pulled in.
+* per route: the first lambda_handler call (clients built on demand) and a
+  second, warm call. DynamoDB is served in-process by moto, which itself
+  imports boto3 before the clock starts, so route timings cover client and
+  resource construction but not the boto3 import; that shows up under import.
+  The extraction route builds the real OpenAI client but answers from
+  FakeLLMClient, so no network access or API key is needed.
+
+Usage:
+    python benchmarks/cold_start.py [--runs 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from _support import FakeLLMClient, GENERAL_TEMPLATE_FIELDS, create_tables, load_lambda_module, summarize_ms
+
+HEAVY_MODULES = ['boto3', 'botocore', 'openai', 'pydantic']
+
+EXTRACTED_FIELDS = {
+    'patientInfo.fullName': {'value': 'Jane Smith', 'source_quote': 'My name is Jane Smith', 'confidence': 0.95},
+}
+
+ROUTES = {
+    'OPTIONS /forms': ('OPTIONS', '/forms', None),
+    'GET /templates': ('GET', '/templates', None),
+    'GET /forms': ('GET', '/forms', None),
+    'GET /forms/{id}': ('GET', '/forms/missing', None),
+    'POST /forms': ('POST', '/forms', {'templateCode': 'general', 'data': {'patientInfo': {'fullName': 'Jane Smith'}}}),
+    'POST /forms (extract)': ('POST', '/forms', {
+        'templateCode': 'general',
+        'templateFields': GENERAL_TEMPLATE_FIELDS,
+        'conversationText': 'Patient: My name is Jane Smith.'
+    }),
+}
+
+def build_event(method, path, body):
+    event = {
+        'rawPath': path,
+        'requestContext': {'http': {'method': method}, 'authorizer': {'lambda': {'userId': 'bench-user'}}}
+    }
+    if body is not None:
+        event['body'] = json.dumps(body)
+    return event
+
+def loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+def child_import():
+    started = time.perf_counter()
+    load_lambda_module(EXTRACTION_CACHE_ENABLED='false', AWS_ACCESS_KEY_ID='bench', AWS_SECRET_ACCESS_KEY='bench')
+    return {'init_ms': (time.perf_counter() - started) * 1000, 'modules': loaded_heavy_modules()}
+
+def child_route(route):
+    import os
+    os.environ.update({'AWS_DEFAULT_REGION': 'us-east-1', 'AWS_ACCESS_KEY_ID': 'bench', 'AWS_SECRET_ACCESS_KEY': 'bench'})
+    from moto import mock_aws
+    mock_aws().start()
+    create_tables()
+    preloaded = set(loaded_heavy_modules())
+
+    fills = load_lambda_module(EXTRACTION_CACHE_ENABLED='false')
+    fake = FakeLLMClient(base_ms=0, per_1k_input_chars_ms=0, per_output_field_ms=0, fields=EXTRACTED_FIELDS)
+    build_openai_client = fills.build_openai_client
+
+    def build_patched_client():
+        openai_client = build_openai_client()
+        openai_client.chat.completions.create = fake.create
+        return openai_client
+
+    fills.build_openai_client = build_patched_client
+    event = build_event(*ROUTES[route])
+
+    started = time.perf_counter()
+    response = fills.lambda_handler(event, None)
+    first_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    fills.lambda_handler(event, None)
+    warm_ms = (time.perf_counter() - started) * 1000
+    return {
+        'first_ms': first_ms,
+        'warm_ms': warm_ms,
+        'status': response['statusCode'],
+        'modules': [name for name in loaded_heavy_modules() if name not in preloaded]
+    }
+
+def run_child(*args):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', *args], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = child_import() if args.child[0] == 'import' else child_route(args.child[1])
+        print(json.dumps(result))
+        return
+
+    imports = [run_child('import') for _ in range(args.runs)]
+    results = {
+        'import': {
+            'init': summarize_ms([sample['init_ms'] for sample in imports]),
+            'modules': imports[0]['modules'],
+        },
+        'routes': {},
+    }
+    for route in ROUTES:
+        samples = [run_child('route', route) for _ in range(args.runs)]
+        results['routes'][route] = {
+            'status': samples[0]['status'],
+            'first_request': summarize_ms([sample['first_ms'] for sample in samples]),
+            'warm_request': summarize_ms([sample['warm_ms'] for sample in samples]),
+            'modules_loaded': samples[0]['modules'],
+        }
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Bulk export throughput and memory against paging GET /forms.
+
+Pulls --forms forms of one user three ways:
+
+* paging: list_filled_forms with ?view=full at the maximum page size, following
+  nextToken, the way analytics scripts page the API today.
+* export with one read: export_filled_forms with segments=1.
+* export with --segments parallel reads.
+
+Exports run in every available format and write to a LocalBlobStore in a temp
+directory. DynamoDB is FakeFormsClient: pre-serialized items served a page at a
+time, each call sleeping --read-latency-ms the way a 1 MB page from the real
+service takes tens of milliseconds. Moto is not used because its in-process
+table work holds the GIL and leaves parallel reads nothing to overlap.
+
+Reports forms per second from a plain run, and peak traced memory from a second
+run under tracemalloc (--memory-forms forms, since tracing is slow). Paging's
+peak grows with the form count while an export's stays flat.
+
+Usage:
+    python benchmarks/export.py [--forms 200000] [--memory-forms 20000] [--segments 8] [--read-latency-ms 30]
+"""
+import argparse
+import bisect
+import json
+import tempfile
+import time
+import tracemalloc
+
+from _support import GENERAL_TEMPLATE_FIELDS, load_lambda_module
+
+START_CREATED_AT = 1_700_000_000
+
+class FakeFormsClient:
+    """Serves FilledForms queries from memory, sorted by createdAt, with a fixed latency per call"""
+    def __init__(self, fills, count, latency_ms):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self.items = []
+        self.created = []
+        for index in range(count):
+            created_at = START_CREATED_AT + index * 60
+            self.created.append(created_at)
+            self.items.append(fills.serialize_item({
+                'formId': f"form-{index:07d}",
+                'userId': 'bench-user',
+                'templateCode': 'general',
+                'templateSortKey': fills.build_template_sort_key('general', created_at),
+                'data': {
+                    'patientInfo': {'fullName': f"Patient {index}", 'age': index % 90, 'gender': 'F'},
+                    'vitalSigns': {'temperature': '36.8', 'bloodPressure': '128/82', 'heartRate': str(60 + index % 40)},
+                },
+                'status': 'ready',
+                'createdAt': created_at,
+                'updatedAt': created_at,
+            }))
+        self.positions = {item['formId']['S']: index for index, item in enumerate(self.items)}
+
+    @staticmethod
+    def created_at(value):
+        """createdAt from a number, or from a templateCode#createdAt sort key"""
+        raw = value.get('N') or value['S'].rsplit('#', 1)[-1]
+        return int(raw)
+
+    def query(self, ScanIndexForward=True, Limit=None, ExclusiveStartKey=None, ExpressionAttributeValues=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        values = ExpressionAttributeValues or {}
+        low = bisect.bisect_left(self.created, self.created_at(values[':lo'])) if ':lo' in values else 0
+        high = bisect.bisect_right(self.created, self.created_at(values[':hi'])) if ':hi' in values else len(self.items)
+        if ExclusiveStartKey:
+            after = self.positions[ExclusiveStartKey['formId']['S']]
+            low, high = (max(low, after + 1), high) if ScanIndexForward else (low, min(high, after))
+        positions = range(low, high) if ScanIndexForward else range(high - 1, low - 1, -1)
+        page = list(positions[:Limit] if Limit else positions)
+        response = {'Items': [self.items[position] for position in page]}
+        if Limit and len(positions) > Limit:
+            last = self.items[page[-1]]
+            response['LastEvaluatedKey'] = {name: last[name] for name in ('formId', 'userId', 'createdAt')}
+        return response
+
+def page_all(fills):
+    items, token = [], None
+    while True:
+        page = fills.list_filled_forms('bench-user', limit=fills.MAX_PAGE_LIMIT, next_token=token, projection=None)
+        items.extend(page['items'])
+        token = page['nextToken']
+        if not token:
+            return len(items), None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--forms', type=int, default=200000)
+    parser.add_argument('--memory-forms', type=int, default=20000)
+    parser.add_argument('--segments', type=int, default=8)
+    parser.add_argument('--read-latency-ms', type=float, default=30)
+    args = parser.parse_args()
+
+    fills = load_lambda_module(METRICS_ENABLED='false')
+    fills.logger.setLevel('WARNING')
+    formats = ['ndjson', 'csv'] + (['parquet'] if fills.pyarrow is not None else [])
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        store = fills.LocalBlobStore(export_dir)
+
+        def export(export_format, segments):
+            result = fills.export_filled_forms(
+                'bench-user', export_format, f"bench.{export_format}", template_code='general',
+                template_fields=GENERAL_TEMPLATE_FIELDS, store=store, segments=segments
+            )
+            return result['count'], result['bytes']
+
+        runs = [('paging', lambda: page_all(fills))]
+        for export_format in formats:
+            for segments in (1, args.segments):
+                runs.append((
+                    f"{export_format}, segments={segments}",
+                    lambda export_format=export_format, segments=segments: export(export_format, segments)
+                ))
+
+        results = {'forms': args.forms, 'read_latency_ms': args.read_latency_ms, 'runs': {}}
+        fills.dynamodb_client = FakeFormsClient(fills, args.forms, args.read_latency_ms)
+        for name, run in runs:
+            fills.dynamodb_client.calls = 0
+            started = time.perf_counter()
+            count, size = run()
+            seconds = time.perf_counter() - started
+            results['runs'][name] = {
+                'forms': count,
+                'seconds': round(seconds, 2),
+                'forms_per_second': round(count / seconds),
+                'dynamodb_calls': fills.dynamodb_client.calls,
+                **({'output_mb': round(size / 1024 / 1024, 2)} if size is not None else {}),
+            }
+
+        # Peak memory in a separate, smaller pass: tracing slows Python code several times over
+        fills.dynamodb_client = FakeFormsClient(fills, args.memory_forms, 0)
+        for name, run in runs:
+            tracemalloc.start()
+            run()
+            results['runs'][name][f"peak_mb_at_{args.memory_forms}_forms"] = round(
+                tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1
+            )
+            tracemalloc.stop()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
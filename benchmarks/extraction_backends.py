@@ -0,0 +1,90 @@
+"""Extraction latency, LLM usage and accuracy per extraction backend.
+
+Runs extract_form_data over synthetic transcripts with each EXTRACTION_BACKEND:
+openai (every field to the model), routed (local rules first, the rest to the
+model) and local (rules only, no model). The model is FakeLLMClient, which
+answers only the fields it was asked for, so its latency and token counts shrink
+as fields are routed away from it. Accuracy is measured against the values the
+transcript actually states.
+
+Usage:
+    python benchmarks/extraction_backends.py [--minutes 5 30] [--runs 5]
+"""
+import argparse
+import json
+import time
+
+from _support import FakeLLMClient, GENERAL_TEMPLATE_FIELDS, load_lambda_module, summarize_ms, synthetic_transcript
+
+# What synthetic_transcript says, as the model would return it
+MODEL_FIELDS = {
+    'patientInfo.fullName': {'value': 'Jane Smith', 'source_quote': 'My name is Jane Smith', 'confidence': 0.95},
+    'patientInfo.age': {'value': 54, 'source_quote': 'I am 54 years old', 'confidence': 0.93},
+    'vitalSigns.bloodPressure': {'value': '128/82', 'source_quote': '128 over 82', 'confidence': 0.9},
+    'vitalSigns.heartRate': {'value': '72', 'source_quote': 'Heart rate 72', 'confidence': 0.9},
+    'vitalSigns.temperature': {'value': '36.8', 'source_quote': 'temperature 36.8', 'confidence': 0.9},
+}
+
+EXPECTED = {field_id: field['value'] for field_id, field in MODEL_FIELDS.items()}
+
+def requested_fields(request):
+    """Answer only the fields named in the prompt, as a real model would"""
+    prompt = request['messages'][-1]['content']
+    return {field_id: field for field_id, field in MODEL_FIELDS.items() if f"(ID: {field_id}," in prompt}
+
+def flatten(data, prefix=''):
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def run_backend(fills, backend, transcript, runs):
+    fills.extraction_backend = fills.EXTRACTION_BACKENDS[backend]()
+    fills.client = FakeLLMClient(fields=requested_fields)
+    fills.request_metrics.start('bench')
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        data = fills.extract_form_data(GENERAL_TEMPLATE_FIELDS, transcript)
+        samples.append((time.perf_counter() - started) * 1000)
+    extracted = flatten(data)
+    metrics = fills.request_metrics.values
+    return {
+        'latency': summarize_ms(samples),
+        'llm_calls_per_extraction': fills.client.calls / runs,
+        'prompt_tokens_per_extraction': metrics['PromptTokens'] / runs,
+        'fields_answered_locally': metrics['LocalFields'] / runs,
+        'fields_sent_to_model': (
+            metrics['RemoteFields'] / runs if backend == 'routed'
+            else 0 if backend == 'local' else len(fills.get_compiled_template(GENERAL_TEMPLATE_FIELDS).field_info)
+        ),
+        'correct': sum(1 for field_id, value in EXPECTED.items() if str(extracted.get(field_id)) == str(value)),
+        'expected': len(EXPECTED),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=int, nargs='+', default=[5, 30])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    fills = load_lambda_module(EXTRACTION_CACHE_ENABLED='false')
+    results = []
+    for minutes in args.minutes:
+        transcript = synthetic_transcript(minutes)
+        results.append({
+            'minutes': minutes,
+            'chars': len(transcript),
+            'backends': {
+                backend: run_backend(fills, backend, transcript, args.runs)
+                for backend in ('openai', 'routed', 'local')
+            },
+        })
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Single-shot vs chunked extraction latency on synthetic transcripts.
+
+Runs extract_form_data against FakeLLMClient, whose latency grows with prompt
+length, once with chunking disabled and once with the configured chunk size.
+
+Usage:
+    python benchmarks/extraction_chunking.py [--minutes 10 30 60] [--runs 3] [--chunk-chars 12000]
+"""
+import argparse
+import json
+import time
+
+from _support import FakeLLMClient, GENERAL_TEMPLATE_FIELDS, load_lambda_module, summarize_ms, synthetic_transcript
+
+EXTRACTED_FIELDS = {
+    'patientInfo.fullName': {'value': 'Jane Smith', 'source_quote': 'My name is Jane Smith', 'confidence': 0.95},
+    'patientInfo.age': {'value': 54, 'source_quote': 'I am 54 years old', 'confidence': 0.93},
+    'vitalSigns.heartRate': {'value': '72', 'source_quote': 'Heart rate 72', 'confidence': 0.9},
+}
+
+def time_extraction(fills, transcript, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fills.extract_form_data(GENERAL_TEMPLATE_FIELDS, transcript)
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize_ms(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=int, nargs='+', default=[10, 30, 60])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--chunk-chars', type=int, default=12000)
+    args = parser.parse_args()
+
+    fills = load_lambda_module(EXTRACTION_CACHE_ENABLED='false')
+    fills.client = FakeLLMClient(fields=EXTRACTED_FIELDS)
+
+    results = []
+    for minutes in args.minutes:
+        transcript = synthetic_transcript(minutes)
+        fills.EXTRACTION_CHUNK_CHARS = 0
+        single = time_extraction(fills, transcript, args.runs)
+        fills.EXTRACTION_CHUNK_CHARS = args.chunk_chars
+        chunked = time_extraction(fills, transcript, args.runs)
+        results.append({
+            'minutes': minutes,
+            'chars': len(transcript),
+            'chunks': len(fills.split_conversation(transcript, args.chunk_chars, fills.EXTRACTION_CHUNK_OVERLAP_CHARS)),
+            'single_shot': single,
+            'chunked': chunked,
+        })
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Behaviour of the OpenAI call layer (call_llm) against a local fake LLM server.
+
+The real OpenAI client talks HTTP to FakeLLMServer, so timeouts, status codes
+and retries go through the same code as in production. Scenarios:
+
+* healthy: every request answers in ~50ms.
+* flaky: 30% of requests fail with 503; jittered retries hide most of them.
+* slow tail, without and with hedging: 5% of requests take 2s.
+* outage: every request fails with 500; the circuit breaker opens and later
+  calls fail fast instead of waiting on the provider.
+
+Each scenario reports successes, LLMUnavailableError counts, latency
+percentiles per call and how many requests reached the server.
+
+Usage:
+    python benchmarks/llm_resilience.py [--calls 200] [--concurrency 4]
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _support import FakeLLMServer, load_lambda_module, summarize_ms
+
+EXTRACTED_FIELDS = {
+    'patientInfo.fullName': {'value': 'Jane Smith', 'source_quote': 'My name is Jane Smith', 'confidence': 0.95},
+}
+
+FIELD_DESCRIPTIONS = '- patientInfo.fullName: Full Name (type: text, required: True)'
+
+def run_scenario(name, calls, concurrency, latency_ms, failure_status, **env):
+    rng = random.Random(7)
+    server = FakeLLMServer(
+        latency_ms=lambda: latency_ms(rng), failure_status=lambda: failure_status(rng), fields=EXTRACTED_FIELDS
+    )
+    with server:
+        fills = load_lambda_module(
+            OPENAI_BASE_URL=server.base_url,
+            EXTRACTION_CACHE_ENABLED='false',
+            LLM_ATTEMPT_TIMEOUT_SECONDS=5,
+            LLM_RETRY_BASE_SECONDS=0.05,
+            LLM_RETRY_MAX_SECONDS=0.5,
+            LLM_BREAKER_COOLDOWN_SECONDS=60,
+            **env
+        )
+        # One metrics window for the whole scenario, so counters add up across calls
+        fills.request_metrics.start('bench')
+
+        def one_call(_):
+            started = time.perf_counter()
+            try:
+                fills.request_extraction(FIELD_DESCRIPTIONS, 'Patient: My name is Jane Smith.')
+                outcome = 'ok'
+            except fills.LLMUnavailableError:
+                outcome = 'unavailable'
+            return outcome, (time.perf_counter() - started) * 1000
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(one_call, range(calls)))
+
+    return {
+        'scenario': name,
+        'ok': sum(1 for outcome, _ in results if outcome == 'ok'),
+        'unavailable': sum(1 for outcome, _ in results if outcome == 'unavailable'),
+        'latency': summarize_ms([elapsed for _, elapsed in results]),
+        'server_requests': server.requests,
+        'hedges': int(fills.request_metrics.values['OpenAIHedges']),
+        'retries': int(fills.request_metrics.values['OpenAIRetries']),
+        'breaker_rejections': int(fills.request_metrics.values['OpenAIBreakerRejections']),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    fast = lambda rng: 50.0
+    slow_tail = lambda rng: 2000.0 if rng.random() < 0.05 else 50.0
+    never = lambda rng: None
+
+    scenarios = [
+        ('healthy', fast, never, {}),
+        ('flaky', fast, lambda rng: 503 if rng.random() < 0.3 else None, {'LLM_BREAKER_ERROR_RATE': 0.9}),
+        ('slow tail', slow_tail, never, {}),
+        ('slow tail, hedged', slow_tail, never, {'LLM_HEDGING_ENABLED': 'true', 'LLM_HEDGE_DEFAULT_DELAY_SECONDS': 0.3}),
+        ('outage', fast, lambda rng: 500, {}),
+    ]
+    results = [
+        run_scenario(name, args.calls, args.concurrency, latency, failure, **env)
+        for name, latency, failure, env in scenarios
+    ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
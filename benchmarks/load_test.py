@@ -0,0 +1,287 @@
+"""Offline load test for lambda_handler across every route.
+
+Each worker process stands in for one warm Lambda container. It starts moto for
+DynamoDB, seeds a template and --forms forms, points the real OpenAI client at a
+shared FakeLLMServer (--llm-latency-ms per completion), and then replays a
+weighted mix of API Gateway v2 events for --duration seconds, one request at a
+time. Log lines and EMF metrics are formatted as in Lambda and then discarded.
+
+Per route it reports wall-clock latency and process CPU time (p50/p95/p99), and
+peak bytes allocated per request, measured in a separate tracemalloc pass so
+tracing does not skew the timings. Overall throughput is the sum of each
+worker's requests per second. CPU time includes moto's in-process table work,
+so compare runs against a baseline from the same machine rather than reading
+the numbers as Lambda costs.
+
+With --baseline, each route's p95 latency and CPU time is compared against a
+previous --output file, for routes with at least --min-samples requests in both
+runs. The exit status is 1 if any of them regressed by more than
+--max-regression.
+
+Usage:
+    python benchmarks/load_test.py [--workers 4] [--duration 10] [--forms 200] [--llm-latency-ms 300]
+                                   [--output results.json] [--baseline previous.json] [--max-regression 0.25]
+                                   [--min-samples 20]
+"""
+import argparse
+import base64
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+from _support import (
+    FakeLLMServer, GENERAL_TEMPLATE_FIELDS, create_tables, load_lambda_module, summarize_ms, synthetic_transcript
+)
+
+USER_ID = 'load-user'
+
+EXTRACTED_FIELDS = {
+    'patientInfo.fullName': {'value': 'Jane Smith', 'source_quote': 'My name is Jane Smith', 'confidence': 0.95},
+    'patientInfo.age': {'value': 54, 'source_quote': 'I am 54 years old', 'confidence': 0.93},
+    'vitalSigns.heartRate': {'value': '72', 'source_quote': 'Heart rate 72', 'confidence': 0.9},
+}
+
+TRANSCRIPT = synthetic_transcript(5)
+
+def form_data(rng):
+    return {
+        'patientInfo': {'fullName': 'Jane Smith', 'age': rng.randint(18, 90), 'gender': 'female'},
+        'vitalSigns': {'temperature': '36.8', 'bloodPressure': '128/82', 'heartRate': str(rng.randint(55, 110))},
+        'notes': {'summary': 'Intermittent headaches over the last two weeks. ' * 5},
+    }
+
+class WorkerState:
+    """Ids the request mix reads and writes; forms created by the mix are the only ones deleted"""
+    def __init__(self, template_id, form_ids):
+        self.template_id = template_id
+        self.form_ids = form_ids
+        self.created_ids = []
+
+# name -> (weight, build(state, rng) -> (method, path, body, query params))
+ROUTES = {
+    'GET /forms': (30, lambda state, rng: ('GET', '/forms', None, {'limit': '50'})),
+    'GET /forms?templateCode': (5, lambda state, rng: ('GET', '/forms', None, {'templateCode': 'general'})),
+    'GET /forms?view=full': (3, lambda state, rng: ('GET', '/forms', None, {'view': 'full', 'limit': '50'})),
+    'GET /forms/{id}': (25, lambda state, rng: ('GET', f"/forms/{rng.choice(state.form_ids)}", None, None)),
+    'GET /templates': (8, lambda state, rng: ('GET', '/templates', None, None)),
+    'GET /templates/{id}': (5, lambda state, rng: ('GET', f"/templates/{state.template_id}", None, None)),
+    'POST /forms': (6, lambda state, rng: ('POST', '/forms', {'templateCode': 'general', 'data': form_data(rng)}, None)),
+    'POST /forms (extract)': (2, lambda state, rng: ('POST', '/forms', {
+        'templateId': state.template_id, 'conversationText': TRANSCRIPT, 'data': {}
+    }, None)),
+    'PUT /forms/{id}': (3, lambda state, rng: (
+        'PUT', f"/forms/{rng.choice(state.form_ids)}", {'data': form_data(rng)}, None
+    )),
+    'PATCH /forms/{id}': (5, lambda state, rng: (
+        'PATCH', f"/forms/{rng.choice(state.form_ids)}",
+        {'changes': {'vitalSigns': {'heartRate': str(rng.randint(55, 110))}}}, None
+    )),
+    'DELETE /forms/{id}': (1, lambda state, rng: (
+        'DELETE', f"/forms/{state.created_ids.pop() if state.created_ids else 'missing'}", None, None
+    )),
+    'POST /forms/{id}/extract': (1, lambda state, rng: (
+        'POST', f"/forms/{rng.choice(state.form_ids)}/extract",
+        {'templateId': state.template_id, 'conversationText': TRANSCRIPT}, None
+    )),
+    'POST /forms:batchGet': (3, lambda state, rng: ('POST', '/forms:batchGet', {
+        'ids': rng.sample(state.form_ids, min(25, len(state.form_ids)))
+    }, None)),
+    'POST /forms:batch': (1, lambda state, rng: ('POST', '/forms:batch', {
+        'forms': [{'templateCode': 'general', 'data': form_data(rng)} for _ in range(10)]
+    }, None)),
+    'OPTIONS /forms': (1, lambda state, rng: ('OPTIONS', '/forms', None, None)),
+}
+
+class FakeContext:
+    """The parts of the Lambda context object lambda_handler reads"""
+    def __init__(self, request_id):
+        self.aws_request_id = request_id
+        self.deadline = time.monotonic() + 30
+
+    def get_remaining_time_in_millis(self):
+        return int((self.deadline - time.monotonic()) * 1000)
+
+def build_event(method, path, body, query_params):
+    """An API Gateway HTTP API (payload v2) event as the Lambda authorizer leaves it"""
+    event = {
+        'version': '2.0',
+        'rawPath': path,
+        'headers': {'accept-encoding': 'gzip', 'content-type': 'application/json'},
+        'requestContext': {'http': {'method': method, 'path': path}, 'authorizer': {'lambda': {'userId': USER_ID}}},
+    }
+    if body is not None:
+        event['body'] = json.dumps(body)
+    if query_params:
+        event['queryStringParameters'] = query_params
+    return event
+
+def seed(fills, forms, rng):
+    """Create the template and forms the request mix reads"""
+    template = fills.create_template(USER_ID, {
+        'name': 'General', 'fields': fills.template_fields_as_list(GENERAL_TEMPLATE_FIELDS)
+    })
+    form_ids = []
+    for start in range(0, forms, fills.BATCH_MAX_FORMS):
+        batch = [{'templateCode': 'general', 'data': form_data(rng)} for _ in range(min(fills.BATCH_MAX_FORMS, forms - start))]
+        results = fills.create_filled_forms_batch(USER_ID, batch)['results']
+        form_ids.extend(result['item']['formId'] for result in results if result['status'] == 'created')
+    return WorkerState(template['templateId'], form_ids)
+
+def response_json(response):
+    body = response['body']
+    if response.get('isBase64Encoded'):
+        body = gzip.decompress(base64.b64decode(body))
+    return json.loads(body)
+
+def invoke(fills, state, route, rng, request_number):
+    method, path, body, query_params = ROUTES[route][1](state, rng)
+    response = fills.lambda_handler(build_event(method, path, body, query_params), FakeContext(str(request_number)))
+    if response['statusCode'] == 200 and route == 'POST /forms':
+        state.created_ids.append(response_json(response)['formId'])
+    elif response['statusCode'] == 200 and route == 'POST /forms:batch':
+        state.created_ids.extend(
+            result['item']['formId'] for result in response_json(response)['results'] if result['status'] == 'created'
+        )
+    return response['statusCode']
+
+def run_worker(worker_index, llm_base_url, duration, forms, alloc_runs):
+    """One container: seed, warm every route, replay the mix for `duration` seconds, then trace allocations"""
+    sys.stdout = open(os.devnull, 'w')
+    os.environ.update({
+        'AWS_DEFAULT_REGION': 'us-east-1', 'AWS_ACCESS_KEY_ID': 'load', 'AWS_SECRET_ACCESS_KEY': 'load',
+        'OPENAI_BASE_URL': llm_base_url,
+    })
+    from moto import mock_aws
+    mock_aws().start()
+    create_tables()
+
+    fills = load_lambda_module(EXTRACTION_CACHE_ENABLED='false')
+    # Format log lines as Lambda would, but do not keep them
+    logging.getLogger().addHandler(logging.StreamHandler(open(os.devnull, 'w')))
+    rng = random.Random(worker_index)
+    state = seed(fills, forms, rng)
+
+    names = list(ROUTES)
+    weights = [ROUTES[name][0] for name in names]
+    for request_number, route in enumerate(names):
+        invoke(fills, state, route, rng, request_number)
+
+    wall = defaultdict(list)
+    cpu = defaultdict(list)
+    statuses = defaultdict(Counter)
+    started = time.perf_counter()
+    request_number = 0
+    while time.perf_counter() - started < duration:
+        route = rng.choices(names, weights)[0]
+        request_number += 1
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        status = invoke(fills, state, route, rng, request_number)
+        cpu[route].append((time.process_time() - cpu_started) * 1000)
+        wall[route].append((time.perf_counter() - wall_started) * 1000)
+        statuses[route][status] += 1
+    elapsed = time.perf_counter() - started
+
+    allocated = defaultdict(list)
+    tracemalloc.start()
+    for route in names:
+        for _ in range(alloc_runs):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            invoke(fills, state, route, rng, request_number)
+            allocated[route].append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        'requests': request_number,
+        'elapsed_s': elapsed,
+        'wall': dict(wall),
+        'cpu': dict(cpu),
+        'statuses': {route: dict(counts) for route, counts in statuses.items()},
+        'allocated': dict(allocated),
+    }
+
+def compare(results, baseline, max_regression, min_samples):
+    """Routes whose p95 latency or CPU time grew by more than max_regression over the baseline"""
+    regressions = []
+    for route, current in results['routes'].items():
+        previous = baseline.get('routes', {}).get(route)
+        # A p95 over a handful of requests is noise
+        if not previous or min(previous['latency']['count'], current['latency']['count']) < min_samples:
+            continue
+        for metric in ('latency', 'cpu'):
+            before, after = previous[metric]['p95_ms'], current[metric]['p95_ms']
+            if before > 0 and after > before * (1 + max_regression):
+                regressions.append({'route': route, 'metric': f"{metric}.p95_ms", 'baseline': before, 'current': after})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent containers (processes)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load per worker')
+    parser.add_argument('--forms', type=int, default=200, help='Forms seeded per worker')
+    parser.add_argument('--llm-latency-ms', type=float, default=300)
+    parser.add_argument('--alloc-runs', type=int, default=5, help='Traced requests per route for allocation')
+    parser.add_argument('--output', help='Also write the JSON results to this file')
+    parser.add_argument('--baseline', help='Previous --output file to check for regressions')
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    parser.add_argument('--min-samples', type=int, default=20, help='Routes with fewer requests are not compared')
+    args = parser.parse_args()
+
+    with FakeLLMServer(latency_ms=lambda: args.llm_latency_ms, fields=EXTRACTED_FIELDS) as llm:
+        with multiprocessing.get_context('spawn').Pool(args.workers) as pool:
+            workers = pool.starmap(run_worker, [
+                (index, llm.base_url, args.duration, args.forms, args.alloc_runs) for index in range(args.workers)
+            ])
+
+    results = {
+        'config': {
+            'workers': args.workers, 'duration_s': args.duration, 'forms': args.forms,
+            'llm_latency_ms': args.llm_latency_ms, 'python': sys.version.split()[0],
+        },
+        'throughput': {
+            'requests': sum(worker['requests'] for worker in workers),
+            'requests_per_second': round(sum(worker['requests'] / worker['elapsed_s'] for worker in workers), 1),
+            'llm_requests': llm.requests,
+        },
+        'routes': {},
+    }
+    for route in ROUTES:
+        wall = [sample for worker in workers for sample in worker['wall'].get(route, [])]
+        if not wall:
+            continue
+        statuses = Counter()
+        for worker in workers:
+            statuses.update(worker['statuses'].get(route, {}))
+        allocated = sorted(sample for worker in workers for sample in worker['allocated'][route])
+        results['routes'][route] = {
+            'latency': summarize_ms(wall),
+            'cpu': summarize_ms([sample for worker in workers for sample in worker['cpu'].get(route, [])]),
+            'peak_alloc_bytes_p50': allocated[len(allocated) // 2],
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            results['regressions'] = compare(
+                results, json.load(baseline_file), args.max_regression, args.min_samples
+            )
+        exit_code = 1 if results['regressions'] else 0
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    print(output)
+    sys.exit(exit_code)
+
+if __name__ == '__main__':
+    main()
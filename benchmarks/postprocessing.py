@@ -0,0 +1,136 @@
+"""Cost of turning an extraction into form data on large templates.
+
+Compares the previous per-field loop (confidence check, split the id, insert
+the raw model value) with apply_extracted_fields, which also coerces every
+value to its template type in one pass over precompiled field plans. The model
+output mixes types the way real completions do: numbers as strings with units,
+options in the wrong case, and table rows keyed by column label. Reports
+milliseconds per extraction, plus how many stored values did not match their
+field's type. Those values are rewritten with new types on the next save.
+
+Usage:
+    python benchmarks/postprocessing.py [--fields 50 500] [--runs 200]
+"""
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+
+from _support import load_lambda_module, summarize_ms
+
+SECTION_SIZE = 25
+OPTIONS = ['Never', 'Former', 'Current']
+
+def build_template(field_count):
+    """Sections of numbers, selects, multi-selects, text and tables, with a nested group in each"""
+    sections = []
+    for section_index in range(0, field_count, SECTION_SIZE):
+        fields = []
+        for index in range(section_index, min(section_index + SECTION_SIZE, field_count)):
+            kind = index % 5
+            field = {'id': f"f{index}", 'label': f"Field {index}"}
+            if kind == 0:
+                field['type'] = 'number'
+            elif kind == 1:
+                field.update(type='select', options=OPTIONS)
+            elif kind == 2:
+                field.update(type='multiple_select', options=OPTIONS)
+            elif kind == 3:
+                field['type'] = 'text'
+            else:
+                field.update(type='table', columns=[
+                    {'id': 'drug', 'label': 'Drug name'}, {'id': 'dose', 'label': 'Dose (mg)', 'type': 'number'}
+                ])
+            fields.append(field)
+        sections.append({'id': f"s{section_index // SECTION_SIZE}", 'type': 'section', 'fields': [
+            *fields[:-5], {'id': 'group', 'type': 'group', 'fields': fields[-5:]}
+        ]})
+    return sections
+
+def model_value(field_type, rng):
+    if field_type == 'number':
+        return rng.choice([72, 36.8, '120 mg', '1,200'])
+    if field_type == 'select':
+        return rng.choice(OPTIONS).lower()
+    if field_type == 'multiple_select':
+        return ', '.join(rng.sample(OPTIONS, 2))
+    if field_type == 'table':
+        return [{'Drug name': 'ibuprofen', 'Dose (mg)': '400 mg'}, {'drug': 'paracetamol', 'dose': 500}]
+    return 'Patient reports intermittent headaches'
+
+def legacy_apply(nested_data, extracted_fields, paths):
+    """The per-field loop extract_form_data ran before the post-processing stage"""
+    for field_id, field_data in extracted_fields.items():
+        if field_data.value is None or not field_data.confidence or field_data.confidence <= 0.8:
+            continue
+        path = paths.get(field_id)
+        if path is None:
+            continue
+        target = nested_data
+        for part in path[:-1]:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[path[-1]] = field_data.value
+
+def mistyped(compiled, nested_data, fills):
+    """Stored values whose type does not match the field: numbers not Decimal, options not in the allowed set"""
+    count = 0
+    for plan in compiled.plans.values():
+        value = fills.get_nested_value(nested_data, plan.path)
+        if value is None:
+            continue
+        if plan.field_type == 'number' and not isinstance(value, Decimal):
+            count += 1
+        elif plan.field_type == 'select' and value not in OPTIONS:
+            count += 1
+        elif plan.field_type == 'multiple_select' and (not isinstance(value, list) or set(value) - set(OPTIONS)):
+            count += 1
+        elif plan.field_type == 'table' and any(set(row) - {'drug', 'dose'} for row in value):
+            count += 1
+    return count
+
+def time_runs(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize_ms(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, nargs='+', default=[50, 500])
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    fills = load_lambda_module(EXTRACTION_CACHE_ENABLED='false', METRICS_ENABLED='false')
+    fills.load_extraction_models()
+    rng = random.Random(7)
+
+    results = []
+    for field_count in args.fields:
+        compiled = fills.CompiledTemplate(build_template(field_count), f"bench-{field_count}")
+        extracted = {
+            field['id']: fills.FormFieldExtraction(
+                value=model_value(field['type'], rng), source_quote='quote', confidence=rng.choice([0.7, 0.9, 0.95])
+            )
+            for field in compiled.field_info
+        }
+        legacy_data = {}
+        legacy_apply(legacy_data, extracted, compiled.paths)
+        current_data = {}
+        fills.apply_extracted_fields(current_data, extracted, compiled)
+        results.append({
+            'fields': field_count,
+            'legacy_ms': time_runs(lambda: legacy_apply({}, extracted, compiled.paths), args.runs),
+            'current_ms': time_runs(lambda: fills.apply_extracted_fields({}, extracted, compiled), args.runs),
+            'legacy_mistyped': mistyped(compiled, legacy_data, fills),
+            'current_mistyped': mistyped(compiled, current_data, fills),
+        })
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Dispatch overhead: the old if/elif routing chain against the route table.
+
+The legacy function reproduces what handle_request did before a handler ran:
+log the method, path and json.dumps of the auth context, walk the
+path == / startswith / split('/') chain and log the branch taken. The current
+one is router.match plus the single log line handle_request now writes. Both
+log through a handler that formats records and discards them, as Lambda's
+would, and neither calls into DynamoDB.
+
+Usage:
+    python benchmarks/routing.py [--requests 200000]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import time
+
+from _support import load_lambda_module
+
+REQUESTS = [
+    ('GET', '/forms'), ('GET', '/forms/4f1c2a7e'), ('GET', '/templates'), ('GET', '/templates/9b3d'),
+    ('POST', '/forms'), ('PUT', '/forms/4f1c2a7e'), ('PATCH', '/forms/4f1c2a7e'), ('DELETE', '/forms/4f1c2a7e'),
+    ('POST', '/forms/4f1c2a7e/extract'), ('POST', '/forms:batchGet'),
+    ('POST', '/forms:batch'), ('POST', '/templates:batchGet'), ('GET', '/unknown'),
+]
+
+def legacy_dispatch(logger, event):
+    """The routing part of handle_request before the route table, returning the branch taken"""
+    http_method = event.get('requestContext', {}).get('http', {}).get('method', '')
+    logger.info(f"HTTP Method: {http_method}")
+    path = event.get('rawPath', '')
+    logger.info(f"Path: {path}")
+    auth_context = event.get('requestContext', {}).get('authorizer', {}).get('lambda', {})
+    logger.info(f"Auth context: {json.dumps(auth_context)}")
+
+    if path == '/templates':
+        branch = f"{http_method} /templates"
+    elif path == '/templates:batchGet':
+        branch = 'POST /templates:batchGet' if http_method == 'POST' else None
+    elif path.startswith('/templates/'):
+        template_id = path.split('/')[-1]
+        logger.info(f"Template ID from path: {template_id}")
+        branch = f"{http_method} /templates/{{templateId}}"
+    elif path == '/forms:batchGet':
+        branch = 'POST /forms:batchGet' if http_method == 'POST' else None
+    elif path == '/forms:batch':
+        branch = 'POST /forms:batch' if http_method == 'POST' else None
+    elif path == '/forms':
+        branch = f"{http_method} /forms"
+    elif path.startswith('/forms/') and path.endswith('/extract'):
+        form_id = path.split('/')[-2]
+        branch = 'POST /forms/{formId}/extract' if http_method == 'POST' else None
+    elif path.startswith('/forms/'):
+        form_id = path.split('/')[-1]
+        logger.info(f"Form ID from path: {form_id}")
+        branch = f"{http_method} /forms/{{formId}}"
+    else:
+        branch = None
+    if branch:
+        logger.info(f"Processing {branch} request")
+    return branch
+
+def current_dispatch(fills, event):
+    """router.match and the log line handle_request writes"""
+    matched = fills.router.match(fills.request_method(event), event.get('rawPath', ''))
+    if matched is None:
+        return None
+    route, path_params = matched
+    fills.logger.info(f"Processing {route.name} {path_params or ''}".rstrip())
+    return route.name
+
+def time_dispatch(dispatch, events):
+    started = time.perf_counter()
+    for event in events:
+        dispatch(event)
+    return (time.perf_counter() - started) * 1e6 / len(events)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200000)
+    args = parser.parse_args()
+
+    fills = load_lambda_module(EXTRACTION_CACHE_ENABLED='false', METRICS_ENABLED='false')
+    fills.logger.addHandler(logging.StreamHandler(open(os.devnull, 'w')))
+    rng = random.Random(7)
+    events = []
+    for _ in range(args.requests):
+        method, path = rng.choice(REQUESTS)
+        events.append({
+            'rawPath': path,
+            'requestContext': {'http': {'method': method}, 'authorizer': {'lambda': {'userId': 'bench-user'}}}
+        })
+
+    # Warm up both paths before timing
+    time_dispatch(lambda event: legacy_dispatch(fills.logger, event), events[:1000])
+    time_dispatch(lambda event: current_dispatch(fills, event), events[:1000])
+    results = {
+        'requests': args.requests,
+        'legacy_chain_us': round(time_dispatch(lambda event: legacy_dispatch(fills.logger, event), events), 3),
+        'route_table_us': round(time_dispatch(lambda event: current_dispatch(fills, event), events), 3),
+        'routes': len(fills.ROUTES),
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Finding a user's forms by patient name: client-side filtering against GET /forms/search.
+
+The mobile app searches today by paging GET /forms at the maximum page size,
+projected to the patient name it lists, and matching names on the device. GET /forms/search reads only the
+postings of the query's term from SEARCH_INDEX_TABLE and returns one page of
+hits. For users with --forms forms each, where one in --match-every forms
+belongs to the searched patient, it reports per search:
+
+* dynamodb_calls and items_read (ScannedCount), which set the latency and read
+  cost on the real service;
+* response_kb, what the device downloads;
+* ms, wall-clock time through lambda_handler against moto. Moto evaluates
+  begins_with by walking the whole partition, so the search timings grow with
+  the index here even though the items read do not.
+
+Usage:
+    python benchmarks/search.py [--forms 500 2000] [--match-every 100] [--runs 3]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+
+from _support import create_search_index_table, create_tables, load_lambda_module, summarize_ms
+
+FIRST_NAMES = ['Ana', 'Ben', 'Chloe', 'David', 'Elena', 'Farid', 'Grace', 'Hugo', 'Ines', 'Jonas']
+LAST_NAMES = ['Alvarez', 'Brown', 'Chen', 'Dubois', 'Evans', 'Fischer', 'Gupta', 'Hansen', 'Ito', 'Jensen']
+QUERY = 'Novak'
+
+def seed_user(fills, user_id, count, match_every):
+    """Write count forms for a user straight to the tables, indexing each as create_filled_form does"""
+    with fills.filled_forms_table.batch_writer() as writer:
+        for index in range(count):
+            created_at = 1_700_000_000 + index * 60
+            last_name = QUERY if index % match_every == 0 else LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)]
+            item = {
+                'formId': f"{user_id}-{index:06d}",
+                'userId': user_id,
+                'templateCode': 'general',
+                'templateSortKey': fills.build_template_sort_key('general', created_at),
+                'data': {
+                    'patientInfo': {
+                        'fullName': f"{FIRST_NAMES[index % len(FIRST_NAMES)]} {last_name}",
+                        'age': index % 90,
+                        'gender': 'F' if index % 2 else 'M',
+                    },
+                    'vitalSigns': {'temperature': '36.8', 'bloodPressure': '128/82', 'heartRate': str(60 + index % 40)},
+                    'assessment': 'Intermittent headaches for two weeks, worse in the evening, no visual symptoms. ' * 3,
+                },
+                'status': 'ready',
+                'createdAt': created_at,
+                'updatedAt': created_at,
+            }
+            writer.put_item(Item=item)
+            fills.index_form(item, created=True)
+
+def request(fills, user_id, path, query):
+    event = {
+        'rawPath': path,
+        'queryStringParameters': query,
+        'requestContext': {'http': {'method': 'GET'}, 'authorizer': {'lambda': {'userId': user_id}}},
+    }
+    response = fills.lambda_handler(event, None)
+    return json.loads(response['body']), len(response['body'].encode())
+
+def client_side_search(fills, user_id):
+    """Page every form's patient name, as the forms list loads it, and match on the device"""
+    matches, size, token = [], 0, None
+    while True:
+        query = {'fields': 'templateCode,createdAt,data.patientInfo.fullName', 'limit': str(fills.MAX_PAGE_LIMIT), **({'nextToken': token} if token else {})}
+        page, page_size = request(fills, user_id, '/forms', query)
+        size += page_size
+        matches.extend(
+            item for item in page['items']
+            if QUERY.lower() in item.get('data', {}).get('patientInfo', {}).get('fullName', '').lower()
+        )
+        token = page['nextToken']
+        if not token:
+            return len(matches), size
+
+def server_search(fills, user_id):
+    """One page of GET /forms/search"""
+    page, size = request(fills, user_id, '/forms/search', {'q': QUERY, 'limit': str(fills.DEFAULT_PAGE_LIMIT)})
+    return len(page['items']), size
+
+class CountingClient:
+    """Wraps the low-level DynamoDB client to count calls and items read"""
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+        self.items_read = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def counted(**kwargs):
+            response = method(**kwargs)
+            self.calls += 1
+            self.items_read += response.get('ScannedCount', len(response.get('Items', [])))
+            return response
+        return counted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--forms', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--match-every', type=int, default=100)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.update({'AWS_ACCESS_KEY_ID': 'benchmark', 'AWS_SECRET_ACCESS_KEY': 'benchmark'})
+    fills = load_lambda_module(
+        SEARCH_INDEX_TABLE='FormSearchIndex', EXTRACTION_CACHE_ENABLED='false', METRICS_ENABLED='false'
+    )
+    import boto3
+    from moto import mock_aws
+    with mock_aws():
+        create_tables()
+        create_search_index_table()
+        fills.logger.setLevel(logging.WARNING)
+        fills.dynamodb_client = CountingClient(boto3.client('dynamodb'))
+
+        results = []
+        for count in args.forms:
+            user_id = f"user-{count}"
+            seed_user(fills, user_id, count, args.match_every)
+            row = {'forms': count}
+            for name, search in (('client_side', client_side_search), ('search_endpoint', server_search)):
+                samples = []
+                for _ in range(args.runs):
+                    fills.dynamodb_client.calls = fills.dynamodb_client.items_read = 0
+                    started = time.perf_counter()
+                    hits, size = search(fills, user_id)
+                    samples.append((time.perf_counter() - started) * 1000)
+                row[name] = {
+                    'hits': hits,
+                    'dynamodb_calls': fills.dynamodb_client.calls,
+                    'items_read': fills.dynamodb_client.items_read,
+                    'response_kb': round(size / 1024, 1),
+                    'ms': summarize_ms(samples),
+                }
+            results.append(row)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
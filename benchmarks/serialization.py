@@ -0,0 +1,121 @@
+"""Request/response serialization cost on representative form payloads.
+
+Compares the previous path (json with DecimalEncoder, run once for the log line
+and again for the body; request floats rebuilt by a copying
+convert_floats_to_decimals on create and update) with the current one (orjson
+when installed, one serialization per response, request numbers parsed straight
+to Decimal so the conversion pass copies nothing).
+
+Usage:
+    python benchmarks/serialization.py [--forms 1 50 200] [--runs 50]
+"""
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+
+from _support import load_lambda_module, summarize_ms
+
+def legacy_convert_floats_to_decimals(obj):
+    """convert_floats_to_decimals as it was: every dict and list is rebuilt"""
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    elif isinstance(obj, dict):
+        return {k: legacy_convert_floats_to_decimals(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_convert_floats_to_decimals(x) for x in obj]
+    return obj
+
+def form_data(rng):
+    """A general-template form with free text, vitals and a medication table"""
+    return {
+        'patientInfo': {
+            'fullName': 'Jane Smith',
+            'age': rng.randint(18, 90),
+            'gender': rng.choice(['female', 'male']),
+            'phone': '+1 555 0100',
+        },
+        'vitalSigns': {
+            'temperature': round(rng.uniform(36.0, 39.0), 1),
+            'bloodPressure': f"{rng.randint(100, 150)}/{rng.randint(60, 95)}",
+            'heartRate': rng.randint(55, 110),
+            'weight': round(rng.uniform(50, 110), 1),
+            'oxygenSaturation': round(rng.uniform(0.9, 1.0), 2),
+        },
+        'history': {
+            'presentingComplaint': 'Intermittent headaches over the last two weeks. ' * 6,
+            'notes': 'Patient reports poor sleep and increased screen time at work. ' * 10,
+            'allergies': ['penicillin', 'latex'],
+        },
+        'medications': [
+            {'name': f"med-{index}", 'doseMg': round(rng.uniform(5, 500), 1), 'perDay': rng.randint(1, 3)}
+            for index in range(8)
+        ],
+    }
+
+def stored_form(fills, rng):
+    """A FilledForms item as DynamoDB returns it, numbers as Decimal"""
+    return {
+        'formId': f"{rng.getrandbits(64):016x}",
+        'userId': 'user-1',
+        'templateCode': 'general',
+        'status': 'ready',
+        'createdAt': Decimal(1700000000 + rng.randint(0, 10 ** 6)),
+        'updatedAt': Decimal(1700000000 + rng.randint(0, 10 ** 6)),
+        'data': fills.convert_floats_to_decimals(form_data(rng)),
+    }
+
+def time_runs(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize_ms(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--forms', type=int, nargs='+', default=[1, 50, 200])
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    fills = load_lambda_module(EXTRACTION_CACHE_ENABLED='false')
+    rng = random.Random(7)
+
+    results = []
+    for count in args.forms:
+        page = {'items': [stored_form(fills, rng) for _ in range(count)], 'nextToken': None}
+        request_bodies = [json.dumps({'templateCode': 'general', 'data': form_data(rng)}) for _ in range(count)]
+
+        def legacy_response():
+            json.dumps(page, cls=fills.DecimalEncoder)
+            json.dumps(page, cls=fills.DecimalEncoder)
+
+        def current_response():
+            fills.safe_json_dumps(page)
+
+        def legacy_request():
+            for raw in request_bodies:
+                body = json.loads(raw)
+                legacy_convert_floats_to_decimals(legacy_convert_floats_to_decimals(body['data']))
+
+        def current_request():
+            for raw in request_bodies:
+                body = fills.decode_stored_json(raw)
+                fills.convert_floats_to_decimals(body['data'])
+
+        results.append({
+            'forms': count,
+            'response_bytes': len(fills.safe_json_dumps(page)),
+            'orjson': fills.orjson is not None,
+            'response_legacy': time_runs(legacy_response, args.runs),
+            'response_current': time_runs(current_response, args.runs),
+            'request_legacy': time_runs(legacy_request, args.runs),
+            'request_current': time_runs(current_request, args.runs),
+        })
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,317 @@
 import json
-import boto3
+import csv
+import io
+import itertools
+import re
+import copy
+import gzip
+import base64
 import time
 import uuid
-from typing import Dict, Any, List, Optional, Union
+import hashlib
+import queue
+import random
+import sys
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from typing import Callable, Dict, Any, Iterator, List, Optional, Union
 import logging
 from decimal import Decimal, DecimalException
-from openai import OpenAI
 import os
-from pydantic import BaseModel, Field, RootModel
 import traceback
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('API_KEY'))
+try:
+    import zstandard
+except ImportError:  # Offloaded form data falls back to gzip
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:  # Serialization falls back to the json module
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Responses are only gzip-compressed
+    brotli = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Exports are NDJSON or CSV only
+    pyarrow = None
 
 # Set up logging 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
-form_templates_table = dynamodb.Table('FormTemplates')
-filled_forms_table = dynamodb.Table('FilledForms')
+# Per-request metrics are written as one CloudWatch embedded-metric-format line
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'FillsApi')
+# Share of requests whose full bodies are logged; they carry PHI, so off by default
+BODY_LOG_SAMPLE_RATE = float(os.getenv('BODY_LOG_SAMPLE_RATE', '0'))
+
+class RequestMetrics:
+    """Timers and counters for the current invocation, emitted as a single EMF line
+
+    Lambda runs one invocation per container at a time, so a module-level
+    instance is reset per request; the lock covers extraction worker threads.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cold_start = True
+        self.start('init')
+
+    def start(self, route: str, request_id: Optional[str] = None) -> None:
+        with self.lock:
+            self.route = route
+            self.request_id = request_id
+            self.started = time.perf_counter()
+            self.values = defaultdict(float)
+            self.log_bodies = BODY_LOG_SAMPLE_RATE > 0 and random.random() < BODY_LOG_SAMPLE_RATE
+
+    def add(self, name: str, value: float = 1) -> None:
+        with self.lock:
+            self.values[name] += value
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def emit(self, status_code: Optional[int] = None) -> None:
+        """Write the invocation's metrics to stdout, where CloudWatch picks up EMF lines"""
+        if not METRICS_ENABLED:
+            return
+        with self.lock:
+            values = dict(self.values)
+            values['DurationMs'] = (time.perf_counter() - self.started) * 1000
+            values['ColdStart'] = 1 if self.cold_start else 0
+            values['Errors'] = 1 if status_code is None or status_code >= 500 else 0
+            self.cold_start = False
+
+        def unit(name):
+            if name.endswith('Ms'):
+                return 'Milliseconds'
+            return 'Bytes' if name.endswith('Bytes') else 'Count'
+
+        line = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Route']],
+                    'Metrics': [{'Name': name, 'Unit': unit(name)} for name in values]
+                }]
+            },
+            'Route': self.route,
+            'statusCode': status_code,
+            'requestId': self.request_id,
+            **{name: round(value, 3) for name, value in values.items()}
+        }
+        sys.stdout.write(json.dumps(line) + '\n')
+        sys.stdout.flush()
+
+request_metrics = RequestMetrics()
+
+def log_body(message: str, payload: Any) -> None:
+    """Log a full request or response body, only for requests sampled by BODY_LOG_SAMPLE_RATE"""
+    if request_metrics.log_bodies:
+        logger.info(f"{message}: {payload if isinstance(payload, str) else safe_json_dumps(payload)}")
+
+# boto3, openai and pydantic are imported on first use rather than at cold start, so
+# requests that never reach DynamoDB or the LLM (OPTIONS, auth failures) skip them
+class LazyResource:
+    """Builds a client or resource on first attribute access and reuses it for the container's life"""
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+def start_aws_call_timer(model: Any, context: Dict[str, Any], **kwargs) -> None:
+    context['metricsService'] = model.service_model.service_id.replace(' ', '')
+    context['metricsStarted'] = time.perf_counter()
+
+def stop_aws_call_timer(context: Dict[str, Any], **kwargs) -> None:
+    # after-call-error passes only exception and context, so the service comes from before-call
+    started = context.pop('metricsStarted', None)
+    service = context.pop('metricsService', None)
+    if started is None or service is None:
+        return
+    request_metrics.add(f"{service}Ms", (time.perf_counter() - started) * 1000)
+    request_metrics.add(f"{service}Calls")
+
+def client_error() -> type:
+    """botocore's ClientError, imported on first use to keep botocore off the cold start
+
+    An except clause only evaluates its expression once something has raised,
+    by which point a boto3 call has usually loaded botocore anyway.
+    """
+    from botocore.exceptions import ClientError
+    return ClientError
+
+def instrument_aws_client(aws: Any) -> Any:
+    """Time every API call a boto3 client makes, retries included, into request_metrics"""
+    aws.meta.events.register('before-call', start_aws_call_timer)
+    aws.meta.events.register('after-call', stop_aws_call_timer)
+    aws.meta.events.register('after-call-error', stop_aws_call_timer)
+    return aws
+
+def aws_client(service: str) -> Any:
+    """Create a low-level boto3 client"""
+    import boto3
+    return instrument_aws_client(boto3.client(service))
+
+def aws_resource(service: str) -> Any:
+    """Create a boto3 resource"""
+    import boto3
+    resource = boto3.resource(service)
+    instrument_aws_client(resource.meta.client)
+    return resource
+
+def build_openai_client() -> Any:
+    """Create the OpenAI client; retries and timeouts are handled by call_llm"""
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv('API_KEY'), max_retries=0, timeout=LLM_ATTEMPT_TIMEOUT_SECONDS)
+
+# OpenAI client, created by get_openai_client on the first extraction
+client = None
+client_lock = threading.Lock()
+
+def get_openai_client() -> Any:
+    """Return the OpenAI client, creating it on first use"""
+    global client
+    if client is None:
+        with client_lock:
+            if client is None:
+                client = build_openai_client()
+    return client
+
+FORM_TEMPLATES_TABLE = 'FormTemplates'
+FILLED_FORMS_TABLE = 'FilledForms'
+
+# Reads on hot paths use the low-level client; writes go through the resource layer
+dynamodb_client = LazyResource(lambda: aws_client('dynamodb'))
+dynamodb = LazyResource(lambda: aws_resource('dynamodb'))
+form_templates_table = LazyResource(lambda: dynamodb.Table(FORM_TEMPLATES_TABLE))
+filled_forms_table = LazyResource(lambda: dynamodb.Table(FILLED_FORMS_TABLE))
+
+def build_type_serializers() -> tuple:
+    """Create the DynamoDB attribute-value serializer and deserializer"""
+    from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+    return TypeSerializer(), TypeDeserializer()
+
+dynamodb_types = LazyResource(build_type_serializers)
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert Python values to DynamoDB attribute values for the low-level client"""
+    serializer = dynamodb_types.get()[0]
+    return {key: serializer.serialize(value) for key, value in item.items()}
+
+def deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a low-level DynamoDB item back to Python values"""
+    deserializer = dynamodb_types.get()[1]
+    return {key: deserializer.deserialize(value) for key, value in item.items()}
+
+# Pagination settings for list endpoints
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+# GSIs on FilledForms: userIdIndex is userId (HASH), optionally + createdAt (RANGE) for newest-first lists
+# and split exports; userTemplateIndex is userId (HASH) + templateSortKey "<templateCode>#<createdAt>" (RANGE)
+USER_TEMPLATE_INDEX = 'userTemplateIndex'
+TEMPLATE_SORT_KEY_WIDTH = 10
+
+# Attributes returned by list endpoints; full items are fetched by id, ?view=full or ?fields=
+# (attribute names or dotted document paths such as data.patientInfo.fullName)
+FORM_SUMMARY_ATTRIBUTES = ['formId', 'userId', 'templateCode', 'status', 'createdAt', 'updatedAt']
+TEMPLATE_SUMMARY_ATTRIBUTES = ['templateId', 'userId', 'name', 'createdAt', 'updatedAt']
+MAX_PROJECTION_FIELDS = 20
+PROJECTION_FIELD_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+# Responses smaller than this are not worth compressing
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+# Batch endpoint limits; BatchWriteItem takes at most 25 puts and BatchGetItem 100 keys per call
+BATCH_MAX_FORMS = int(os.getenv('BATCH_MAX_FORMS', '100'))
+BATCH_WRITE_CHUNK_SIZE = 25
+BATCH_MAX_GET_IDS = 100
+BATCH_GET_CHUNK_SIZE = 100
+BATCH_MAX_RETRIES = 5
+BATCH_RETRY_BASE_SECONDS = 0.05
+
+# Most data paths a single PATCH may touch, keeping the update expression well under 4 KB
+PATCH_MAX_PATHS = 100
+
+class ConflictError(Exception):
+    """Raised when an optimistic-concurrency check fails; surfaced as HTTP 409"""
+
+# Form extraction status values
+FORM_STATUS_EXTRACTING = 'extracting'
+FORM_STATUS_READY = 'ready'
+FORM_STATUS_FAILED = 'failed'
+
+# Long-poll cap for GET /forms/{id}?wait=N, kept under API Gateway's 29s limit
+MAX_EXTRACTION_WAIT_SECONDS = 20
+EXTRACTION_POLL_INTERVAL_SECONDS = 0.5
+# Queued extraction writes the fields found so far to extractionProgress at most this often
+EXTRACTION_PROGRESS_INTERVAL_SECONDS = float(os.getenv('EXTRACTION_PROGRESS_INTERVAL_SECONDS', '1'))
+# Deliveries of an extraction job before its form is marked failed; match the queue's redrive maxReceiveCount
+EXTRACTION_MAX_RECEIVES = int(os.getenv('EXTRACTION_MAX_RECEIVES', '3'))
+
+class ExtractionQueue(ABC):
+    """Queue that carries async extraction jobs, and export jobs, to the worker"""
+    @abstractmethod
+    def send(self, job: Dict[str, Any]) -> None:
+        ...
+
+class SqsExtractionQueue(ExtractionQueue):
+    """Extraction queue backed by SQS; the worker is this Lambda with an SQS trigger"""
+    def __init__(self, queue_url: str):
+        self.queue_url = queue_url
+        self.sqs = LazyResource(lambda: aws_client('sqs'))
+
+    def send(self, job: Dict[str, Any]) -> None:
+        self.sqs.send_message(QueueUrl=self.queue_url, MessageBody=encode_stored_json(job))
+
+class LocalExtractionQueue(ExtractionQueue):
+    """In-process stand-in for SQS, for local runs and tests"""
+    def __init__(self):
+        self.jobs = []
+
+    def send(self, job: Dict[str, Any]) -> None:
+        self.jobs.append(job)
+
+    def drain(self) -> int:
+        """Run every pending job through the worker and return how many ran"""
+        processed = 0
+        while self.jobs:
+            # No redelivery here, so every run is the last attempt
+            process_queued_job(self.jobs.pop(0), final_attempt=True)
+            processed += 1
+        return processed
+
+# Async extraction is only available when a queue is configured
+extraction_queue: Optional[ExtractionQueue] = (
+    SqsExtractionQueue(os.environ['EXTRACTION_QUEUE_URL']) if os.getenv('EXTRACTION_QUEUE_URL') else None
+)
 
 class DecimalEncoder(json.JSONEncoder):
     """JSON encoder that handles Decimal types"""
@@ -29,57 +320,223 @@ class DecimalEncoder(json.JSONEncoder):
             return str(obj)
         return super(DecimalEncoder, self).default(obj)
 
+def decimal_to_json_string(obj: Any) -> str:
+    """orjson default matching DecimalEncoder: Decimals are written as strings"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 def safe_json_dumps(obj: Any) -> str:
     """Safely convert an object to JSON string, handling Decimal types"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=decimal_to_json_string).decode('utf-8')
+        except TypeError:
+            # orjson rejects a few things json accepts, such as integers wider than 64 bits
+            pass
     return json.dumps(obj, cls=DecimalEncoder)
 
+def decimal_to_json_number(obj: Any) -> Union[int, float]:
+    """json.dumps default that writes Decimals as numbers, so they load back unchanged with parse_float=Decimal"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def encode_stored_json(obj: Any) -> str:
+    """Serialize data for caches, queues and blobs, keeping Decimals as JSON numbers"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=decimal_to_json_number).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, default=decimal_to_json_number, separators=(',', ':'))
+
+def decode_stored_json(raw: Union[str, bytes]) -> Any:
+    """Parse JSON with fractional numbers read straight into Decimal, ready for DynamoDB"""
+    return json.loads(raw, parse_float=Decimal)
+
 def convert_floats_to_decimals(obj: Any) -> Any:
-    """Recursively convert float values to Decimal for DynamoDB compatibility"""
+    """Recursively convert float values to Decimal for DynamoDB compatibility
+
+    Containers holding no floats are returned as they are rather than rebuilt, so
+    data that is already DynamoDB-ready costs a single walk and no copies.
+    """
     try:
         if isinstance(obj, float):
             return Decimal(str(obj))
         elif isinstance(obj, dict):
-            return {k: convert_floats_to_decimals(v) for k, v in obj.items()}
+            converted = None
+            for k, v in obj.items():
+                new_value = convert_floats_to_decimals(v)
+                if new_value is not v:
+                    if converted is None:
+                        converted = dict(obj)
+                    converted[k] = new_value
+            return obj if converted is None else converted
         elif isinstance(obj, list):
-            return [convert_floats_to_decimals(x) for x in obj]
+            converted = None
+            for index, x in enumerate(obj):
+                new_value = convert_floats_to_decimals(x)
+                if new_value is not x:
+                    if converted is None:
+                        converted = list(obj)
+                    converted[index] = new_value
+            return obj if converted is None else converted
         return obj
     except (ValueError, DecimalException) as e:
         logger.warning(f"Error converting to Decimal: {str(e)}")
         return str(obj)
 
-# Pydantic models for structured output
-class FormFieldValue(RootModel):
-    """Model for form field values"""
-    root: Dict[str, Any]
+# Bump EXTRACTION_PROMPT_VERSION whenever the extraction prompt or post-processing changes so cached results are not reused
+EXTRACTION_MODEL = 'gpt-3.5-turbo'
+EXTRACTION_PROMPT_VERSION = '2'
+
+# Conversations longer than EXTRACTION_CHUNK_CHARS are extracted in overlapping chunks (0 disables)
+EXTRACTION_CHUNK_CHARS = int(os.getenv('EXTRACTION_CHUNK_CHARS', '12000'))
+EXTRACTION_CHUNK_OVERLAP_CHARS = int(os.getenv('EXTRACTION_CHUNK_OVERLAP_CHARS', '1000'))
+EXTRACTION_MAX_CONCURRENCY = int(os.getenv('EXTRACTION_MAX_CONCURRENCY', '8'))
+# Templates with more fields than this are extracted in parallel shards (0 disables)
+EXTRACTION_MAX_FIELDS_PER_CALL = int(os.getenv('EXTRACTION_MAX_FIELDS_PER_CALL', '40'))
+CHUNK_CONFIDENCE_MARGIN = 0.05
+# Incremental re-extraction re-asks fields below this confidence and re-reads this much seen context
+INCREMENTAL_RECHECK_CONFIDENCE = Decimal(os.getenv('INCREMENTAL_RECHECK_CONFIDENCE', '0.9'))
+INCREMENTAL_CONTEXT_CHARS = int(os.getenv('INCREMENTAL_CONTEXT_CHARS', '500'))
+COMPILED_TEMPLATE_CACHE_MAX_ENTRIES = int(os.getenv('COMPILED_TEMPLATE_CACHE_MAX_ENTRIES', '64'))
+# Extracted values need more than this confidence to be stored; template fields can set minConfidence
+EXTRACTION_MIN_CONFIDENCE = float(os.getenv('EXTRACTION_MIN_CONFIDENCE', '0.8'))
+# openai: every field goes to the LLM; local: rules only, no LLM; routed: rules first, the rest to the LLM
+EXTRACTION_BACKEND = os.getenv('EXTRACTION_BACKEND', 'openai')
+# Bump LOCAL_RULES_VERSION whenever the local rules change so cached results are not reused
+LOCAL_RULES_VERSION = '2'
+# How far after a field's label the local rules look for its value
+LOCAL_VALUE_WINDOW_CHARS = 80
+# Confidence of a vital found somewhere in that window rather than right after its label; at or
+# below EXTRACTION_MIN_CONFIDENCE, so routed extraction asks the LLM for the field instead
+LOCAL_LOOSE_MATCH_CONFIDENCE = float(os.getenv('LOCAL_LOOSE_MATCH_CONFIDENCE', '0.5'))
+
+# Pydantic models for structured output, defined by load_extraction_models on first extraction
+FormFieldValue = None
+FormFieldExtraction = None
+FormResponse = None
+extraction_models_lock = threading.Lock()
+
+def load_extraction_models() -> None:
+    """Define the pydantic models, keeping pydantic out of cold starts that never extract"""
+    global FormFieldValue, FormFieldExtraction, FormResponse
+    if FormResponse is not None:
+        return
+    with extraction_models_lock:
+        if FormResponse is not None:
+            return
+        from pydantic import BaseModel, Field, RootModel
+
+        class FormFieldValue(RootModel):
+            """Model for form field values"""
+            root: Dict[str, Any]
+
+        class FormFieldExtraction(BaseModel):
+            """Model for field extraction results with optional value"""
+            value: Optional[Any] = None
+            source_quote: Optional[str] = None
+            confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+        class FormResponse(BaseModel):
+            """Model for the complete form response"""
+            fields: Dict[str, FormFieldExtraction]
 
-class FormFieldExtraction(BaseModel):
-    """Model for field extraction results with optional value"""
-    value: Optional[Any] = None
-    source_quote: Optional[str] = None
-    confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+NUMBER_FIELD_TYPES = ('number', 'scale')
+TEXT_FIELD_TYPES = ('text', 'textarea', 'rich_text', 'tel', 'email', 'short_text', 'long_text', 'date', 'time')
+SINGLE_OPTION_FIELD_TYPES = ('select', 'radio', 'multiple_choice')
+MULTI_OPTION_FIELD_TYPES = ('multiple_select', 'checkbox_group', 'checkbox')
+NUMBER_VALUE_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
 
-class FormResponse(BaseModel):
-    """Model for the complete form response"""
-    fields: Dict[str, FormFieldExtraction]
+def normalize_field_key(text: str) -> str:
+    """Lowercase a field id part or label and drop everything but letters and digits"""
+    return re.sub(r'[^a-z0-9]', '', text.lower())
 
-def convert_value_for_field_type(value: Any, field_type: str) -> Any:
-    """Convert extracted value to appropriate type based on field type"""
+def convert_number(value: Any) -> Optional[Decimal]:
+    """Decimal for a number or numeric string such as '75 kg' or '1,200'; None if there is no number"""
+    if isinstance(value, (bool, list, dict)):
+        return None
+    if isinstance(value, Decimal):
+        return value if value.is_finite() else None
+    if isinstance(value, (int, float)):
+        number = Decimal(str(value))
+        return number if number.is_finite() else None
+    match = NUMBER_VALUE_PATTERN.search(str(value).replace(',', ''))
+    return Decimal(match.group(0)) if match else None
+
+def option_lookup(options: Optional[List[Any]]) -> Optional[Dict[str, Any]]:
+    """Map case- and whitespace-insensitive option text to the option as the template spells it"""
+    if not options:
+        return None
+    return {str(option).strip().lower(): option for option in options}
+
+def convert_table_rows(value: Any, columns: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """Rows keyed by column id (the model may use labels), typed by column type, empty rows dropped"""
+    column_ids = {}
+    for column in columns:
+        column_ids[normalize_field_key(str(column['id']))] = column
+        if column.get('label'):
+            column_ids.setdefault(normalize_field_key(str(column['label'])), column)
+    rows = []
+    for row in (value if isinstance(value, list) else [value]):
+        if not isinstance(row, dict):
+            continue
+        converted = {}
+        for key, cell in row.items():
+            column = column_ids.get(normalize_field_key(str(key)))
+            if column is None or cell is None:
+                continue
+            cell = (
+                convert_value_for_field_type(cell, column['type'], option_lookup(column.get('options')))
+                if column.get('type') else convert_floats_to_decimals(cell)
+            )
+            if cell is not None:
+                converted[column['id']] = cell
+        if converted:
+            rows.append(converted)
+    return rows or None
+
+def convert_value_for_field_type(value: Any, field_type: str, options: Optional[Dict[str, Any]] = None,
+                                 columns: Optional[List[Dict[str, Any]]] = None) -> Any:
+    """Convert an extracted value to the field's type; None when it cannot be represented
+
+    options is an option_lookup of the allowed values; values outside it are dropped.
+    """
     try:
-        if field_type == 'number':
-            if isinstance(value, (float, int)):
-                return Decimal(str(value))
-            return str(value)
-        elif field_type in ['select', 'text', 'textarea', 'rich_text', 'tel', 'email']:
-            return str(value) if not isinstance(value, list) else ', '.join(map(str, value))
-        elif field_type in ['multiple_select', 'checkbox_group']:
-            return value if isinstance(value, list) else [str(value)]
-        elif field_type == 'table':
-            table_data = value if isinstance(value, list) else [value]
-            return convert_floats_to_decimals(table_data)
-        return value
+        if value is None:
+            return None
+        if field_type in NUMBER_FIELD_TYPES:
+            return convert_number(value)
+        if field_type in SINGLE_OPTION_FIELD_TYPES and options:
+            if isinstance(value, list):
+                if len(value) != 1:
+                    return None
+                value = value[0]
+            return options.get(str(value).strip().lower())
+        if field_type in MULTI_OPTION_FIELD_TYPES and options:
+            items = value if isinstance(value, list) else str(value).split(',')
+            selected = []
+            for item in items:
+                option = options.get(str(item).strip().lower())
+                if option is not None and option not in selected:
+                    selected.append(option)
+            return selected or None
+        if field_type in ('multiple_select', 'checkbox_group'):
+            return [str(item) for item in value] if isinstance(value, list) else [str(value)]
+        if field_type == 'table':
+            return convert_table_rows(value, columns) if columns else convert_floats_to_decimals(
+                value if isinstance(value, list) else [value]
+            )
+        if field_type in TEXT_FIELD_TYPES or field_type in SINGLE_OPTION_FIELD_TYPES:
+            if isinstance(value, list):
+                return ', '.join(map(str, value))
+            return str(value) if not isinstance(value, dict) else None
+        return convert_floats_to_decimals(value)
     except Exception as e:
         logger.error(f"Error converting value {value} for type {field_type}: {str(e)}")
-        return str(value)
+        return None
 
 def get_example_value(field_type: str, options: Optional[List[str]] = None) -> str:
     """Generate example values based on field type"""
@@ -99,16 +556,22 @@ def get_example_value(field_type: str, options: Optional[List[str]] = None) -> s
         return "detailed text"
     return "value"
 
-def process_fields(fields: List[Dict[str, Any]], prefix: str = "") -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    """Process fields recursively and collect both field types and example formats"""
+def process_fields(fields: List[Dict[str, Any]], prefix: str = "",
+                   parent_path: tuple = ()) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Process fields recursively and collect both field types and example formats
+
+    Each field's path is the tuple of section, group and field ids leading to it, so
+    ids that themselves contain dots still land in the right place.
+    """
     field_info = []
     field_types = {}
     
     for field in fields:
         current_id = f"{prefix}{field['id']}" if prefix else field['id']
+        path = (*parent_path, field['id'])
         
         if field['type'] in ['section', 'group'] and 'fields' in field:
-            nested_info, nested_types = process_fields(field['fields'], f"{current_id}.")
+            nested_info, nested_types = process_fields(field['fields'], f"{current_id}.", path)
             field_info.extend(nested_info)
             field_types.update(nested_types)
         elif field['type'] == 'table' and 'columns' in field:
@@ -118,9 +581,11 @@ def process_fields(fields: List[Dict[str, Any]], prefix: str = "") -> tuple[List
             }
             field_info.append({
                 'id': current_id,
+                'path': path,
                 'type': 'table',
                 'label': field['label'],
                 'columns': field['columns'],
+                'minConfidence': field.get('minConfidence'),
                 'example': [
                     {col['id']: f"value for {col['label']}" for col in field['columns']}
                 ]
@@ -130,58 +595,158 @@ def process_fields(fields: List[Dict[str, Any]], prefix: str = "") -> tuple[List
             example_value = get_example_value(field['type'], field.get('options', None))
             field_info.append({
                 'id': current_id,
+                'path': path,
                 'type': field['type'],
                 'label': field['label'],
                 'options': field.get('options', None),
+                'minConfidence': field.get('minConfidence'),
+                'scale': (field.get('scaleStart'), field.get('scaleEnd')) if field['type'] == 'scale' else None,
                 'example': example_value
             })
     
     return field_info, field_types
 
-def extract_form_data(template_fields: Dict[str, Any], conversation_text: str) -> Dict[str, Any]:
-    """Extract form data based on template fields structure"""
-    try:
-        logger.info("Starting form data extraction")
-        
-        # Convert template fields to the format expected by OpenAI
-        field_info = []
-        for section_name, section_fields in template_fields.items():
-            for field_id, field_config in section_fields.items():
-                field_info.append({
-                    'id': f"{section_name}.{field_id}",
-                    'type': field_config['type'],
-                    'label': field_config['label'],
-                    'required': field_config.get('required', False)
-                })
+class ExtractionCache(ABC):
+    """Cache of extract_form_data results keyed by extraction_cache_key"""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
 
-        field_descriptions = """Extract information from the conversation following these rules:
-1. Only include fields where information is explicitly mentioned
-2. Skip fields where no relevant information is found
-3. For each found field, provide:
-   - value: The extracted information (numbers should be without units)
-   - source_quote: The exact text from conversation
-   - confidence: A number between 0.0 and 1.0
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
 
-Fields to extract:\n"""
-        field_descriptions += "\n".join([
-            f"- {field['label']} (ID: {field['id']}, Type: {field['type']})"
-            for field in field_info
-        ])
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        ...
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+class MemoryExtractionCache(ExtractionCache):
+    """Per-container LRU cache with a TTL"""
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        # Stored serialized so callers never share a mutable result
+        return decode_stored_json(entry[1])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl_seconds, encode_stored_json(value))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+class DynamoExtractionCache(ExtractionCache):
+    """Cache shared across containers; expiresAt is the table's TTL attribute"""
+    def __init__(self, table_name: str, ttl_seconds: int):
+        super().__init__()
+        self.table = LazyResource(lambda: dynamodb.Table(table_name))
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self.table.get_item(Key={'cacheKey': key}).get('Item')
+        # DynamoDB TTL deletion is lazy, so check expiry ourselves
+        if not item or item['expiresAt'] < int(time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode_stored_json(item['result'])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.table.put_item(Item={
+            'cacheKey': key,
+            'result': encode_stored_json(value),
+            'expiresAt': int(time.time()) + self.ttl_seconds
+        })
+
+class TieredExtractionCache(ExtractionCache):
+    """Checks the in-memory tier first, then the shared tier"""
+    def __init__(self, tiers: List[ExtractionCache]):
+        super().__init__()
+        self.tiers = tiers
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        for index, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                logger.warning(f"Extraction cache read failed: {str(e)}")
+                continue
+            if value is not None:
+                for faster_tier in self.tiers[:index]:
+                    faster_tier.set(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
 
-        completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are a precise medical form data extraction assistant.
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        for tier in self.tiers:
+            try:
+                tier.set(key, value)
+            except Exception as e:
+                logger.warning(f"Extraction cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        for tier in self.tiers:
+            name = type(tier).__name__
+            stats[f"{name}.hits"] = tier.hits
+            stats[f"{name}.misses"] = tier.misses
+        return stats
+
+def build_extraction_cache() -> Optional[ExtractionCache]:
+    """Build the extraction cache from environment settings"""
+    if os.getenv('EXTRACTION_CACHE_ENABLED', 'true').lower() != 'true':
+        return None
+    ttl_seconds = int(os.getenv('EXTRACTION_CACHE_TTL_SECONDS', '86400'))
+    tiers = [MemoryExtractionCache(int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', '256')), ttl_seconds)]
+    if os.getenv('EXTRACTION_CACHE_TABLE'):
+        tiers.append(DynamoExtractionCache(os.environ['EXTRACTION_CACHE_TABLE'], ttl_seconds))
+    return TieredExtractionCache(tiers)
+
+extraction_cache = build_extraction_cache()
+
+def extraction_cache_key(template_version: str, conversation_text: str) -> str:
+    """Content hash of everything that determines an extraction result"""
+    payload = json.dumps({
+        'conversation': ' '.join(conversation_text.split()),
+        'template': template_version,
+        'model': extraction_backend.name,
+        'promptVersion': EXTRACTION_PROMPT_VERSION
+    }, sort_keys=True, separators=(',', ':'), cls=DecimalEncoder)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def build_extraction_messages(field_descriptions: str, conversation_text: str) -> List[Dict[str, str]]:
+    """Build the chat messages for an extraction request"""
+    return [
+        {
+            "role": "system",
+            "content": """You are a precise medical form data extraction assistant.
 Extract only explicitly mentioned information.
 Skip any fields where information is not found.
 Return numeric values without units (e.g., '75' instead of '75 kg').
 Only include confidence scores where you are highly confident (>0.8)."""
-                },
-                {
-                    "role": "user",
-                    "content": f"""Extract available information from this conversation:
+        },
+        {
+            "role": "user",
+            "content": f"""Extract available information from this conversation:
 
 {field_descriptions}
 
@@ -198,27 +763,766 @@ Format the response as JSON:
         }}
     }}
 }}"""
-                }
-            ],
+        }
+    ]
+
+# OpenAI call policy: per-attempt timeouts bounded by the invocation deadline, jittered
+# retries on 429/5xx/timeouts, optional hedging, and a per-container circuit breaker
+LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv('LLM_ATTEMPT_TIMEOUT_SECONDS', '20'))
+LLM_MAX_ATTEMPTS = int(os.getenv('LLM_MAX_ATTEMPTS', '3'))
+LLM_RETRY_BASE_SECONDS = float(os.getenv('LLM_RETRY_BASE_SECONDS', '0.5'))
+LLM_RETRY_MAX_SECONDS = float(os.getenv('LLM_RETRY_MAX_SECONDS', '8'))
+# Kept back from the invocation deadline so the form can still be saved without extraction
+LLM_DEADLINE_RESERVE_SECONDS = float(os.getenv('LLM_DEADLINE_RESERVE_SECONDS', '3'))
+# API Gateway gives up on HTTP requests after 29s whatever the Lambda timeout is
+HTTP_REQUEST_TIMEOUT_SECONDS = float(os.getenv('HTTP_REQUEST_TIMEOUT_SECONDS', '29'))
+# Hedging sends a second request once the first has run longer than the recent p95
+LLM_HEDGING_ENABLED = os.getenv('LLM_HEDGING_ENABLED', 'false').lower() == 'true'
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv('LLM_HEDGE_DEFAULT_DELAY_SECONDS', '5'))
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_BREAKER_WINDOW_SECONDS = float(os.getenv('LLM_BREAKER_WINDOW_SECONDS', '60'))
+LLM_BREAKER_MIN_CALLS = int(os.getenv('LLM_BREAKER_MIN_CALLS', '10'))
+LLM_BREAKER_ERROR_RATE = float(os.getenv('LLM_BREAKER_ERROR_RATE', '0.5'))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv('LLM_BREAKER_COOLDOWN_SECONDS', '30'))
+
+class LLMUnavailableError(Exception):
+    """The LLM could not answer in time; forms are saved without extraction, other routes return 503"""
+
+# time.monotonic() by which the current invocation must respond, set by lambda_handler
+invocation_deadline: Optional[float] = None
+
+def set_invocation_deadline(context: Any, http_request: bool) -> None:
+    """Derive the invocation deadline from the Lambda context (and the API Gateway limit for HTTP)"""
+    global invocation_deadline
+    remaining = [HTTP_REQUEST_TIMEOUT_SECONDS] if http_request else []
+    if hasattr(context, 'get_remaining_time_in_millis'):
+        remaining.append(context.get_remaining_time_in_millis() / 1000)
+    invocation_deadline = time.monotonic() + min(remaining) if remaining else None
+
+def remaining_llm_budget() -> Optional[float]:
+    """Seconds left for LLM calls in this invocation, or None when there is no deadline"""
+    if invocation_deadline is None:
+        return None
+    return invocation_deadline - time.monotonic() - LLM_DEADLINE_RESERVE_SECONDS
+
+class LatencyWindow:
+    """Latencies of recent successful LLM calls, used to pick the hedging delay"""
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self.lock:
+            if len(self.samples) < LLM_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+class CircuitBreaker:
+    """Opens when too many recent calls failed, then lets a single trial call through after a cooldown
+
+    State is per container, so each warm container trips on its own traffic.
+    """
+    def __init__(self, window_seconds: float, min_calls: int, error_rate: float, cooldown_seconds: float):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.outcomes = deque()
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown_seconds or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def release(self) -> None:
+        """Give back a half-open trial slot whose call ended without an outcome"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record(self, success: bool) -> None:
+        now = time.monotonic()
+        with self.lock:
+            if self.opened_at is not None:
+                if not self.trial_in_flight:
+                    return
+                # Half-open trial decides whether to close again
+                self.trial_in_flight = False
+                self.opened_at = None if success else now
+                self.outcomes.clear()
+                if success:
+                    logger.info("LLM circuit breaker closed")
+                return
+            self.outcomes.append((now, success))
+            while self.outcomes and self.outcomes[0][0] < now - self.window_seconds:
+                self.outcomes.popleft()
+            failures = sum(1 for _, ok in self.outcomes if not ok)
+            if len(self.outcomes) >= self.min_calls and failures / len(self.outcomes) >= self.error_rate:
+                self.opened_at = now
+                logger.warning(f"LLM circuit breaker opened: {failures}/{len(self.outcomes)} recent calls failed")
+
+llm_latencies = LatencyWindow()
+llm_breaker = CircuitBreaker(
+    LLM_BREAKER_WINDOW_SECONDS, LLM_BREAKER_MIN_CALLS, LLM_BREAKER_ERROR_RATE, LLM_BREAKER_COOLDOWN_SECONDS
+)
+llm_executor = ThreadPoolExecutor(max_workers=EXTRACTION_MAX_CONCURRENCY * 2)
+
+def is_retryable_llm_error(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying"""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return type(error).__name__ in ('APITimeoutError', 'APIConnectionError') or isinstance(
+        error, (TimeoutError, ConnectionError)
+    )
+
+def llm_retry_delay(attempt: int, error: Exception) -> float:
+    """Full-jitter exponential backoff, honouring a Retry-After header when the provider sends one"""
+    response = getattr(error, 'response', None)
+    retry_after = getattr(response, 'headers', {}).get('retry-after') if response is not None else None
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), LLM_RETRY_MAX_SECONDS)
+    except ValueError:
+        pass
+    return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * (2 ** attempt)))
+
+def llm_attempt(request: Dict[str, Any], timeout: float) -> Any:
+    """One chat completion request with a hard timeout"""
+    started = time.monotonic()
+    result = get_openai_client().chat.completions.create(**request, timeout=timeout)
+    if not request.get('stream'):
+        llm_latencies.add(time.monotonic() - started)
+    return result
+
+def hedged_llm_attempt(request: Dict[str, Any], timeout: float) -> Any:
+    """Send the request, and a second copy if the first is slower than the recent p95; first answer wins"""
+    delay = llm_latencies.percentile(95) or LLM_HEDGE_DEFAULT_DELAY_SECONDS
+    if delay >= timeout:
+        return llm_attempt(request, timeout)
+    primary = llm_executor.submit(llm_attempt, request, timeout)
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeoutError:
+        if primary.done():
+            raise
+
+    request_metrics.add('OpenAIHedges')
+    logger.info(f"LLM request slower than {delay:.2f}s, sending a hedge request")
+    # The slower request cannot be cancelled mid-flight; its answer is discarded
+    hedge = llm_executor.submit(llm_attempt, request, timeout - delay)
+    errors = []
+    for future in as_completed([primary, hedge]):
+        try:
+            return future.result()
+        except Exception as e:
+            errors.append(e)
+    raise errors[0]
+
+def call_llm(**request) -> Any:
+    """chat.completions.create with deadlines, jittered retries, optional hedging and a circuit breaker
+
+    Raises LLMUnavailableError when the breaker is open, the invocation is out of
+    time, or retryable errors persist; other errors (bad requests) are raised as is.
+    """
+    hedge = LLM_HEDGING_ENABLED and not request.get('stream')
+    last_error = None
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        # Check the deadline first, so a half-open trial slot is only taken by a call that runs
+        budget = remaining_llm_budget()
+        if budget is not None and budget <= 0:
+            raise LLMUnavailableError("No time left for extraction before the request deadline") from last_error
+        if not llm_breaker.allow():
+            request_metrics.add('OpenAIBreakerRejections')
+            raise LLMUnavailableError("Extraction service is temporarily unavailable")
+        timeout = LLM_ATTEMPT_TIMEOUT_SECONDS if budget is None else min(LLM_ATTEMPT_TIMEOUT_SECONDS, budget)
+
+        try:
+            result = hedged_llm_attempt(request, timeout) if hedge else llm_attempt(request, timeout)
+        except Exception as e:
+            if not is_retryable_llm_error(e):
+                # The provider answered, so this says nothing about its health
+                llm_breaker.record(True)
+                raise
+            llm_breaker.record(False)
+            request_metrics.add('OpenAIErrors')
+            last_error = e
+        except BaseException:
+            llm_breaker.release()
+            raise
+        else:
+            llm_breaker.record(True)
+            return result
+
+        if attempt + 1 < LLM_MAX_ATTEMPTS:
+            delay = llm_retry_delay(attempt, last_error)
+            budget = remaining_llm_budget()
+            if budget is not None and delay >= budget:
+                break
+            logger.warning(f"LLM call failed ({str(last_error)}), retrying in {delay:.2f}s")
+            request_metrics.add('OpenAIRetries')
+            time.sleep(delay)
+    raise LLMUnavailableError(f"Extraction failed: {str(last_error)}") from last_error
+
+def request_extraction(field_descriptions: str, conversation_text: str) -> 'FormResponse':
+    """Run a single extraction completion over a conversation or a chunk of one"""
+    load_extraction_models()
+    with request_metrics.timer('OpenAIMs'):
+        completion = call_llm(
+            model=EXTRACTION_MODEL,
+            messages=build_extraction_messages(field_descriptions, conversation_text),
             response_format={"type": "json_object"}
         )
+    request_metrics.add('OpenAICalls')
+    usage = getattr(completion, 'usage', None)
+    if usage is not None:
+        request_metrics.add('PromptTokens', usage.prompt_tokens or 0)
+        request_metrics.add('CompletionTokens', usage.completion_tokens or 0)
+    
+    response_content = completion.choices[0].message.content
+    logger.debug(f"Raw OpenAI response: {response_content}")
+    
+    with request_metrics.timer('ValidationMs'):
+        return FormResponse.model_validate_json(response_content)
+
+def split_conversation(conversation_text: str, chunk_chars: int, overlap_chars: int) -> List[str]:
+    """Split a transcript into overlapping windows, preferring line or word boundaries"""
+    overlap_chars = min(overlap_chars, chunk_chars // 2)
+    chunks = []
+    start = 0
+    length = len(conversation_text)
+    while start < length:
+        end = min(start + chunk_chars, length)
+        if end < length:
+            # Break on the last newline (or space) that still leaves room for progress
+            boundary = conversation_text.rfind('\n', start + overlap_chars + 1, end)
+            if boundary == -1:
+                boundary = conversation_text.rfind(' ', start + overlap_chars + 1, end)
+            if boundary != -1:
+                end = boundary
+        chunks.append(conversation_text[start:end])
+        if end >= length:
+            break
+        start = end - overlap_chars
+    return chunks
+
+def merge_chunk_extractions(chunk_results: List['FormResponse']) -> Dict[str, 'FormFieldExtraction']:
+    """Merge per-chunk results field by field, by confidence and then recency
+
+    Chunks are in transcript order. A later mention replaces an earlier one unless the
+    earlier one is clearly more confident, since clinicians correct themselves as they go.
+    """
+    merged = {}
+    for result in chunk_results:
+        for field_id, field_data in result.fields.items():
+            if field_data.value is None:
+                continue
+            current = merged.get(field_id)
+            if current is None or (field_data.confidence or 0) >= (current.confidence or 0) - CHUNK_CONFIDENCE_MARGIN:
+                merged[field_id] = field_data
+    return merged
+
+def template_fields_as_list(template_fields: Any) -> List[Dict[str, Any]]:
+    """Normalize {section: {field: config}} template fields to the list form process_fields walks"""
+    if isinstance(template_fields, list):
+        return template_fields
+    return [
+        {
+            'id': section_name,
+            'type': 'section',
+            'fields': [{**field_config, 'id': field_id} for field_id, field_config in section_fields.items()]
+        }
+        for section_name, section_fields in template_fields.items()
+    ]
+
+class FieldPlan:
+    """How one template field's extracted value is checked, coerced and stored"""
+    __slots__ = ('path', 'field_type', 'options', 'columns', 'bounds', 'min_confidence')
+
+    def __init__(self, field: Dict[str, Any]):
+        self.path = field['path']
+        self.field_type = field['type']
+        self.options = option_lookup(field.get('options'))
+        self.columns = field.get('columns')
+        # Templates are client-written: bounds and thresholds may be strings, missing or junk
+        scale = field.get('scale') or (None, None)
+        self.bounds = tuple(convert_number(bound) if bound is not None else None for bound in scale)
+        min_confidence = convert_number(field.get('minConfidence')) if field.get('minConfidence') is not None else None
+        self.min_confidence = float(min_confidence) if min_confidence is not None else EXTRACTION_MIN_CONFIDENCE
+
+    def coerce(self, field_data: 'FormFieldExtraction') -> Any:
+        """The value to store for a confident extraction, or None to drop it; never raises"""
+        if field_data.value is None or not field_data.confidence or field_data.confidence <= self.min_confidence:
+            return None
+        value = convert_value_for_field_type(field_data.value, self.field_type, self.options, self.columns)
+        if isinstance(value, Decimal):
+            low, high = self.bounds
+            if (low is not None and value < low) or (high is not None and value > high):
+                return None
+        return value
+
+def set_nested_value(nested_data: Dict[str, Any], path: tuple, value: Any) -> None:
+    """Set a value in nested form data, creating sections and groups along the path"""
+    target = nested_data
+    for part in path[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    target[path[-1]] = value
+
+def apply_extracted_fields(nested_data: Dict[str, Any], extracted_fields: Dict[str, 'FormFieldExtraction'],
+                           compiled: 'CompiledTemplate', field_ids: Optional[set] = None) -> Dict[str, float]:
+    """Coerce and store a whole extraction in one pass over the compiled field plans
+
+    Only fields in field_ids are applied when it is given. Returns the confidence of
+    every field stored; unknown fields, low confidence and values that do not fit the
+    field's type or options are dropped and counted.
+    """
+    plans = compiled.plans
+    stored = {}
+    dropped = 0
+    for field_id, field_data in extracted_fields.items():
+        plan = plans.get(field_id)
+        if plan is None or (field_ids is not None and field_id not in field_ids):
+            continue
+        value = plan.coerce(field_data)
+        if value is None:
+            dropped += field_data.value is not None
+            continue
+        set_nested_value(nested_data, plan.path, value)
+        stored[field_id] = field_data.confidence
+    if dropped:
+        request_metrics.add('ExtractedFieldsDropped', dropped)
+    return stored
+
+def get_nested_value(nested_data: Dict[str, Any], path: tuple) -> Any:
+    """Look up a value in nested form data by field path, or None when absent"""
+    value = nested_data
+    for part in path:
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+def build_field_descriptions(field_info: List[Dict[str, Any]]) -> str:
+    """Build the field list portion of the extraction prompt"""
+    field_descriptions = """Extract information from the conversation following these rules:
+1. Only include fields where information is explicitly mentioned
+2. Skip fields where no relevant information is found
+3. For each found field, provide:
+   - value: The extracted information (numbers should be without units)
+   - source_quote: The exact text from conversation
+   - confidence: A number between 0.0 and 1.0
+
+Fields to extract:\n"""
+    field_descriptions += "\n".join([
+        f"- {field['label']} (ID: {field['id']}, Type: {field['type']})"
+        for field in field_info
+    ])
+    return field_descriptions
+
+def shard_field_info(field_info: List[Dict[str, Any]], max_fields_per_call: int) -> List[List[Dict[str, Any]]]:
+    """Group fields into shards of at most max_fields_per_call, keeping sections together where they fit"""
+    if not max_fields_per_call or len(field_info) <= max_fields_per_call:
+        return [field_info]
+
+    sections = OrderedDict()
+    for field in field_info:
+        sections.setdefault(field['id'].split('.')[0], []).append(field)
+
+    shards = []
+    current = []
+    for section_fields in sections.values():
+        if current and len(current) + len(section_fields) > max_fields_per_call:
+            shards.append(current)
+            current = []
+        # Oversized sections are split across shards of their own
+        for start in range(0, len(section_fields), max_fields_per_call):
+            part = section_fields[start:start + max_fields_per_call]
+            if len(current) + len(part) > max_fields_per_call:
+                shards.append(current)
+                current = []
+            current.extend(part)
+    if current:
+        shards.append(current)
+    return shards
+
+class CompiledTemplate:
+    """Everything extraction needs from a template, built once per template version
+
+    Holds the flattened field index (nested sections and groups become dotted ids),
+    the field path and extraction plan of each id, and the prompt text for the whole
+    template and for each shard. The prompt text is byte-stable for a given
+    version so provider-side prompt caching can hit.
+    """
+    def __init__(self, template_fields: Any, version: str):
+        self.version = version
+        self._index(process_fields(template_fields_as_list(template_fields))[0])
+
+    def _index(self, field_info: List[Dict[str, Any]]) -> None:
+        self.field_info = field_info
+        self.paths = {field['id']: field['path'] for field in self.field_info}
+        self.plans = {field['id']: FieldPlan(field) for field in self.field_info}
+        self.prompt = build_field_descriptions(self.field_info)
+        self.shards = shard_field_info(self.field_info, EXTRACTION_MAX_FIELDS_PER_CALL)
+        self.shard_prompts = (
+            [build_field_descriptions(shard) for shard in self.shards] if len(self.shards) > 1 else [self.prompt]
+        )
+
+    def subset(self, field_ids: List[str]) -> 'CompiledTemplate':
+        """A view of this template restricted to some fields, compiled on the fly"""
+        wanted = set(field_ids)
+        subset = object.__new__(CompiledTemplate)
+        subset.version = f"{self.version}#subset"
+        subset._index([field for field in self.field_info if field['id'] in wanted])
+        return subset
+
+compiled_templates = OrderedDict()
+compiled_templates_lock = threading.Lock()
+
+def template_fields_version(template_fields: Any) -> str:
+    """Content fingerprint for template fields sent without a stored template version"""
+    payload = json.dumps(template_fields, sort_keys=True, separators=(',', ':'), cls=DecimalEncoder)
+    return f"fields:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def stored_template_version(template: Dict[str, Any]) -> str:
+    """Version key for a stored template
+
+    updatedAt has one-second resolution, so the fields' content hash is part of
+    the key too: two updates within a second must not share compiled templates
+    or cached extractions.
+    """
+    fields_hash = template_fields_version(template.get('fields', [])).split(':', 1)[1]
+    return f"template:{template['userId']}:{template['templateId']}:{template.get('updatedAt', 0)}:{fields_hash}"
+
+def get_compiled_template(template_fields: Any, version: Optional[str] = None) -> CompiledTemplate:
+    """Get the compiled artifact for a template version, compiling it on first use"""
+    version = version or template_fields_version(template_fields)
+    with compiled_templates_lock:
+        compiled = compiled_templates.get(version)
+        if compiled is not None:
+            compiled_templates.move_to_end(version)
+            request_metrics.add('CompiledTemplateCacheHits')
+            return compiled
+
+    request_metrics.add('CompiledTemplateCacheMisses')
+
+    compiled = CompiledTemplate(template_fields, version)
+    with compiled_templates_lock:
+        compiled_templates[version] = compiled
+        while len(compiled_templates) > COMPILED_TEMPLATE_CACHE_MAX_ENTRIES:
+            compiled_templates.popitem(last=False)
+    logger.info(f"Compiled template {version} with {len(compiled.field_info)} fields")
+    return compiled
+
+def extract_fields_parallel(compiled: CompiledTemplate, conversation_text: str) -> Dict[str, 'FormFieldExtraction']:
+    """Extract every field shard from every conversation chunk concurrently, then merge
+
+    Shards cover disjoint fields, so merging across shards is a union; within a field,
+    chunk results are merged by merge_chunk_extractions in transcript order.
+    """
+    shards = compiled.shards
+    shard_descriptions = compiled.shard_prompts
+    if EXTRACTION_CHUNK_CHARS and len(conversation_text) > EXTRACTION_CHUNK_CHARS:
+        chunks = split_conversation(conversation_text, EXTRACTION_CHUNK_CHARS, EXTRACTION_CHUNK_OVERLAP_CHARS)
+    else:
+        chunks = [conversation_text]
+
+    if len(shards) == 1 and len(chunks) == 1:
+        return request_extraction(compiled.prompt, conversation_text).fields
+
+    logger.info(
+        f"Extracting {len(compiled.field_info)} fields in {len(shards)} shards from {len(chunks)} chunks "
+        f"of a {len(conversation_text)} character conversation"
+    )
+
+    def run_job(job):
+        shard_index, chunk_index = job
+        started = time.perf_counter()
+        result = request_extraction(shard_descriptions[shard_index], chunks[chunk_index])
+        logger.info(
+            f"Extraction shard {shard_index + 1}/{len(shards)} chunk {chunk_index + 1}/{len(chunks)}: "
+            f"{len(shards[shard_index])} fields requested, {len(result.fields)} returned "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return result
+
+    # Chunk-major order so merge_chunk_extractions sees results in transcript order
+    jobs = [(shard_index, chunk_index) for chunk_index in range(len(chunks)) for shard_index in range(len(shards))]
+    with ThreadPoolExecutor(max_workers=min(EXTRACTION_MAX_CONCURRENCY, len(jobs))) as executor:
+        results = list(executor.map(run_job, jobs))
+    return merge_chunk_extractions(results)
+
+# Vitals recognised by their label or field id; (label synonyms, value kind, plausible range)
+LOCAL_VITAL_RULES = {
+    'bloodpressure': (['blood pressure', 'bp'], 'blood_pressure', (30, 260)),
+    'heartrate': (['heart rate', 'pulse', 'hr'], 'number', (20, 250)),
+    'pulse': (['pulse', 'heart rate'], 'number', (20, 250)),
+    'temperature': (['temperature', 'temp'], 'number', (30, 113)),
+    'respiratoryrate': (['respiratory rate', 'respirations', 'resp rate', 'rr'], 'number', (4, 60)),
+    'oxygensaturation': (['oxygen saturation', 'o2 sat', 'o2 sats', 'spo2', 'sats'], 'number', (50, 100)),
+    'spo2': (['spo2', 'oxygen saturation', 'o2 sat', 'sats'], 'number', (50, 100)),
+    'weight': (['weight', 'weighs', 'weighing'], 'number', (0.5, 400)),
+    'height': (['height'], 'number', (20, 250)),
+    'age': (['age', 'aged'], 'number', (0, 120)),
+}
+# Abbreviations that also mean other things ("8 hr", "temp job"); only trusted when a value follows directly
+LOCAL_AMBIGUOUS_SYNONYMS = {'hr', 'bp', 'rr', 'sats', 'temp'}
+LOCAL_OPTION_TYPES = ('select', 'radio', 'multiple_select', 'checkbox_group')
+LOCAL_NUMBER_PATTERN = re.compile(r'(?<![\d.])(\d{1,3}(?:\.\d+)?)(?![\d/])')
+LOCAL_BLOOD_PRESSURE_PATTERN = re.compile(r'\b(\d{2,3})\s*(?:/|over)\s*(\d{2,3})\b')
+# A value right after its label: "HR 72", "pulse: 72", "blood pressure today is 128/82"
+LOCAL_VALUE_PREFIX = r'\s*(?:(?:today|now|currently)\s+)?(?:[:=]\s*|(?:is|was|of|at)\s+)?'
+LOCAL_ADJACENT_NUMBER_PATTERN = re.compile(LOCAL_VALUE_PREFIX + LOCAL_NUMBER_PATTERN.pattern, re.IGNORECASE)
+LOCAL_ADJACENT_BLOOD_PRESSURE_PATTERN = re.compile(
+    LOCAL_VALUE_PREFIX + LOCAL_BLOOD_PRESSURE_PATTERN.pattern, re.IGNORECASE
+)
+# Generic number fields only take a number straight after the label or a ':'/'=' separator
+LOCAL_LABEL_NUMBER_PATTERN = re.compile(r'\s*[:=]?\s*' + LOCAL_NUMBER_PATTERN.pattern)
+LOCAL_PRECEDING_NUMBER_PATTERN = re.compile(r'\d\s*$')
+LOCAL_AGE_PATTERN = re.compile(r'\b(\d{1,3})[\s-]*(?:years?|yrs?)[\s-]*old\b', re.IGNORECASE)
+LOCAL_MONTHS = {
+    month: index + 1 for index, month in enumerate([
+        'january', 'february', 'march', 'april', 'may', 'june',
+        'july', 'august', 'september', 'october', 'november', 'december'
+    ])
+}
+LOCAL_DATE_PATTERNS = [
+    (re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b'), ('year', 'month', 'day')),
+    (re.compile(r'\b([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b', re.IGNORECASE), ('month', 'day', 'year')),
+    (re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?([a-z]+),?\s+(\d{4})\b', re.IGNORECASE), ('day', 'month', 'year')),
+]
+
+def local_field_rule(field: Dict[str, Any]) -> Optional[tuple]:
+    """(label synonyms, value kind, range) for fields the local rules can answer, None for free text"""
+    for key in (normalize_field_key(field['path'][-1]), normalize_field_key(field.get('label') or '')):
+        if key in LOCAL_VITAL_RULES:
+            return LOCAL_VITAL_RULES[key]
+    synonyms = [field['label'].lower()] if field.get('label') else []
+    if field['type'] == 'number':
+        return synonyms, 'number', None
+    if field['type'] == 'date':
+        return synonyms, 'date', None
+    if field['type'] in LOCAL_OPTION_TYPES and field.get('options'):
+        return synonyms, 'options', None
+    return None
+
+def parse_local_date(window: str) -> Optional[tuple]:
+    """First unambiguous date in the window as (YYYY-MM-DD, matched text)"""
+    for pattern, order in LOCAL_DATE_PATTERNS:
+        for match in pattern.finditer(window):
+            parts = dict(zip(order, match.groups()))
+            month = parts['month']
+            month = LOCAL_MONTHS.get(month.lower()) if not month.isdigit() else int(month)
+            if not month or not 1 <= month <= 12 or not 1 <= int(parts['day']) <= 31:
+                continue
+            return f"{int(parts['year']):04d}-{month:02d}-{int(parts['day']):02d}", match.group(0)
+    return None
+
+def parse_local_value(window: str, kind: str, value_range: Optional[tuple],
+                      options: Optional[List[str]], field_type: str, adjacent_only: bool = False) -> Optional[tuple]:
+    """Find a value of the given kind in the text following a label, as (value, matched text, confidence)
+
+    A value right after the label is confident; one found further into the window
+    gets LOCAL_LOOSE_MATCH_CONFIDENCE, or is not taken at all when adjacent_only.
+    Generic number fields (no vital range) only ever take a number straight after
+    the label.
+    """
+    if kind == 'blood_pressure':
+        match, confidence = LOCAL_ADJACENT_BLOOD_PRESSURE_PATTERN.match(window), 0.9
+        if match is None and not adjacent_only:
+            match, confidence = LOCAL_BLOOD_PRESSURE_PATTERN.search(window), LOCAL_LOOSE_MATCH_CONFIDENCE
+        if match and int(match.group(2)) < int(match.group(1)) <= value_range[1]:
+            return f"{match.group(1)}/{match.group(2)}", match.group(0).strip(), confidence
+        return None
+    if kind == 'number':
+        if value_range is None:
+            match, confidence = LOCAL_LABEL_NUMBER_PATTERN.match(window), 0.85
+        else:
+            match, confidence = LOCAL_ADJACENT_NUMBER_PATTERN.match(window), 0.85
+            if match is None and not adjacent_only:
+                match, confidence = LOCAL_NUMBER_PATTERN.search(window), LOCAL_LOOSE_MATCH_CONFIDENCE
+        if not match:
+            return None
+        number = Decimal(match.group(1))
+        if value_range and not value_range[0] <= number <= value_range[1]:
+            return None
+        if field_type == 'number':
+            value = int(number) if number == number.to_integral_value() else float(number)
+            return value, match.group(0).strip(), confidence
+        return match.group(1), match.group(0).strip(), confidence
+    if kind == 'date':
+        parsed = parse_local_date(window)
+        return (*parsed, 0.9) if parsed else None
+    if kind == 'options':
+        lowered = window.lower()
+        found = [
+            option for option in options
+            if re.search(rf'\b{re.escape(str(option).lower())}\b', lowered)
+        ]
+        if not found:
+            return None
+        if field_type in ('multiple_select', 'checkbox_group'):
+            return found, ', '.join(map(str, found)), 0.85
+        # Several options after one label mention is ambiguous, leave it to the LLM
+        return (found[0], str(found[0]), 0.9) if len(found) == 1 else None
+    return None
+
+def extract_field_locally(field: Dict[str, Any], rule: tuple, conversation_text: str) -> Optional['FormFieldExtraction']:
+    """Answer one field from the text after a mention of it, or None if the rules find nothing
+
+    Mentions of the field's own label are tried first, then other synonyms, then
+    ambiguous abbreviations; within each, the latest mention wins, since clinicians
+    correct themselves as they go. A loose match is only returned when no mention
+    has its value right after it.
+    """
+    synonyms, kind, value_range = rule
+    label = (field.get('label') or '').lower()
+    lowered = conversation_text.lower()
+    candidates = []
+    for synonym in synonyms:
+        ambiguous = synonym in LOCAL_AMBIGUOUS_SYNONYMS
+        for match in re.finditer(rf'\b{re.escape(synonym)}\b', lowered):
+            # "8 hr" is a duration, not a heart rate
+            if ambiguous and LOCAL_PRECEDING_NUMBER_PATTERN.search(lowered, 0, match.start()):
+                continue
+            candidates.append((2 if ambiguous else 0 if synonym == label else 1, match))
+    if field['path'][-1].lower() == 'age' or normalize_field_key(field.get('label') or '') == 'age':
+        candidates.extend((1, match) for match in LOCAL_AGE_PATTERN.finditer(conversation_text))
+
+    loose = None
+    for tier, match in sorted(candidates, key=lambda candidate: (candidate[0], -candidate[1].start())):
+        if match.re is LOCAL_AGE_PATTERN:
+            found = (int(match.group(1)), match.group(0), 0.9) if int(match.group(1)) <= value_range[1] else None
+        else:
+            window = conversation_text[match.end():match.end() + LOCAL_VALUE_WINDOW_CHARS].split('\n', 1)[0]
+            found = parse_local_value(
+                window, kind, value_range, field.get('options'), field['type'], adjacent_only=tier == 2
+            )
+        if found is None:
+            continue
+        value, matched, confidence = found
+        line_start = conversation_text.rfind('\n', 0, match.start()) + 1
+        line_end = conversation_text.find('\n', match.start())
+        source_quote = conversation_text[line_start:line_end if line_end != -1 else len(conversation_text)].strip()
+        field_data = FormFieldExtraction(value=value, source_quote=source_quote, confidence=confidence)
+        if confidence > LOCAL_LOOSE_MATCH_CONFIDENCE:
+            return field_data
+        # A loose match only stands if no other mention has the value right after it
+        loose = loose or field_data
+    return loose
+
+class ExtractionBackend:
+    """Turns a compiled template and a conversation into per-field extractions
+
+    route() answers what it can without the LLM and returns the fields still to ask
+    for; extract() sends those through extract_fields_parallel (and stream_form_data
+    streams them), so backends only differ in how they route.
+    """
+    name = EXTRACTION_MODEL
+
+    def route(self, compiled: CompiledTemplate,
+              conversation_text: str) -> tuple[Dict[str, 'FormFieldExtraction'], Optional[CompiledTemplate]]:
+        return {}, compiled
+
+    def extract(self, compiled: CompiledTemplate, conversation_text: str) -> Dict[str, 'FormFieldExtraction']:
+        local_fields, remaining = self.route(compiled, conversation_text)
+        if remaining is None:
+            return local_fields
+        return {**extract_fields_parallel(remaining, conversation_text), **local_fields}
+
+class OpenAIExtractionBackend(ExtractionBackend):
+    """Every field is extracted by the OpenAI model"""
+
+class LocalExtractionBackend(ExtractionBackend):
+    """CPU-only rules for vitals, ages, numbers, dates and select options; free-text fields stay empty"""
+    name = f"rules-v{LOCAL_RULES_VERSION}"
+
+    def extract_locally(self, compiled: CompiledTemplate, conversation_text: str) -> tuple[Dict[str, 'FormFieldExtraction'], List[str]]:
+        """Confident local answers, and the ids of every field they did not answer
+
+        Answers at or below a field's minConfidence would not be stored, so they
+        count as unanswered.
+        """
+        load_extraction_models()
+        extracted = {}
+        unanswered = []
+        with request_metrics.timer('LocalExtractionMs'):
+            for field in compiled.field_info:
+                rule = local_field_rule(field)
+                field_data = extract_field_locally(field, rule, conversation_text) if rule else None
+                if field_data is not None and field_data.confidence > compiled.plans[field['id']].min_confidence:
+                    extracted[field['id']] = field_data
+                else:
+                    unanswered.append(field['id'])
+        request_metrics.add('LocalFields', len(extracted))
+        return extracted, unanswered
+
+    def route(self, compiled, conversation_text):
+        return self.extract_locally(compiled, conversation_text)[0], None
+
+class RoutedExtractionBackend(LocalExtractionBackend):
+    """Local rules first; only the fields they could not answer are sent to the OpenAI model"""
+    name = f"rules-v{LOCAL_RULES_VERSION}+{EXTRACTION_MODEL}"
+
+    def route(self, compiled, conversation_text):
+        extracted, unanswered = self.extract_locally(compiled, conversation_text)
+        request_metrics.add('RemoteFields', len(unanswered))
+        logger.info(f"Routed extraction: {len(extracted)} fields answered locally, {len(unanswered)} sent to the model")
+        return extracted, compiled.subset(unanswered) if unanswered else None
+
+EXTRACTION_BACKENDS = {
+    'openai': OpenAIExtractionBackend,
+    'local': LocalExtractionBackend,
+    'routed': RoutedExtractionBackend,
+}
+
+def build_extraction_backend() -> ExtractionBackend:
+    """Build the configured extraction backend"""
+    if EXTRACTION_BACKEND not in EXTRACTION_BACKENDS:
+        raise ValueError(f"Unknown EXTRACTION_BACKEND: {EXTRACTION_BACKEND}")
+    return EXTRACTION_BACKENDS[EXTRACTION_BACKEND]()
+
+extraction_backend = build_extraction_backend()
+
+def extract_form_data(template_fields: Any, conversation_text: str,
+                      template_version: Optional[str] = None) -> Dict[str, Any]:
+    """Extract form data based on template fields structure"""
+    compiled = get_compiled_template(template_fields, template_version)
+    cache_key = None
+    if extraction_cache is not None:
+        cache_key = extraction_cache_key(compiled.version, conversation_text)
+        cached = extraction_cache.get(cache_key)
+        request_metrics.add('ExtractionCacheHits' if cached is not None else 'ExtractionCacheMisses')
+        logger.info(f"Extraction cache {'hit' if cached is not None else 'miss'}: {extraction_cache.stats()}")
+        if cached is not None:
+            return cached
+
+    try:
+        logger.info("Starting form data extraction")
         
-        response_content = completion.choices[0].message.content
-        logger.debug(f"Raw OpenAI response: {response_content}")
-        
-        parsed_response = FormResponse.model_validate_json(response_content)
-        
-        # Convert the flat response back to nested structure
+        extracted_fields = extraction_backend.extract(compiled, conversation_text)
+
+        # Coerce to the template's types and convert the flat response back to nested structure
         nested_data = {}
-        for field_id, field_data in parsed_response.fields.items():
-            if field_data.value is not None and field_data.confidence and field_data.confidence > 0.8:
-                section, field = field_id.split('.')
-                if section not in nested_data:
-                    nested_data[section] = {}
-                nested_data[section][field] = field_data.value
+        apply_extracted_fields(nested_data, extracted_fields, compiled)
         
         logger.info(f"Successfully extracted {len(nested_data)} sections")
-        logger.debug(f"Extracted data: {safe_json_dumps(nested_data)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Extracted data: {safe_json_dumps(nested_data)}")
+        if cache_key is not None:
+            extraction_cache.set(cache_key, nested_data)
         return nested_data
 
     except Exception as e:
@@ -226,6 +1530,224 @@ Format the response as JSON:
         logger.error(traceback.format_exc())
         raise
 
+class IncrementalFieldParser:
+    """Parses a streamed {"fields": {...}} completion, returning each field once its object closes"""
+    def __init__(self):
+        self.text = ''
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.last_string = {}
+        self.field_start = None
+
+    def feed(self, delta: str) -> List[tuple]:
+        """Consume a chunk of completion text and return newly completed (field_id, extraction) pairs"""
+        self.text += delta
+        completed = []
+        for index in range(self.position, len(self.text)):
+            char = self.text[index]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    self.last_string[self.depth] = self.text[self.string_start:index + 1]
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = index
+            elif char in '{[':
+                self.depth += 1
+                # depth 1 is the root, 2 the "fields" map, 3 a single field's object
+                if char == '{' and self.depth == 3 and self.last_string.get(1) == '"fields"':
+                    self.field_start = index
+            elif char in '}]':
+                if char == '}' and self.depth == 3 and self.field_start is not None:
+                    field_id = json.loads(self.last_string[2])
+                    try:
+                        completed.append((
+                            field_id,
+                            FormFieldExtraction.model_validate_json(self.text[self.field_start:index + 1])
+                        ))
+                    except ValueError as e:
+                        logger.warning(f"Skipping unparseable streamed field {field_id}: {str(e)}")
+                    self.field_start = None
+                self.depth -= 1
+        self.position = len(self.text)
+        return completed
+
+def stream_completion_fields(field_descriptions: str, conversation_text: str, field_ids: Any) -> Iterator[tuple]:
+    """Stream one extraction completion, yielding (field id, extraction) as each field in field_ids closes"""
+    openai_started = time.perf_counter()
+    request_metrics.add('OpenAICalls')
+    stream = call_llm(
+        model=EXTRACTION_MODEL,
+        messages=build_extraction_messages(field_descriptions, conversation_text),
+        response_format={"type": "json_object"},
+        stream=True
+    )
+    parser = IncrementalFieldParser()
+    for chunk in stream:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        for field_id, field_data in parser.feed(chunk.choices[0].delta.content):
+            # Fields the model was not asked for may already have been answered locally
+            if field_id in field_ids:
+                yield field_id, field_data
+    request_metrics.add('OpenAIMs', (time.perf_counter() - openai_started) * 1000)
+
+def stream_remote_fields(compiled: CompiledTemplate, conversation_text: str) -> Iterator[tuple]:
+    """Yield (field id, extraction) from the model, split into calls the way extract_fields_parallel splits them
+
+    The shards of a transcript that fits in one chunk stream concurrently, each
+    field going out as its shard's completion closes it. A longer transcript is
+    chunked, and a field can only be merged once every chunk has answered, so
+    those fields are extracted in parallel and yielded after the merge.
+    """
+    if EXTRACTION_CHUNK_CHARS and len(conversation_text) > EXTRACTION_CHUNK_CHARS:
+        yield from extract_fields_parallel(compiled, conversation_text).items()
+        return
+    if len(compiled.shards) == 1:
+        yield from stream_completion_fields(compiled.prompt, conversation_text, compiled.paths)
+        return
+
+    streamed = queue.Queue()
+    shard_done = object()
+
+    def stream_shard(field_descriptions):
+        try:
+            for item in stream_completion_fields(field_descriptions, conversation_text, compiled.paths):
+                streamed.put(item)
+        finally:
+            streamed.put(shard_done)
+
+    with ThreadPoolExecutor(max_workers=min(EXTRACTION_MAX_CONCURRENCY, len(compiled.shards))) as executor:
+        futures = [executor.submit(stream_shard, prompt) for prompt in compiled.shard_prompts]
+        running = len(futures)
+        while running:
+            item = streamed.get()
+            if item is shard_done:
+                running -= 1
+            else:
+                yield item
+    for future in futures:
+        # Surface a failed shard once the others have delivered their fields
+        future.result()
+
+def stream_form_data(template_fields: Any, conversation_text: str,
+                     template_version: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Extract form data as a stream of events, one per confident field, then a final 'done' event
+
+    The 'done' event carries the same nested data extract_form_data would return.
+    Queued extraction consumes the stream to write progress as fields arrive.
+    """
+    started = time.perf_counter()
+    first_field_ms = None
+    nested_data = {}
+    compiled = get_compiled_template(template_fields, template_version)
+
+    cache_key = None
+    cached = None
+    if extraction_cache is not None:
+        cache_key = extraction_cache_key(compiled.version, conversation_text)
+        cached = extraction_cache.get(cache_key)
+        request_metrics.add('ExtractionCacheHits' if cached is not None else 'ExtractionCacheMisses')
+
+    if cached is not None:
+        nested_data = cached
+        for field_id, path in compiled.paths.items():
+            value = get_nested_value(cached, path)
+            if value is None:
+                continue
+            if first_field_ms is None:
+                first_field_ms = (time.perf_counter() - started) * 1000
+            yield {'event': 'field', 'fieldId': field_id, 'value': value}
+    else:
+        load_extraction_models()
+        # Locally answered fields go out first; the rest are streamed from the model
+        local_fields, remaining = extraction_backend.route(compiled, conversation_text)
+        streamed = iter(local_fields.items())
+        if remaining is not None:
+            streamed = itertools.chain(streamed, stream_remote_fields(remaining, conversation_text))
+        for field_id, field_data in streamed:
+            if not apply_extracted_fields(nested_data, {field_id: field_data}, compiled):
+                continue
+            value = get_nested_value(nested_data, compiled.paths[field_id])
+            if first_field_ms is None:
+                first_field_ms = (time.perf_counter() - started) * 1000
+            yield {
+                'event': 'field',
+                'fieldId': field_id,
+                'value': value,
+                'confidence': field_data.confidence
+            }
+        if cache_key is not None:
+            extraction_cache.set(cache_key, nested_data)
+
+    total_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        f"Streaming extraction: first field after "
+        f"{f'{first_field_ms:.0f} ms' if first_field_ms is not None else 'n/a'}, total {total_ms:.0f} ms"
+    )
+    yield {'event': 'done', 'data': nested_data}
+
+class TemplateCache:
+    """Warm-container LRU of template items, validated against updatedAt
+
+    Serves the extraction path only; GET /templates/{id} reads DynamoDB and
+    refreshes the entry. Entries are shared with callers and must be treated as
+    read-only. Writes in this container refresh or evict entries directly; writes
+    in other containers are picked up once an entry's TTL lapses or a caller asks
+    for a newer updatedAt.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, template_id: str, min_updated_at: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get((user_id, template_id))
+            if (
+                entry is None
+                or entry[0] < time.time()
+                or (min_updated_at is not None and entry[1].get('updatedAt', 0) < min_updated_at)
+            ):
+                self.misses += 1
+                return None
+            self.entries.move_to_end((user_id, template_id))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, item: Dict[str, Any]) -> None:
+        key = (item['userId'], item['templateId'])
+        with self.lock:
+            current = self.entries.get(key)
+            # Never replace a newer version with an older read
+            if current is not None and current[1].get('updatedAt', 0) > item.get('updatedAt', 0):
+                return
+            self.entries[key] = (time.time() + self.ttl_seconds, item)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, template_id: str) -> None:
+        with self.lock:
+            self.entries.pop((user_id, template_id), None)
+
+template_cache = TemplateCache(
+    int(os.getenv('TEMPLATE_CACHE_MAX_ENTRIES', '128')),
+    int(os.getenv('TEMPLATE_CACHE_TTL_SECONDS', '300'))
+)
+
 def create_template(user_id: str, template_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new form template."""
     template_id = str(uuid.uuid4())
@@ -241,28 +1763,45 @@ def create_template(user_id: str, template_data: Dict[str, Any]) -> Dict[str, An
     }
     
     form_templates_table.put_item(Item=item)
+    template_cache.put(item)
     return item
 
 def get_template(template_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     """Get a form template."""
-    response = form_templates_table.get_item(
-        Key={
+    response = dynamodb_client.get_item(
+        TableName=FORM_TEMPLATES_TABLE,
+        Key=serialize_item({
             'templateId': template_id,
             'userId': user_id
-        }
+        })
     )
-    return response.get('Item')
+    item = response.get('Item')
+    return deserialize_item(item) if item else None
 
-def list_templates(user_id: str) -> list:
+def get_template_cached(template_id: str, user_id: str, min_updated_at: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Get a form template through the warm-container cache."""
+    item = template_cache.get(user_id, template_id, min_updated_at)
+    request_metrics.add('TemplateCacheHits' if item is not None else 'TemplateCacheMisses')
+    if item is None:
+        item = get_template(template_id, user_id)
+        if item:
+            template_cache.put(item)
+    return item
+
+def list_templates(user_id: str, projection: Optional[List[str]] = TEMPLATE_SUMMARY_ATTRIBUTES) -> list:
     """List all templates for a user."""
-    response = form_templates_table.query(
-        IndexName='userIdIndex',
-        KeyConditionExpression='userId = :uid',
-        ExpressionAttributeValues={
+    query_kwargs = {
+        'TableName': FORM_TEMPLATES_TABLE,
+        'IndexName': 'userIdIndex',
+        'KeyConditionExpression': 'userId = :uid',
+        'ExpressionAttributeValues': serialize_item({
             ':uid': user_id
-        }
-    )
-    return response.get('Items', [])
+        })
+    }
+    if projection:
+        query_kwargs['ProjectionExpression'], query_kwargs['ExpressionAttributeNames'] = projection_expression(projection)
+    response = dynamodb_client.query(**query_kwargs)
+    return [deserialize_item(item) for item in response.get('Items', [])]
 
 def update_template(template_id: str, user_id: str, template_data: Dict[str, Any]) -> Dict[str, Any]:
     """Update a form template."""
@@ -292,6 +1831,7 @@ def update_template(template_id: str, user_id: str, template_data: Dict[str, Any
         ExpressionAttributeNames=expression_names,
         ReturnValues='ALL_NEW'
     )
+    template_cache.put(response.get('Attributes'))
     return response.get('Attributes')
 
 def delete_template(template_id: str, user_id: str) -> Dict[str, Any]:
@@ -303,42 +1843,393 @@ def delete_template(template_id: str, user_id: str) -> Dict[str, Any]:
         },
         ReturnValues='ALL_OLD'
     )
+    template_cache.invalidate(user_id, template_id)
     return response.get('Attributes')
 
-def create_filled_form(user_id: str, form_data: Dict[str, Any], conversation_text: Optional[str] = None) -> Dict[str, Any]:
-    """Create a filled form with proper type handling."""
-    form_id = str(uuid.uuid4())
-    timestamp = int(time.time())
-    
+def resolve_template_fields(user_id: str, form_data: Dict[str, Any]) -> None:
+    """Replace client-sent templateFields with the stored template's when templateId is given"""
+    # templateVersion keys the shared compiled-template cache, so only the server may set it
+    form_data.pop('templateVersion', None)
+    template_id = form_data.get('templateId')
+    if not template_id:
+        return
+    min_updated_at = form_data.pop('templateUpdatedAt', None)
     try:
-        if conversation_text and form_data.get('templateFields'):
-            # Extract data using template fields
-            extracted_data = extract_form_data(form_data['templateFields'], conversation_text)
-            converted_data = convert_floats_to_decimals(extracted_data)
-            
-            # Merge with existing data
-            form_data['data'] = {
-                **converted_data,
-                **convert_floats_to_decimals(form_data.get('data', {}))
-            }
-        
-        # Ensure required fields are present
-        if 'templateCode' not in form_data:
-            raise ValueError("templateCode is required")
-        if 'data' not in form_data:
-            raise ValueError("data is required")
-            
-        item = {
-            'formId': form_id,
-            'userId': user_id,
-            'templateCode': form_data['templateCode'],  # Make sure this is required
-            'data': convert_floats_to_decimals(form_data['data']),
-            'createdAt': timestamp,
-            'updatedAt': timestamp
+        min_updated_at = int(min_updated_at) if min_updated_at is not None else None
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid templateUpdatedAt: {min_updated_at}")
+    template = get_template_cached(template_id, user_id, min_updated_at)
+    if not template:
+        raise ValueError(f"Template {template_id} not found")
+    form_data['templateFields'] = template.get('fields')
+    form_data['templateVersion'] = stored_template_version(template)
+    form_data.setdefault('templateCode', template_id)
+
+# Forms whose serialized data is larger than this keep it in blob storage, with a pointer on the item
+FORM_INLINE_MAX_BYTES = int(os.getenv('FORM_INLINE_MAX_BYTES', str(100 * 1024)))
+FORM_BLOB_CODEC = 'zstd' if zstandard is not None else 'gzip'
+# Part size for streamed uploads; S3 needs at least 5 MB for every part but the last
+BLOB_UPLOAD_PART_BYTES = 8 * 1024 * 1024
+
+class BlobStore(ABC):
+    """Object store holding form data too large to keep inline on the item, and exports"""
+    @abstractmethod
+    def put(self, key: str, body: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def put_stream(self, key: str, chunks: Iterator[bytes]) -> int:
+        """Write an object produced as a stream of chunks and return its size"""
+        body = b''.join(chunks)
+        self.put(key, body)
+        return len(body)
+
+    def download_url(self, key: str, expires_in: int) -> Optional[str]:
+        """A time-limited URL for downloading the object, where the store can issue one"""
+        return None
+
+class S3BlobStore(BlobStore):
+    """Blob store backed by an S3 bucket"""
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self.s3 = LazyResource(lambda: aws_client('s3'))
+
+    def put(self, key: str, body: bytes) -> None:
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=body)
+
+    def get(self, key: str) -> bytes:
+        return self.s3.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+    def delete(self, key: str) -> None:
+        self.s3.delete_object(Bucket=self.bucket, Key=key)
+
+    def put_stream(self, key: str, chunks: Iterator[bytes]) -> int:
+        """Upload with a multipart upload, holding one part in memory at a time"""
+        upload_id = None
+        parts = []
+        buffer = bytearray()
+        size = 0
+        try:
+            for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                if len(buffer) < BLOB_UPLOAD_PART_BYTES:
+                    continue
+                if upload_id is None:
+                    upload_id = self.s3.create_multipart_upload(Bucket=self.bucket, Key=key)['UploadId']
+                parts.append(self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                buffer.clear()
+            if upload_id is None:
+                self.put(key, bytes(buffer))
+                return size
+            if buffer:
+                parts.append(self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}
+            )
+            return size
+        except Exception:
+            if upload_id is not None:
+                self.s3.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def _upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> Dict[str, Any]:
+        response = self.s3.upload_part(
+            Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+        )
+        return {'ETag': response['ETag'], 'PartNumber': part_number}
+
+    def download_url(self, key: str, expires_in: int) -> Optional[str]:
+        return self.s3.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=expires_in
+        )
+
+class LocalBlobStore(BlobStore):
+    """Filesystem stand-in for S3, for local runs and tests"""
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        parts = key.split('/')
+        if any(part in ('', '.', '..') for part in parts):
+            raise ValueError(f"Invalid blob key: {key}")
+        return os.path.join(self.root, *parts)
+
+    def put(self, key: str, body: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), 'rb') as f:
+            return f.read()
+
+    def put_stream(self, key: str, chunks: Iterator[bytes]) -> int:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return size
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+def build_blob_store() -> Optional[BlobStore]:
+    """Build the form blob store from FORM_BLOB_BUCKET or FORM_BLOB_DIR; None keeps all data inline"""
+    if os.getenv('FORM_BLOB_BUCKET'):
+        return S3BlobStore(os.environ['FORM_BLOB_BUCKET'])
+    if os.getenv('FORM_BLOB_DIR'):
+        return LocalBlobStore(os.environ['FORM_BLOB_DIR'])
+    return None
+
+form_blob_store = build_blob_store()
+
+def compress_blob(raw: bytes, codec: str) -> bytes:
+    """Compress serialized form data with the given codec"""
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    return gzip.compress(raw, compresslevel=6)
+
+def decompress_blob(body: bytes, codec: str) -> bytes:
+    """Decompress a stored blob according to the codec recorded on its pointer"""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Form data is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(body)
+    if codec == 'gzip':
+        return gzip.decompress(body)
+    raise RuntimeError(f"Unknown blob codec: {codec}")
+
+def store_form_data(form_id: str, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the attributes that hold a form's data: inline 'data', or a 'dataBlob' pointer when too large"""
+    if form_blob_store is None:
+        return {'data': data}
+    raw = encode_stored_json(data).encode('utf-8')
+    if len(raw) <= FORM_INLINE_MAX_BYTES:
+        return {'data': data}
+
+    # Content-addressed, so a blob is never overwritten while an item still points at it
+    checksum = hashlib.sha256(raw).hexdigest()
+    body = compress_blob(raw, FORM_BLOB_CODEC)
+    key = f"forms/{user_id}/{form_id}/{checksum}.json.{FORM_BLOB_CODEC}"
+    form_blob_store.put(key, body)
+    logger.info(f"Offloaded data of form {form_id} to {key}: {len(raw)} bytes, {len(body)} compressed")
+    return {'dataBlob': {
+        'key': key,
+        'codec': FORM_BLOB_CODEC,
+        'sha256': checksum,
+        'size': len(raw),
+        'compressedSize': len(body)
+    }}
+
+def load_form_blob(pointer: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch, verify and decode offloaded form data"""
+    if form_blob_store is None:
+        raise RuntimeError("Form data is in blob storage but no blob store is configured")
+    raw = decompress_blob(form_blob_store.get(pointer['key']), pointer['codec'])
+    if hashlib.sha256(raw).hexdigest() != pointer['sha256']:
+        raise RuntimeError(f"Checksum mismatch for form data blob {pointer['key']}")
+    # Numbers come back as Decimal, exactly as DynamoDB returns inline data
+    return json.loads(raw, parse_float=Decimal, parse_int=Decimal)
+
+def delete_form_blob(pointer: Dict[str, Any]) -> None:
+    """Delete an offloaded blob that no item points at any more"""
+    try:
+        form_blob_store.delete(pointer['key'])
+    except Exception as e:
+        logger.warning(f"Could not delete form data blob {pointer['key']}: {str(e)}")
+
+def hydrate_form_item(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Replace a form item's dataBlob pointer with the data it points at"""
+    if item and 'dataBlob' in item:
+        item['data'] = load_form_blob(item.pop('dataBlob'))
+    return item
+
+def hydrate_form_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Hydrate a page of form items, fetching offloaded blobs concurrently"""
+    offloaded = [item for item in items if 'dataBlob' in item]
+    if len(offloaded) > 1:
+        with ThreadPoolExecutor(max_workers=min(EXTRACTION_MAX_CONCURRENCY, len(offloaded))) as executor:
+            list(executor.map(hydrate_form_item, offloaded))
+    elif offloaded:
+        hydrate_form_item(offloaded[0])
+    return items
+
+def offload_form_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the item to store for a new form, with data moved to blob storage if it is too large"""
+    storage = store_form_data(item['formId'], item['userId'], item['data'])
+    if 'data' in storage:
+        return item
+    stored = {key: value for key, value in item.items() if key != 'data'}
+    stored.update(storage)
+    return stored
+
+def write_form_data(form_id: str, user_id: str, data: Dict[str, Any], attributes: Optional[Dict[str, Any]] = None,
+                    condition: Optional[str] = None, condition_names: Optional[Dict[str, str]] = None,
+                    condition_values: Optional[Dict[str, Any]] = None,
+                    remove_attributes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Replace a form's whole data map, plus any other attributes, and return the updated item.
+
+    data is stored inline or offloaded by size; whichever of data/dataBlob is not
+    used is removed, as are remove_attributes, and a blob the item no longer
+    points at is deleted. The form's version is incremented.
+    """
+    storage = store_form_data(form_id, user_id, data)
+    names = dict(condition_names or {})
+    values = dict(condition_values or {})
+    set_clauses = []
+    for index, (attr, value) in enumerate({**(attributes or {}), **storage}.items()):
+        names[f"#w{index}"] = attr
+        values[f":w{index}"] = value
+        set_clauses.append(f"#w{index} = :w{index}")
+    set_clauses.append('#version = if_not_exists(#version, :zero) + :one')
+    names['#version'] = 'version'
+    values.update({':zero': 0, ':one': 1})
+    names['#stale'] = 'dataBlob' if 'data' in storage else 'data'
+    remove_clauses = ['#stale']
+    for index, attr in enumerate(remove_attributes or []):
+        names[f"#r{index}"] = attr
+        remove_clauses.append(f"#r{index}")
+
+    update_kwargs = {
+        'Key': {
+            'formId': form_id,
+            'userId': user_id
+        },
+        'UpdateExpression': f"SET {', '.join(set_clauses)} REMOVE {', '.join(remove_clauses)}",
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values,
+        'ReturnValues': 'ALL_OLD'
+    }
+    if condition:
+        update_kwargs['ConditionExpression'] = condition
+    response = filled_forms_table.update_item(**update_kwargs)
+
+    previous = response.get('Attributes', {})
+    previous_pointer = previous.get('dataBlob')
+    if previous_pointer and previous_pointer['key'] != storage.get('dataBlob', {}).get('key'):
+        delete_form_blob(previous_pointer)
+    updated = {
+        'formId': form_id, 'userId': user_id, **previous, **(attributes or {}), 'data': data,
+        'version': previous.get('version', 0) + 1
+    }
+    updated.pop('dataBlob', None)
+    for attr in remove_attributes or []:
+        updated.pop(attr, None)
+    index_form(updated)
+    return updated
+
+def validate_filled_form_input(form_data: Dict[str, Any], conversation_text: Optional[str] = None) -> None:
+    """Check a new form has what it needs before any extraction is paid for"""
+    if 'templateCode' not in form_data:
+        raise ValueError("templateCode is required")
+    if 'data' not in form_data and not (conversation_text and form_data.get('templateFields')):
+        raise ValueError("data is required")
+
+def build_filled_form_item(user_id: str, form_data: Dict[str, Any], conversation_text: Optional[str] = None,
+                           form_id: Optional[str] = None, status: str = FORM_STATUS_READY) -> Dict[str, Any]:
+    """Run any inline extraction and build the FilledForms item for a new form"""
+    validate_filled_form_input(form_data, conversation_text)
+    data = convert_floats_to_decimals(form_data.get('data', {}))
+    extraction_error = None
+
+    if conversation_text and form_data.get('templateFields'):
+        # Extract data using template fields, client-supplied values win
+        try:
+            extracted_data = extract_form_data(
+                form_data['templateFields'], conversation_text, form_data.get('templateVersion')
+            )
+        except LLMUnavailableError as e:
+            # Keep what the clinician entered; extraction can be rerun through /forms/{id}/extract
+            logger.warning(f"Saving form without extraction: {str(e)}")
+            extracted_data = {}
+            status = FORM_STATUS_FAILED
+            extraction_error = str(e)
+        data = {
+            **convert_floats_to_decimals(extracted_data),
+            **data
         }
+
+    timestamp = int(time.time())
+    return {
+        'formId': form_id or str(uuid.uuid4()),
+        'userId': user_id,
+        'templateCode': form_data['templateCode'],  # Make sure this is required
+        'templateSortKey': build_template_sort_key(form_data['templateCode'], timestamp),
+        **({'templateId': form_data['templateId']} if form_data.get('templateId') else {}),
+        'data': data,
+        'status': status,
+        **({'extractionError': extraction_error} if extraction_error else {}),
+        'createdAt': timestamp,
+        'updatedAt': timestamp,
+        'version': 1
+    }
+
+def create_filled_form(user_id: str, form_data: Dict[str, Any], conversation_text: Optional[str] = None,
+                       async_extraction: bool = False) -> Dict[str, Any]:
+    """Create a filled form with proper type handling.
+
+    With async_extraction the form is saved with status 'extracting' and the
+    extraction is handed to the worker through extraction_queue.
+    """
+    form_id = str(uuid.uuid4())
+    
+    try:
+        resolve_template_fields(user_id, form_data)
+        extraction_job = None
+        if async_extraction and extraction_queue is None:
+            logger.warning("Async extraction requested but no queue is configured, extracting inline")
+            async_extraction = False
+
+        if async_extraction and conversation_text and form_data.get('templateFields'):
+            validate_filled_form_input(form_data, conversation_text)
+            extraction_job = {
+                'formId': form_id,
+                'userId': user_id,
+                'templateFields': form_data['templateFields'],
+                'templateVersion': form_data.get('templateVersion'),
+                'conversationText': conversation_text
+            }
+            form_data.setdefault('data', {})
+            item = build_filled_form_item(user_id, form_data, form_id=form_id, status=FORM_STATUS_EXTRACTING)
+        else:
+            item = build_filled_form_item(user_id, form_data, conversation_text, form_id=form_id)
         
-        logger.info(f"Creating form with data: {safe_json_dumps(item)}")
-        filled_forms_table.put_item(Item=item)
+        log_body("Creating form with data", item)
+        filled_forms_table.put_item(Item=offload_form_item(item))
+        index_form(item, created=True)
+
+        if extraction_job:
+            try:
+                extraction_queue.send(extraction_job)
+                logger.info(f"Queued extraction job for form {form_id}")
+            except Exception as e:
+                logger.error(f"Error queueing extraction job: {str(e)}")
+                mark_extraction_failed(form_id, user_id, 'Could not queue extraction job')
+                item['status'] = FORM_STATUS_FAILED
         return item
         
     except Exception as e:
@@ -346,62 +2237,585 @@ def create_filled_form(user_id: str, form_data: Dict[str, Any], conversation_tex
         logger.error(traceback.format_exc())
         raise
 
+def batch_write_items(table_name: str, items: List[Dict[str, Any]]) -> List[tuple]:
+    """Put items with BatchWriteItem, retrying unprocessed items with jittered backoff
+
+    Returns (item, error) pairs for the items that could not be written.
+    """
+    failures = []
+    for start in range(0, len(items), BATCH_WRITE_CHUNK_SIZE):
+        pending = items[start:start + BATCH_WRITE_CHUNK_SIZE]
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            try:
+                response = dynamodb.batch_write_item(RequestItems={
+                    table_name: [{'PutRequest': {'Item': item}} for item in pending]
+                })
+            except client_error() as e:
+                logger.error(f"BatchWriteItem failed: {str(e)}")
+                failures.extend((item, str(e)) for item in pending)
+                pending = []
+                break
+
+            pending = [
+                request['PutRequest']['Item']
+                for request in response.get('UnprocessedItems', {}).get(table_name, [])
+            ]
+            if not pending:
+                break
+            if attempt < BATCH_MAX_RETRIES:
+                logger.info(f"Retrying {len(pending)} unprocessed items (attempt {attempt + 1})")
+                time.sleep(random.uniform(0, BATCH_RETRY_BASE_SECONDS * (2 ** attempt)))
+        failures.extend((item, 'Unprocessed after retries') for item in pending)
+    return failures
+
+def batch_get_items(table_name: str, keys: List[Dict[str, Any]],
+                    projection: Optional[List[str]] = None) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Get items with BatchGetItem, retrying unprocessed keys with jittered backoff
+
+    Returns the items found and any keys still unprocessed after retries.
+    """
+    items = []
+    unprocessed = []
+    for start in range(0, len(keys), BATCH_GET_CHUNK_SIZE):
+        request = {'Keys': [serialize_item(key) for key in keys[start:start + BATCH_GET_CHUNK_SIZE]]}
+        if projection:
+            request['ProjectionExpression'], request['ExpressionAttributeNames'] = projection_expression(projection)
+
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            response = dynamodb_client.batch_get_item(RequestItems={table_name: request})
+            items.extend(deserialize_item(item) for item in response.get('Responses', {}).get(table_name, []))
+            remaining = response.get('UnprocessedKeys', {}).get(table_name)
+            if not remaining:
+                request = None
+                break
+            request = remaining
+            if attempt < BATCH_MAX_RETRIES:
+                logger.info(f"Retrying {len(request['Keys'])} unprocessed keys (attempt {attempt + 1})")
+                time.sleep(random.uniform(0, BATCH_RETRY_BASE_SECONDS * (2 ** attempt)))
+        if request:
+            unprocessed.extend(deserialize_item(key) for key in request['Keys'])
+    return items, unprocessed
+
+def batch_get_user_items(table_name: str, id_attribute: str, user_id: str, ids: List[str],
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Fetch a user's items by id in one round trip, in request order"""
+    if not isinstance(ids, list) or not ids or not all(isinstance(item_id, str) for item_id in ids):
+        raise ValueError("ids must be a non-empty list of strings")
+    if len(ids) > BATCH_MAX_GET_IDS:
+        raise ValueError(f"At most {BATCH_MAX_GET_IDS} ids can be fetched per batch")
+    if fields is not None and (not isinstance(fields, list) or not all(isinstance(f, str) for f in fields)):
+        raise ValueError("fields must be a list of attribute names")
+
+    # BatchGetItem rejects duplicate keys
+    unique_ids = list(dict.fromkeys(ids))
+    projection = distinct_projection([id_attribute, *fields]) if fields else None
+    items, unprocessed = batch_get_items(
+        table_name,
+        [{id_attribute: item_id, 'userId': user_id} for item_id in unique_ids],
+        projection
+    )
+
+    found = {item[id_attribute]: item for item in items}
+    unprocessed_ids = {key[id_attribute] for key in unprocessed}
+    return {
+        'items': [found[item_id] for item_id in unique_ids if item_id in found],
+        'missing': [item_id for item_id in unique_ids if item_id not in found and item_id not in unprocessed_ids],
+        'unprocessed': [item_id for item_id in unique_ids if item_id in unprocessed_ids]
+    }
+
+def create_filled_forms_batch(user_id: str, forms: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create up to BATCH_MAX_FORMS filled forms, reporting success or failure per form.
+
+    All forms are validated up front, extractions run concurrently, and the
+    items are written with BatchWriteItem.
+    """
+    if not isinstance(forms, list) or not forms:
+        raise ValueError("forms must be a non-empty list")
+    if len(forms) > BATCH_MAX_FORMS:
+        raise ValueError(f"At most {BATCH_MAX_FORMS} forms can be created per batch")
+
+    results = [None] * len(forms)
+    pending = []
+    for index, form_data in enumerate(forms):
+        if not isinstance(form_data, dict):
+            results[index] = {'index': index, 'status': 'failed', 'error': 'form must be an object'}
+            continue
+        conversation_text = form_data.pop('conversationText', None)
+        try:
+            resolve_template_fields(user_id, form_data)
+            validate_filled_form_input(form_data, conversation_text)
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'failed', 'error': str(e)}
+            continue
+        pending.append((index, form_data, conversation_text))
+
+    items = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(EXTRACTION_MAX_CONCURRENCY, len(pending))) as executor:
+            futures = {
+                index: executor.submit(build_filled_form_item, user_id, form_data, conversation_text)
+                for index, form_data, conversation_text in pending
+            }
+        for index, future in futures.items():
+            try:
+                items[index] = future.result()
+            except Exception as e:
+                logger.error(f"Error preparing batch form {index}: {str(e)}")
+                results[index] = {'index': index, 'status': 'failed', 'error': str(e)}
+
+    stored_items = []
+    for index, item in list(items.items()):
+        try:
+            stored_items.append(offload_form_item(item))
+        except Exception as e:
+            logger.error(f"Error offloading batch form {index}: {str(e)}")
+            results[index] = {'index': index, 'status': 'failed', 'error': str(e)}
+            del items[index]
+
+    write_errors = {}
+    for stored, error in batch_write_items(FILLED_FORMS_TABLE, stored_items):
+        write_errors[stored['formId']] = error
+        if 'dataBlob' in stored:
+            delete_form_blob(stored['dataBlob'])
+    for index, item in items.items():
+        if item['formId'] in write_errors:
+            results[index] = {'index': index, 'status': 'failed', 'error': write_errors[item['formId']]}
+        else:
+            results[index] = {'index': index, 'status': 'created', 'item': item}
+            index_form(item, created=True)
+
+    created = sum(1 for result in results if result['status'] == 'created')
+    logger.info(f"Batch create: {created} created, {len(results) - created} failed")
+    return {'results': results, 'created': created, 'failed': len(results) - created}
+
 def get_filled_form(form_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     """Get a filled form."""
-    response = filled_forms_table.get_item(
+    response = dynamodb_client.get_item(
+        TableName=FILLED_FORMS_TABLE,
+        Key=serialize_item({
+            'formId': form_id,
+            'userId': user_id
+        })
+    )
+    item = response.get('Item')
+    return hydrate_form_item(deserialize_item(item) if item else None)
+
+def wait_for_extraction(form_id: str, user_id: str, wait_seconds: float,
+                        after_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Long-poll a filled form until its extraction finishes or wait_seconds elapses
+
+    With after_version, also return as soon as the form has a newer version, such
+    as a write of extraction progress.
+    """
+    def waiting(item):
+        return item and item.get('status') == FORM_STATUS_EXTRACTING and (
+            after_version is None or item.get('version', 0) <= after_version
+        )
+
+    deadline = time.monotonic() + min(wait_seconds, MAX_EXTRACTION_WAIT_SECONDS)
+    item = get_filled_form(form_id, user_id)
+    while waiting(item) and time.monotonic() < deadline:
+        time.sleep(EXTRACTION_POLL_INTERVAL_SECONDS)
+        item = get_filled_form(form_id, user_id)
+    return item
+
+def mark_extraction_failed(form_id: str, user_id: str, error: str) -> None:
+    """Flag a form whose async extraction could not be completed"""
+    filled_forms_table.update_item(
         Key={
             'formId': form_id,
             'userId': user_id
+        },
+        UpdateExpression='SET #status = :failed, extractionError = :error, updatedAt = :timestamp, '
+                         '#version = if_not_exists(#version, :zero) + :one',
+        ConditionExpression='#status = :extracting',
+        ExpressionAttributeNames={'#status': 'status', '#version': 'version'},
+        ExpressionAttributeValues={
+            ':failed': FORM_STATUS_FAILED,
+            ':extracting': FORM_STATUS_EXTRACTING,
+            ':error': error,
+            ':timestamp': int(time.time()),
+            ':zero': 0,
+            ':one': 1
         }
     )
-    return response.get('Item')
 
-def list_filled_forms(user_id: str, template_code: Optional[str] = None) -> list:
-    """List all filled forms for a user, optionally filtered by template."""
+def write_extraction_progress(form_id: str, user_id: str, progress: Dict[str, Any]) -> bool:
+    """Store the fields extracted so far on a form that is still extracting; False once it is not"""
+    try:
+        filled_forms_table.update_item(
+            Key={
+                'formId': form_id,
+                'userId': user_id
+            },
+            UpdateExpression='SET extractionProgress = :progress, #version = if_not_exists(#version, :zero) + :one',
+            ConditionExpression='#status = :extracting',
+            ExpressionAttributeNames={'#status': 'status', '#version': 'version'},
+            ExpressionAttributeValues={
+                ':progress': convert_floats_to_decimals(progress),
+                ':extracting': FORM_STATUS_EXTRACTING,
+                ':zero': 0,
+                ':one': 1
+            }
+        )
+        return True
+    except client_error() as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+def stream_extraction_with_progress(form_id: str, user_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a job's extraction, writing the fields found so far to the form as they arrive
+
+    Clients long-poll GET /forms/{id}?wait=N&version=V and fill empty fields from
+    extractionProgress while the form is 'extracting'. Writes are throttled to one
+    per EXTRACTION_PROGRESS_INTERVAL_SECONDS; the final data is written by the caller.
+    """
+    started = time.perf_counter()
+    compiled = get_compiled_template(job['templateFields'], job.get('templateVersion'))
+    progress = {}
+    last_write = None
+    writing = True
+    for event in stream_form_data(job['templateFields'], job['conversationText'], job.get('templateVersion')):
+        if event['event'] == 'done':
+            return event['data']
+        set_nested_value(progress, compiled.paths[event['fieldId']], event['value'])
+        now = time.perf_counter()
+        if writing and (last_write is None or now - last_write >= EXTRACTION_PROGRESS_INTERVAL_SECONDS):
+            if last_write is None:
+                request_metrics.add('ExtractionFirstProgressMs', (now - started) * 1000)
+            writing = write_extraction_progress(form_id, user_id, progress)
+            if not writing:
+                logger.info(f"Form {form_id} stopped extracting, no more progress writes")
+            last_write = now
+    return progress
+
+def process_extraction_job(job: Dict[str, Any], final_attempt: bool = True) -> Optional[Dict[str, Any]]:
+    """Run a queued extraction and patch the result into the form's data
+
+    Fields are written to extractionProgress as they are extracted, see
+    stream_extraction_with_progress. A transient LLM failure before the final
+    attempt is raised with the form still 'extracting', so the queue redelivers
+    the job and the retry runs. Other failures, and any failure on the final
+    attempt, mark the form failed.
+    """
+    form_id = job['formId']
+    user_id = job['userId']
+    logger.info(f"Processing extraction job for form {form_id}")
+
+    form = get_filled_form(form_id, user_id)
+    if not form or form.get('status') != FORM_STATUS_EXTRACTING:
+        logger.warning(f"Skipping extraction for form {form_id}: form missing or not extracting")
+        return None
+
     try:
+        extracted_data = convert_floats_to_decimals(stream_extraction_with_progress(form_id, user_id, job))
+    except Exception as e:
+        if not final_attempt and (isinstance(e, LLMUnavailableError) or is_retryable_llm_error(e)):
+            logger.warning(f"Extraction for form {form_id} failed, leaving it for redelivery: {str(e)}")
+            raise
+        logger.error(f"Extraction for form {form_id} failed: {str(e)}")
+        mark_extraction_failed(form_id, user_id, str(e))
+        return None
+
+    # Client-supplied data wins over extracted values, as in the synchronous path
+    merged_data = {**extracted_data, **form.get('data', {})}
+    try:
+        updated = write_form_data(
+            form_id, user_id, merged_data,
+            {'status': FORM_STATUS_READY, 'updatedAt': int(time.time())},
+            condition='#status = :extracting',
+            condition_names={'#status': 'status'},
+            condition_values={':extracting': FORM_STATUS_EXTRACTING},
+            remove_attributes=['extractionProgress']
+        )
+    except client_error() as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            logger.warning(f"Form {form_id} changed while extracting, dropping result")
+            return None
+        raise
+
+    logger.info(f"Completed extraction for form {form_id}")
+    return updated
+
+def transcript_hash(conversation_text: str) -> str:
+    """Fingerprint of the transcript prefix already extracted"""
+    return hashlib.sha256(conversation_text.encode('utf-8')).hexdigest()
+
+def extracted_value_hash(value: Any) -> str:
+    """Fingerprint of a stored field value, to tell whether it still holds what extraction wrote"""
+    return hashlib.sha256(encode_stored_json(value).encode('utf-8')).hexdigest()[:16]
+
+def extract_form_data_incremental(form_id: str, user_id: str, template_fields: Any, conversation_text: str,
+                                  template_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Re-extract a growing transcript, sending only the new segment and the fields still open
+
+    The form's extractionState records how much of the transcript has been extracted
+    (offset plus a hash of that prefix), and the confidence and a value hash of every
+    extracted field. Fields filled by the clinician, extracted with at least
+    INCREMENTAL_RECHECK_CONFIDENCE, or changed by the clinician since they were
+    extracted are not asked for again. If the transcript no longer starts with the
+    extracted prefix, extraction starts over from the beginning.
+    """
+    form = get_filled_form(form_id, user_id)
+    if not form:
+        return None
+
+    compiled = get_compiled_template(template_fields, template_version)
+    data = form.get('data', {})
+    state = form.get('extractionState') or {}
+    offset = int(state.get('transcriptOffset', 0))
+    if offset > len(conversation_text) or state.get('transcriptHash') != transcript_hash(conversation_text[:offset]):
+        if offset:
+            logger.info(f"Transcript for form {form_id} no longer matches extracted prefix, starting over")
+        offset = 0
+        state = {}
+    field_confidence = dict(state.get('fields', {}))
+    value_hashes = dict(state.get('valueHashes', {}))
+
+    def still_extracted(field_id, path):
+        # A value the clinician edited after extraction is theirs, however low the confidence was
+        return value_hashes.get(field_id) == extracted_value_hash(get_nested_value(data, path))
+
+    pending_ids = [
+        field_id for field_id, path in compiled.paths.items()
+        if (field_id in field_confidence and field_confidence[field_id] < INCREMENTAL_RECHECK_CONFIDENCE
+            and still_extracted(field_id, path))
+        or (field_id not in field_confidence and get_nested_value(data, path) is None)
+    ]
+    if offset >= len(conversation_text) or not pending_ids:
+        logger.info(f"Nothing to re-extract for form {form_id}")
+        return form
+
+    # Keep a little already-seen context so statements spanning the boundary are not cut
+    segment = conversation_text[max(0, offset - INCREMENTAL_CONTEXT_CHARS):]
+    logger.info(
+        f"Incremental extraction for form {form_id}: {len(conversation_text) - offset} new characters, "
+        f"{len(pending_ids)} of {len(compiled.paths)} fields"
+    )
+    extracted_fields = extraction_backend.extract(compiled.subset(pending_ids), segment)
+
+    updated_data = copy.deepcopy(data)
+    stored_confidence = apply_extracted_fields(updated_data, extracted_fields, compiled, set(pending_ids))
+    updated_data = convert_floats_to_decimals(updated_data)
+    field_confidence.update(stored_confidence)
+    value_hashes.update({
+        field_id: extracted_value_hash(get_nested_value(updated_data, compiled.paths[field_id]))
+        for field_id in stored_confidence
+    })
+
+    new_state = {
+        'transcriptOffset': len(conversation_text),
+        'transcriptHash': transcript_hash(conversation_text),
+        'fields': field_confidence,
+        'valueHashes': value_hashes
+    }
+    try:
+        return write_form_data(
+            form_id, user_id, updated_data,
+            {'extractionState': convert_floats_to_decimals(new_state), 'updatedAt': int(time.time())},
+            *form_unchanged_condition(form)
+        )
+    except client_error() as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            raise ConflictError("Form was modified during extraction, please retry")
+        raise
+
+def handle_extraction_records(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker entry point for SQS-delivered extraction and export jobs"""
+    failures = []
+    for record in event.get('Records', []):
+        receive_count = int(record.get('attributes', {}).get('ApproximateReceiveCount', 1))
+        try:
+            process_queued_job(decode_stored_json(record['body']), receive_count >= EXTRACTION_MAX_RECEIVES)
+        except Exception as e:
+            logger.error(f"Job {record.get('messageId')} failed: {str(e)}")
+            logger.error(traceback.format_exc())
+            failures.append({'itemIdentifier': record.get('messageId')})
+    return {'batchItemFailures': failures}
+
+def encode_page_token(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a DynamoDB LastEvaluatedKey as an opaque pagination token"""
+    if not last_evaluated_key:
+        return None
+    raw = encode_stored_json(last_evaluated_key)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_page_token(token: str) -> Dict[str, Any]:
+    """Decode a pagination token back into an ExclusiveStartKey"""
+    try:
+        key = decode_stored_json(base64.urlsafe_b64decode(token.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid nextToken") from e
+    if not isinstance(key, dict):
+        raise ValueError("Invalid nextToken")
+    return key
+
+def parse_page_limit(value: Optional[str]) -> int:
+    """Parse the limit query parameter, clamped to the allowed page size"""
+    if value is None or value == '':
+        return DEFAULT_PAGE_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid limit: {value}")
+    if limit < 1:
+        raise ValueError(f"Invalid limit: {value}")
+    return min(limit, MAX_PAGE_LIMIT)
+
+def parse_list_projection(query_params: Dict[str, str], summary_attributes: List[str],
+                          key_attributes: List[str]) -> Optional[List[str]]:
+    """Pick a list endpoint's projection: ?fields=a,b, everything for ?view=full, else the summary"""
+    fields = query_params.get('fields')
+    if fields:
+        names = parse_projection_fields([name.strip() for name in fields.split(',') if name.strip()])
+        # Keys always come back so the client can fetch or update the item
+        return distinct_projection([*key_attributes, *names])
+    if query_params.get('view') == 'full':
+        return None
+    return summary_attributes
+
+def parse_projection_fields(names: Any) -> List[str]:
+    """Check requested fields: at most MAX_PROJECTION_FIELDS attribute names or dotted data paths"""
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise ValueError("fields must be a list of attribute names")
+    if len(names) > MAX_PROJECTION_FIELDS:
+        raise ValueError(f"At most {MAX_PROJECTION_FIELDS} fields can be requested")
+    invalid = [name for name in names if not PROJECTION_FIELD_PATTERN.match(name)]
+    if not names or invalid:
+        raise ValueError(f"Invalid fields: {','.join(names)}")
+    return names
+
+def distinct_projection(names: List[str]) -> List[str]:
+    """Drop repeated names and paths under another requested path, which DynamoDB rejects as overlapping"""
+    names = list(dict.fromkeys(names))
+    return [name for name in names if not any(name.startswith(f"{other}.") for other in names)]
+
+def projection_expression(projection: List[str]) -> tuple[str, Dict[str, str]]:
+    """Build a ProjectionExpression and its attribute names, one placeholder per path segment"""
+    names = {}
+    paths = []
+    for path in projection:
+        segments = []
+        for segment in path.split('.'):
+            names.setdefault(segment, f"#p{len(names)}")
+            segments.append(names[segment])
+        paths.append('.'.join(segments))
+    return ', '.join(paths), {placeholder: segment for segment, placeholder in names.items()}
+
+def form_projection(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Add dataBlob to a projection that asks for data, so offloaded forms can be hydrated"""
+    if isinstance(fields, list) and 'dataBlob' not in fields and any(
+            isinstance(field, str) and (field == 'data' or field.startswith('data.')) for field in fields):
+        return fields + ['dataBlob']
+    return fields
+
+def select_paths(value: Dict[str, Any], paths: List[List[str]]) -> Dict[str, Any]:
+    """Copy only the given key paths of a nested dict, skipping paths it does not have"""
+    selected = {}
+    for path in paths:
+        node = value
+        for key in path:
+            if not isinstance(node, dict) or key not in node:
+                break
+            node = node[key]
+        else:
+            target = selected
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = node
+    return selected
+
+def project_form_data(items: List[Dict[str, Any]], projection: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Cut data hydrated from a blob down to the data.* paths the projection asked for"""
+    if not projection or 'data' in projection:
+        return items
+    paths = [name.split('.')[1:] for name in projection if name.startswith('data.')]
+    if paths:
+        for item in items:
+            if 'data' in item:
+                item['data'] = select_paths(item['data'], paths)
+    return items
+
+def build_template_sort_key(template_code: str, created_at: int) -> str:
+    """Build the templateCode#createdAt sort key used by the template index"""
+    # Zero-padded so lexicographic order matches numeric createdAt order
+    return f"{template_code}#{int(created_at):0{TEMPLATE_SORT_KEY_WIDTH}d}"
+
+def parse_timestamp_param(value: Optional[str], name: str) -> Optional[int]:
+    """Parse an epoch-seconds query parameter"""
+    if value is None or value == '':
+        return None
+    try:
+        timestamp = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name}: {value}")
+    if timestamp < 0 or timestamp >= 10 ** TEMPLATE_SORT_KEY_WIDTH:
+        raise ValueError(f"Invalid {name}: {value}")
+    return timestamp
+
+def list_filled_forms(user_id: str, template_code: Optional[str] = None,
+                      limit: int = DEFAULT_PAGE_LIMIT, next_token: Optional[str] = None,
+                      projection: Optional[List[str]] = FORM_SUMMARY_ATTRIBUTES,
+                      created_after: Optional[int] = None,
+                      created_before: Optional[int] = None) -> Dict[str, Any]:
+    """List one page of filled forms for a user, newest first, optionally filtered by template."""
+    try:
+        query_kwargs = {
+            'ExpressionAttributeValues': {':uid': user_id},
+            'ExpressionAttributeNames': {'#userId': 'userId'},
+            'ScanIndexForward': False,
+            'Limit': limit
+        }
+
         if template_code:
-            # Use the GSI with templateId instead of templateCode
-            response = filled_forms_table.query(
-                IndexName='userIdIndex',
-                KeyConditionExpression='userId = :uid AND templateId = :tid',
-                ExpressionAttributeValues={
-                    ':uid': user_id,
-                    ':tid': template_code  # We're using templateCode as templateId
-                }
+            # userId + templateCode#createdAt, so a template filter is a key range
+            query_kwargs['IndexName'] = USER_TEMPLATE_INDEX
+            query_kwargs['ExpressionAttributeNames']['#sk'] = 'templateSortKey'
+            query_kwargs['ExpressionAttributeValues'][':lo'] = build_template_sort_key(
+                template_code, created_after if created_after is not None else 0
             )
-        else:
-            # When no template_code is provided, just query by userId
-            response = filled_forms_table.query(
-                IndexName='userIdIndex',
-                KeyConditionExpression='userId = :uid',
-                ExpressionAttributeValues={
-                    ':uid': user_id
-                }
+            query_kwargs['ExpressionAttributeValues'][':hi'] = build_template_sort_key(
+                template_code, created_before if created_before is not None else 10 ** TEMPLATE_SORT_KEY_WIDTH - 1
             )
-        
-        items = response.get('Items', [])
+            query_kwargs['KeyConditionExpression'] = '#userId = :uid AND #sk BETWEEN :lo AND :hi'
+            start_key_attribute = 'templateSortKey'
+        elif created_after is not None or created_before is not None:
+            raise ValueError("createdAfter/createdBefore require templateCode")
+        else:
+            query_kwargs['IndexName'] = 'userIdIndex'
+            query_kwargs['KeyConditionExpression'] = '#userId = :uid'
+            start_key_attribute = 'formId'
+
+        projection = form_projection(projection)
+        if projection:
+            query_kwargs['ProjectionExpression'], names = projection_expression(projection)
+            query_kwargs['ExpressionAttributeNames'].update(names)
+
+        if next_token:
+            start_key = decode_page_token(next_token)
+            if start_key.get('userId') != user_id or start_key_attribute not in start_key:
+                raise ValueError("Invalid nextToken")
+            query_kwargs['ExclusiveStartKey'] = serialize_item(start_key)
+
+        query_kwargs['ExpressionAttributeValues'] = serialize_item(query_kwargs['ExpressionAttributeValues'])
+        response = dynamodb_client.query(TableName=FILLED_FORMS_TABLE, **query_kwargs)
+        items = project_form_data(
+            hydrate_form_items([deserialize_item(item) for item in response.get('Items', [])]), projection
+        )
         logger.info(f"Query returned {len(items)} items")
-        
-        if not items:
-            # Fallback to scan if query returns no results
-            logger.info("Query returned no results, attempting scan fallback")
-            scan_response = filled_forms_table.scan()
-            all_items = scan_response.get('Items', [])
-            
-            # Filter items for the specific user
-            items = [item for item in all_items if item.get('userId') == user_id]
-            if template_code:
-                items = [item for item in items if item.get('templateCode') == template_code]
-            
-            logger.info(f"Fallback scan found {len(items)} items")
-        
-        return items
-        
+
+        last_key = response.get('LastEvaluatedKey')
+        return {
+            'items': items,
+            'nextToken': encode_page_token(deserialize_item(last_key) if last_key else None)
+        }
+
     except Exception as e:
         logger.error(f"Error listing filled forms: {str(e)}")
         logger.error(traceback.format_exc())
         raise
-        
+
 def update_filled_form(form_id: str, user_id: str, form_data: Dict[str, Any]) -> Dict[str, Any]:
     """Update a filled form with proper type handling."""
     timestamp = int(time.time())
@@ -409,23 +2823,166 @@ def update_filled_form(form_id: str, user_id: str, form_data: Dict[str, Any]) ->
     # Convert any float values to Decimal
     converted_data = convert_floats_to_decimals(form_data.get('data', {}))
     
-    update_expression = 'SET updatedAt = :timestamp, #data = :data'
-    expression_values = {
-        ':timestamp': timestamp,
-        ':data': converted_data
+    return write_form_data(form_id, user_id, converted_data, {'updatedAt': timestamp})
+
+def flatten_data_changes(changes: Dict[str, Any], prefix: tuple = ()) -> List[tuple]:
+    """Flatten a nested partial data dict into (path, value) pairs; lists and scalars are leaves"""
+    pairs = []
+    for key, value in changes.items():
+        path = prefix + (key,)
+        if isinstance(value, dict) and value:
+            pairs.extend(flatten_data_changes(value, path))
+        else:
+            pairs.append((path, value))
+    return pairs
+
+def apply_data_changes(data: Dict[str, Any], set_paths: List[tuple], remove_paths: List[tuple]) -> Dict[str, Any]:
+    """Apply a patch to a copy of a form's data in Python"""
+    updated = copy.deepcopy(data)
+    for path, value in set_paths:
+        target = updated
+        for part in path[:-1]:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[path[-1]] = value
+    for path in remove_paths:
+        target = get_nested_value(updated, path[:-1]) if len(path) > 1 else updated
+        if isinstance(target, dict):
+            target.pop(path[-1], None)
+    return updated
+
+def parse_form_precondition(value: Any, name: str) -> Optional[int]:
+    """Parse the version or updatedAt a client read; GET returns numbers as JSON strings"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not re.fullmatch(r'\d+', str(value).strip()):
+        raise ValueError(f"Invalid {name}: {value}")
+    return int(str(value).strip())
+
+def form_unchanged_condition(form: Dict[str, Any]) -> tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Condition, names and values for a write that must find the form as it was read
+
+    Forms saved before versions were tracked fall back to comparing updatedAt.
+    """
+    if 'version' in form:
+        return '#version = :previous', {'#version': 'version'}, {':previous': form['version']}
+    return 'attribute_not_exists(#version) AND updatedAt = :previous', {'#version': 'version'}, {
+        ':previous': form['updatedAt']
     }
-    
-    response = filled_forms_table.update_item(
-        Key={
-            'formId': form_id,
-            'userId': user_id
-        },
-        UpdateExpression=update_expression,
-        ExpressionAttributeValues=expression_values,
-        ExpressionAttributeNames={'#data': 'data'},
-        ReturnValues='ALL_NEW'
-    )
-    return response.get('Attributes')
+
+def patch_filled_form(form_id: str, user_id: str, patch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply a field-level patch to a filled form's data.
+
+    patch carries 'changes' (a nested partial data dict), 'remove' (dotted field
+    paths) and optionally 'version' and/or 'updatedAt' as the client last read
+    them. Only the touched paths are sent as SET data.#a.#b = :v / REMOVE
+    expressions; when a version or updatedAt is given, the write only succeeds
+    if nobody saved in between. updatedAt has one-second resolution, so
+    clients should prefer version.
+    """
+    changes = patch.get('changes') or {}
+    remove = patch.get('remove') or []
+    if not isinstance(changes, dict) or not isinstance(remove, list):
+        raise ValueError("changes must be an object and remove a list of field paths")
+    set_paths = flatten_data_changes(convert_floats_to_decimals(changes))
+    remove_paths = [tuple(str(field_path).split('.')) for field_path in remove]
+    if not set_paths and not remove_paths:
+        raise ValueError("Patch has no changes")
+    if len(set_paths) + len(remove_paths) > PATCH_MAX_PATHS:
+        raise ValueError(f"At most {PATCH_MAX_PATHS} fields can be patched at once")
+
+    expected_version = parse_form_precondition(patch.get('version'), 'version')
+    expected_updated_at = parse_form_precondition(patch.get('updatedAt'), 'updatedAt')
+    timestamp = int(time.time())
+    names = {'#data': 'data', '#version': 'version'}
+    values = {':timestamp': timestamp, ':zero': 0, ':one': 1}
+    name_placeholders = {}
+
+    def is_stale(item):
+        return (expected_version is not None and item.get('version', 0) != expected_version) or (
+            expected_updated_at is not None and item.get('updatedAt') != expected_updated_at
+        )
+
+    def path_expression(path):
+        parts = ['#data']
+        for part in path:
+            if part not in name_placeholders:
+                name_placeholders[part] = f"#f{len(name_placeholders)}"
+                names[name_placeholders[part]] = part
+            parts.append(name_placeholders[part])
+        return '.'.join(parts)
+
+    set_clauses = ['updatedAt = :timestamp', '#version = if_not_exists(#version, :zero) + :one']
+    for index, (path, value) in enumerate(set_paths):
+        set_clauses.append(f"{path_expression(path)} = :v{index}")
+        values[f":v{index}"] = value
+    update_expression = 'SET ' + ', '.join(set_clauses)
+    if remove_paths:
+        update_expression += ' REMOVE ' + ', '.join(path_expression(path) for path in remove_paths)
+
+    # Offloaded data has no inline map to patch into; those forms take the rewrite path below
+    condition = 'attribute_exists(formId) AND attribute_not_exists(dataBlob)'
+    if expected_version is not None:
+        condition += ' AND #version = :expected_version'
+        values[':expected_version'] = expected_version
+    if expected_updated_at is not None:
+        condition += ' AND updatedAt = :expected'
+        values[':expected'] = expected_updated_at
+
+    try:
+        response = filled_forms_table.update_item(
+            Key={
+                'formId': form_id,
+                'userId': user_id
+            },
+            UpdateExpression=update_expression,
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+            ReturnValues='ALL_NEW'
+        )
+        patched = response.get('Attributes')
+        index_form(patched)
+        return patched
+    except client_error() as e:
+        code = e.response['Error']['Code']
+        if code == 'ConditionalCheckFailedException':
+            current = filled_forms_table.get_item(
+                Key={
+                    'formId': form_id,
+                    'userId': user_id
+                },
+                ProjectionExpression='formId, updatedAt, dataBlob, #version',
+                ExpressionAttributeNames={'#version': 'version'}
+            ).get('Item')
+            if current is None:
+                return None
+            if 'dataBlob' not in current or is_stale(current):
+                raise ConflictError("Form was modified by another save, reload and retry")
+            logger.info(f"Form {form_id} data is in blob storage, rewriting data")
+        elif code != 'ValidationException':
+            raise
+        else:
+            # A parent map on one of the paths does not exist yet, or the item outgrew the
+            # size limit; fall back to a whole-data write
+            logger.info(f"Field-level patch of form {form_id} could not be applied in place, rewriting data")
+
+    form = get_filled_form(form_id, user_id)
+    if form is None:
+        return None
+    if is_stale(form):
+        raise ConflictError("Form was modified by another save, reload and retry")
+    try:
+        return write_form_data(
+            form_id, user_id, apply_data_changes(form.get('data', {}), set_paths, remove_paths),
+            {'updatedAt': timestamp},
+            *form_unchanged_condition(form)
+        )
+    except client_error() as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            raise ConflictError("Form was modified by another save, reload and retry")
+        raise
 
 def delete_filled_form(form_id: str, user_id: str) -> Dict[str, Any]:
     """Delete a filled form."""
@@ -436,198 +2993,1038 @@ def delete_filled_form(form_id: str, user_id: str) -> Dict[str, Any]:
         },
         ReturnValues='ALL_OLD'
     )
-    return response.get('Attributes')
+    deleted = response.get('Attributes')
+    if deleted and 'dataBlob' in deleted:
+        pointer = deleted['dataBlob']
+        try:
+            hydrate_form_item(deleted)
+        except Exception as e:
+            logger.warning(f"Could not load data of deleted form {form_id}: {str(e)}")
+        delete_form_blob(pointer)
+    if deleted:
+        unindex_form(form_id, user_id, deleted.get('createdAt', 0))
+    return deleted
 
+# Search index: one item per (user, term, form) plus a per-form entry listing the form's terms.
+# SEARCH_INDEX_TABLE: userId (HASH) + termKey (RANGE), "<term>#<newest-first createdAt>#<formId>"
+SEARCH_INDEX_TABLE = os.getenv('SEARCH_INDEX_TABLE')
+# Longer values are narrative text, which is not indexed
+SEARCH_MAX_VALUE_CHARS = 200
+SEARCH_MAX_TERMS_PER_FORM = 64
+SEARCH_MAX_TERM_CHARS = 40
+SEARCH_MAX_QUERY_TERMS = 8
+# Index pages one search may read while filtering for the remaining query words
+SEARCH_MAX_PAGES = 5
+SEARCH_HIT_ATTRIBUTES = ['formId', 'templateCode', 'createdAt']
+SEARCH_FORM_ENTRY_PREFIX = '#form#'
+# Decimal numbers stay one token, so "98.6" is found the way it is stored
+SEARCH_TOKEN_PATTERN = re.compile(r'\d+(?:\.\d+)+|[^\W_]+')
 
-def lambda_handler(event, context):
+search_index_table = LazyResource(lambda: dynamodb.Table(SEARCH_INDEX_TABLE))
+
+def search_tokens(text: str) -> List[str]:
+    """Lowercased, accent-folded words of a text, the same for indexed values and queries"""
+    folded = ''.join(char for char in unicodedata.normalize('NFKD', text.lower()) if not unicodedata.combining(char))
+    return [token[:SEARCH_MAX_TERM_CHARS] for token in SEARCH_TOKEN_PATTERN.findall(folded)]
+
+def form_search_terms(item: Dict[str, Any]) -> List[str]:
+    """Distinct terms of a form: its templateCode, then the words of its short data values in field order"""
+    terms = dict.fromkeys(search_tokens(item.get('templateCode') or ''))
+
+    def collect(value):
+        if len(terms) >= SEARCH_MAX_TERMS_PER_FORM:
+            return
+        if isinstance(value, dict):
+            for nested in value.values():
+                collect(nested)
+        elif isinstance(value, list):
+            for nested in value:
+                collect(nested)
+        elif isinstance(value, str) and len(value) <= SEARCH_MAX_VALUE_CHARS:
+            terms.update(dict.fromkeys(
+                token for token in search_tokens(value) if len(token) > 1 or token.isdigit()
+            ))
+        elif isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            terms.update(dict.fromkeys(search_tokens(format(Decimal(str(value)), 'f'))))
+
+    collect(item.get('data') or {})
+    return list(terms)[:SEARCH_MAX_TERMS_PER_FORM]
+
+def search_term_key(term: str, created_at: int, form_id: str) -> str:
+    # Newest first within a term, so the first page of a search is the most recent forms
+    return f"{term}#{10 ** TEMPLATE_SORT_KEY_WIDTH - 1 - int(created_at):0{TEMPLATE_SORT_KEY_WIDTH}d}#{form_id}"
+
+def index_form(item: Optional[Dict[str, Any]], created: bool = False, rebuild: bool = False) -> None:
+    """Bring a saved form's search postings in line with its data
+
+    Nothing is written when the form's terms and hit attributes are unchanged.
+    Otherwise every posting is rewritten, since each carries the form's full
+    term list, and postings of dropped terms are deleted. rebuild rewrites them
+    even when nothing changed. Index failures are logged and counted, not
+    raised: the form is already saved, and scripts/backfill_search_index.py
+    repairs the index.
+    """
+    if not SEARCH_INDEX_TABLE or not item:
+        return
+    form_id, user_id = item['formId'], item['userId']
     try:
-        # Print the entire event for debugging
-        logger.info(f"Incoming event: {json.dumps(event)}")
-        
-        # Define CORS headers
-        cors_headers = {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-            'Access-Control-Allow-Methods': 'OPTIONS,POST,GET,PUT,DELETE'
+        with request_metrics.timer('SearchIndexMs'):
+            terms = form_search_terms(item)
+            hit = {name: item[name] for name in SEARCH_HIT_ATTRIBUTES if name in item}
+            entry_key = {'userId': user_id, 'termKey': f"{SEARCH_FORM_ENTRY_PREFIX}{form_id}"}
+            previous = {} if created else search_index_table.get_item(Key=entry_key).get('Item', {})
+            previous_terms = previous.get('terms', '').split()
+            if previous and previous_terms == terms and previous.get('hit') == hit and not rebuild:
+                return
+
+            created_at = item.get('createdAt', 0)
+            # Posting items carry every term of the form so multi-word searches can filter on one read
+            terms_text = ' ' + ' '.join(sorted(terms))
+            with search_index_table.batch_writer() as writer:
+                for term in set(previous_terms) - set(terms):
+                    writer.delete_item(Key={'userId': user_id, 'termKey': search_term_key(term, created_at, form_id)})
+                for term in terms:
+                    writer.put_item(Item={
+                        'userId': user_id, 'termKey': search_term_key(term, created_at, form_id),
+                        'terms': terms_text, **hit
+                    })
+                writer.put_item(Item={**entry_key, 'terms': ' '.join(terms), 'hit': hit})
+            request_metrics.add('SearchPostingsWritten', len(terms))
+    except Exception as e:
+        logger.warning(f"Could not update search index for form {form_id}: {str(e)}")
+        request_metrics.add('SearchIndexErrors')
+
+def unindex_form(form_id: str, user_id: str, created_at: int) -> None:
+    """Remove a deleted form's postings from the search index"""
+    if not SEARCH_INDEX_TABLE:
+        return
+    try:
+        entry_key = {'userId': user_id, 'termKey': f"{SEARCH_FORM_ENTRY_PREFIX}{form_id}"}
+        entry = search_index_table.get_item(Key=entry_key).get('Item', {})
+        with search_index_table.batch_writer() as writer:
+            for term in entry.get('terms', '').split():
+                writer.delete_item(Key={'userId': user_id, 'termKey': search_term_key(term, created_at, form_id)})
+            writer.delete_item(Key=entry_key)
+    except Exception as e:
+        logger.warning(f"Could not remove form {form_id} from search index: {str(e)}")
+        request_metrics.add('SearchIndexErrors')
+
+def search_filled_forms(user_id: str, query: str, limit: int = DEFAULT_PAGE_LIMIT, next_token: Optional[str] = None,
+                        template_code: Optional[str] = None) -> Dict[str, Any]:
+    """Find a user's forms containing every word of query, each as a word prefix, newest first per term.
+
+    Reads the postings of the longest query word only; the other words are
+    matched against the term list each posting carries.
+    """
+    if not SEARCH_INDEX_TABLE:
+        raise ValueError("Search is not configured")
+    words = list(dict.fromkeys(search_tokens(query or '')))[:SEARCH_MAX_QUERY_TERMS]
+    if not words:
+        raise ValueError("q must contain at least one letter or digit")
+    key_word = max(words, key=len)
+
+    names = {'#userId': 'userId', '#termKey': 'termKey'}
+    values = {':uid': user_id, ':key': key_word}
+    filters = []
+    for index, word in enumerate(word for word in words if word != key_word):
+        names['#terms'] = 'terms'
+        values[f":w{index}"] = f" {word}"
+        filters.append(f"contains(#terms, :w{index})")
+    if template_code:
+        names['#templateCode'] = 'templateCode'
+        values[':templateCode'] = template_code
+        filters.append('#templateCode = :templateCode')
+    query_kwargs = {
+        'TableName': SEARCH_INDEX_TABLE,
+        'KeyConditionExpression': '#userId = :uid AND begins_with(#termKey, :key)',
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': serialize_item(values),
+    }
+    if filters:
+        query_kwargs['FilterExpression'] = ' AND '.join(filters)
+    if next_token:
+        start_key = decode_page_token(next_token)
+        if start_key.get('userId') != user_id or not str(start_key.get('termKey', '')).startswith(key_word):
+            raise ValueError("Invalid nextToken")
+        query_kwargs['ExclusiveStartKey'] = serialize_item(start_key)
+
+    hits = []
+    last_key = None
+    for _ in range(SEARCH_MAX_PAGES):
+        response = dynamodb_client.query(**query_kwargs, Limit=limit - len(hits))
+        request_metrics.add('SearchPostingsRead', response.get('ScannedCount', 0))
+        for raw in response.get('Items', []):
+            posting = deserialize_item(raw)
+            # A prefix can match several words of one form; only the first of them reports the hit
+            term = posting['termKey'].split('#', 1)[0]
+            first_match = next(word for word in posting['terms'].split() if word.startswith(key_word))
+            if term == first_match:
+                hits.append({name: posting[name] for name in SEARCH_HIT_ATTRIBUTES if name in posting})
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key or len(hits) >= limit:
+            break
+        query_kwargs['ExclusiveStartKey'] = last_key
+
+    logger.info(f"Search for {len(words)} words returned {len(hits)} forms")
+    return {
+        'items': hits,
+        'nextToken': encode_page_token(deserialize_item(last_key) if last_key else None)
+    }
+
+# Bulk export: reads run in parallel into a bounded queue and a format writer streams them to the export store
+EXPORT_SEGMENTS = int(os.getenv('EXPORT_SEGMENTS', '8'))
+EXPORT_PAGE_SIZE = 1000
+# Pages waiting for the writer per segment; with EXPORT_PAGE_SIZE this caps the items held in memory
+EXPORT_QUEUE_PAGES_PER_SEGMENT = 2
+EXPORT_PARQUET_ROW_GROUP_ROWS = 10000
+EXPORT_URL_TTL_SECONDS = int(os.getenv('EXPORT_URL_TTL_SECONDS', '3600'))
+EXPORT_ATTRIBUTES = ['formId', 'userId', 'templateCode', 'templateId', 'status', 'createdAt', 'updatedAt']
+
+# Export status values, recorded in the export's manifest
+EXPORT_STATUS_RUNNING = 'running'
+EXPORT_STATUS_READY = 'ready'
+EXPORT_STATUS_FAILED = 'failed'
+
+def build_export_store() -> Optional[BlobStore]:
+    """Build the export store from EXPORT_BUCKET or EXPORT_DIR; None disables exports"""
+    if os.getenv('EXPORT_BUCKET'):
+        return S3BlobStore(os.environ['EXPORT_BUCKET'])
+    if os.getenv('EXPORT_DIR'):
+        return LocalBlobStore(os.environ['EXPORT_DIR'])
+    return None
+
+export_store = build_export_store()
+
+def export_columns(compiled: Optional[CompiledTemplate]) -> List[tuple]:
+    """(header, item path, field type) per output column: the form attributes, then data by field index
+
+    Without a template, data is a single JSON column.
+    """
+    columns = [
+        (name, (name,), 'number' if name in ('createdAt', 'updatedAt') else 'text') for name in EXPORT_ATTRIBUTES
+    ]
+    if compiled is None:
+        return columns + [('data', ('data',), 'json')]
+    return columns + [
+        (f"data.{field['id']}", ('data', *field['path']), field['type']) for field in compiled.field_info
+    ]
+
+def export_cell(value: Any, field_type: str) -> Any:
+    """A value as flat output: numbers stay numbers, lists and maps become JSON"""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return encode_stored_json(value)
+    if field_type in NUMBER_FIELD_TYPES:
+        number = convert_number(value)
+        if number is not None:
+            return int(number) if number == number.to_integral_value() else float(number)
+    return value if isinstance(value, str) else str(value)
+
+class ExportWriter(ABC):
+    """Encodes exported forms in one file format, returning output bytes as it goes so they can be streamed"""
+    extension = None
+
+    def __init__(self, columns: List[tuple]):
+        self.columns = columns
+
+    @abstractmethod
+    def write(self, items: List[Dict[str, Any]]) -> bytes:
+        ...
+
+    def close(self) -> bytes:
+        return b''
+
+class NdjsonExportWriter(ExportWriter):
+    """One JSON object per line, with data kept nested"""
+    extension = 'ndjson'
+
+    def write(self, items):
+        return ''.join(
+            encode_stored_json({name: item[name] for name in (*EXPORT_ATTRIBUTES, 'data') if name in item}) + '\n'
+            for item in items
+        ).encode('utf-8')
+
+class CsvExportWriter(ExportWriter):
+    """One row per form, data flattened to a column per template field"""
+    extension = 'csv'
+
+    def __init__(self, columns):
+        super().__init__(columns)
+        self.header_written = False
+
+    def write(self, items):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if not self.header_written:
+            writer.writerow([header for header, _, _ in self.columns])
+            self.header_written = True
+        for item in items:
+            writer.writerow([
+                '' if cell is None else cell
+                for cell in (export_cell(get_nested_value(item, path), field_type) for _, path, field_type in self.columns)
+            ])
+        return out.getvalue().encode('utf-8')
+
+    def close(self):
+        # An export with no forms is still a valid CSV with its header
+        return b'' if self.header_written else self.write([])
+
+class ParquetChunkSink:
+    """File object pyarrow writes into; drain() hands back what it wrote since the last call"""
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.size
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        body = b''.join(self.chunks)
+        self.chunks = []
+        return body
+
+class ParquetExportWriter(ExportWriter):
+    """Columnar output with the same columns as CSV, written a row group at a time"""
+    extension = 'parquet'
+
+    def __init__(self, columns):
+        if pyarrow is None:
+            raise ValueError("Parquet export requires pyarrow, which is not installed")
+        super().__init__(columns)
+        self.schema = pyarrow.schema([
+            (header, pyarrow.float64() if field_type in NUMBER_FIELD_TYPES else pyarrow.string())
+            for header, _, field_type in columns
+        ])
+        self.sink = ParquetChunkSink()
+        self.writer = pyarrow.parquet.ParquetWriter(self.sink, self.schema, compression='zstd')
+        self.rows = []
+
+    def write(self, items):
+        for item in items:
+            self.rows.append([export_cell(get_nested_value(item, path), field_type) for _, path, field_type in self.columns])
+        if len(self.rows) < EXPORT_PARQUET_ROW_GROUP_ROWS:
+            return b''
+        self.flush_rows()
+        return self.sink.drain()
+
+    def flush_rows(self) -> None:
+        if not self.rows:
+            return
+        columns = {}
+        for index, (header, _, field_type) in enumerate(self.columns):
+            values = [row[index] for row in self.rows]
+            if field_type in NUMBER_FIELD_TYPES:
+                values = [value if isinstance(value, (int, float)) else None for value in values]
+            columns[header] = values
+        self.writer.write_table(pyarrow.Table.from_pydict(columns, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush_rows()
+        self.writer.close()
+        return self.sink.drain()
+
+EXPORT_WRITERS = {
+    'ndjson': NdjsonExportWriter,
+    'csv': CsvExportWriter,
+    'parquet': ParquetExportWriter,
+}
+
+# Range key of each FilledForms index, looked up once per container
+index_range_keys: Dict[str, Optional[str]] = {}
+
+def index_range_key(index_name: str) -> Optional[str]:
+    """Range key attribute of a FilledForms GSI, or None when it has none or the table cannot be described"""
+    if index_name not in index_range_keys:
+        try:
+            table = dynamodb_client.describe_table(TableName=FILLED_FORMS_TABLE)['Table']
+        except client_error() as e:
+            logger.warning(f"Could not describe {FILLED_FORMS_TABLE}: {e}")
+            return None
+        for index in table.get('GlobalSecondaryIndexes', []):
+            index_range_keys[index['IndexName']] = next(
+                (key['AttributeName'] for key in index['KeySchema'] if key['KeyType'] == 'RANGE'), None
+            )
+        index_range_keys.setdefault(index_name, None)
+    return index_range_keys[index_name]
+
+def export_time_bound(index_name: str, key_condition: str, names: Dict[str, str], values: Dict[str, Any],
+                      forward: bool) -> Optional[int]:
+    """createdAt of the oldest (forward) or newest form matching a key condition, or None when there are none"""
+    response = dynamodb_client.query(
+        TableName=FILLED_FORMS_TABLE,
+        IndexName=index_name,
+        KeyConditionExpression=key_condition,
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=serialize_item(values),
+        ProjectionExpression='#sk',
+        ScanIndexForward=forward,
+        Limit=1
+    )
+    items = response.get('Items', [])
+    if not items:
+        return None
+    bound = deserialize_item(items[0])[names['#sk']]
+    return int(bound.rsplit('#', 1)[-1]) if isinstance(bound, str) else int(bound)
+
+def export_read_requests(user_id: Optional[str], template_code: Optional[str] = None,
+                         created_after: Optional[int] = None, created_before: Optional[int] = None,
+                         segments: int = EXPORT_SEGMENTS) -> List[tuple]:
+    """Split an export into (operation, request) DynamoDB reads that cover it without overlap
+
+    A user's forms are split into createdAt ranges of userIdIndex, or of
+    userTemplateIndex for one template, so each range is its own Query. Where
+    userIdIndex has no createdAt range key a user's forms are one paginated
+    Query, with the createdAt bounds as a filter. With no user the whole table
+    is read by a segmented Scan.
+    """
+    segments = max(1, segments)
+    if user_id is None:
+        conditions, names, values = [], {}, {}
+        if template_code:
+            conditions.append('#templateCode = :templateCode')
+            names['#templateCode'] = 'templateCode'
+            values[':templateCode'] = template_code
+        if created_after is not None or created_before is not None:
+            conditions.append('#createdAt BETWEEN :lo AND :hi')
+            names['#createdAt'] = 'createdAt'
+            values[':lo'] = created_after if created_after is not None else 0
+            values[':hi'] = created_before if created_before is not None else 10 ** TEMPLATE_SORT_KEY_WIDTH - 1
+        scan = {'TableName': FILLED_FORMS_TABLE, 'TotalSegments': segments}
+        if conditions:
+            scan['FilterExpression'] = ' AND '.join(conditions)
+            scan['ExpressionAttributeNames'] = names
+            scan['ExpressionAttributeValues'] = serialize_item(values)
+        return [('scan', {**scan, 'Segment': segment}) for segment in range(segments)]
+
+    names = {'#userId': 'userId', '#sk': 'templateSortKey' if template_code else 'createdAt'}
+    values = {':uid': user_id}
+    if template_code:
+        index_name = USER_TEMPLATE_INDEX
+        sort_value = lambda timestamp: build_template_sort_key(template_code, timestamp)
+        values[':lo'] = sort_value(0)
+        values[':hi'] = sort_value(10 ** TEMPLATE_SORT_KEY_WIDTH - 1)
+        key_condition = '#userId = :uid AND #sk BETWEEN :lo AND :hi'
+    elif index_range_key('userIdIndex') != 'createdAt':
+        query = {
+            'TableName': FILLED_FORMS_TABLE,
+            'IndexName': 'userIdIndex',
+            'KeyConditionExpression': '#userId = :uid',
+            'ExpressionAttributeNames': {'#userId': 'userId'},
+            'ExpressionAttributeValues': serialize_item(values)
         }
-        
-        # Extract HTTP method more reliably
-        http_method = event.get('requestContext', {}).get('http', {}).get('method', '')
-        if not http_method:
-            route_key = event.get('routeKey', '')
-            http_method = route_key.split(' ')[0] if ' ' in route_key else ''
-            
-        logger.info(f"HTTP Method: {http_method}")
-        
-        # Get path
+        if created_after is not None or created_before is not None:
+            query['FilterExpression'] = '#createdAt BETWEEN :lo AND :hi'
+            query['ExpressionAttributeNames']['#createdAt'] = 'createdAt'
+            query['ExpressionAttributeValues'] = serialize_item({
+                **values,
+                ':lo': created_after if created_after is not None else 0,
+                ':hi': created_before if created_before is not None else 10 ** TEMPLATE_SORT_KEY_WIDTH - 1
+            })
+        return [('query', query)]
+    else:
+        index_name = 'userIdIndex'
+        sort_value = int
+        key_condition = '#userId = :uid'
+
+    # Split the span the forms actually cover, not 1970 to now
+    if created_after is None:
+        created_after = export_time_bound(index_name, key_condition, names, values, True)
+    if created_before is None:
+        created_before = export_time_bound(index_name, key_condition, names, values, False)
+    if created_after is None or created_before is None or created_after > created_before:
+        return []
+
+    width = -(-(created_before - created_after + 1) // segments)
+    requests = []
+    for low in range(created_after, created_before + 1, width):
+        requests.append(('query', {
+            'TableName': FILLED_FORMS_TABLE,
+            'IndexName': index_name,
+            'KeyConditionExpression': '#userId = :uid AND #sk BETWEEN :lo AND :hi',
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': serialize_item({
+                ':uid': user_id, ':lo': sort_value(low), ':hi': sort_value(min(low + width - 1, created_before))
+            })
+        }))
+    return requests
+
+def read_export_segment(operation: str, request: Dict[str, Any], pages: queue.Queue, stop: threading.Event) -> int:
+    """Page through one read, hydrating offloaded data, and queue each page for the writer"""
+    read = dynamodb_client.scan if operation == 'scan' else dynamodb_client.query
+    request = {**request, 'Limit': EXPORT_PAGE_SIZE}
+    count = 0
+    while not stop.is_set():
+        response = read(**request)
+        items = hydrate_form_items([deserialize_item(item) for item in response.get('Items', [])])
+        # Blocks while the writer is behind, which is what bounds memory
+        while items and not stop.is_set():
+            try:
+                pages.put(items, timeout=0.1)
+                count += len(items)
+                break
+            except queue.Full:
+                continue
+        if 'LastEvaluatedKey' not in response:
+            break
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return count
+
+def iter_export_items(reads: List[tuple]) -> Iterator[Dict[str, Any]]:
+    """Yield the items of all reads as pages arrive, in no particular order"""
+    if not reads:
+        return
+    pages = queue.Queue(maxsize=len(reads) * EXPORT_QUEUE_PAGES_PER_SEGMENT)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(reads))
+    futures = [executor.submit(read_export_segment, operation, request, pages, stop) for operation, request in reads]
+    try:
+        while True:
+            try:
+                page = pages.get(timeout=0.1)
+            except queue.Empty:
+                done = [future for future in futures if future.done()]
+                for future in done:
+                    future.result()
+                # Readers only finish after queueing their last page
+                if len(done) == len(futures) and pages.empty():
+                    return
+                continue
+            yield from page
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+def export_filled_forms(user_id: Optional[str], export_format: str, key: str, template_code: Optional[str] = None,
+                        template_fields: Any = None, template_version: Optional[str] = None,
+                        created_after: Optional[int] = None, created_before: Optional[int] = None,
+                        store: Optional[BlobStore] = None, segments: int = EXPORT_SEGMENTS) -> Dict[str, Any]:
+    """Stream a user's forms, or every form when user_id is None, to key in the export store.
+
+    CSV and Parquet get a column per field of template_fields when given. Memory
+    stays bounded by the read queue and one upload part, whatever the form count.
+    """
+    writer_class = EXPORT_WRITERS.get(export_format)
+    if writer_class is None:
+        raise ValueError(f"Invalid format: {export_format}")
+    store = store or export_store
+    if store is None:
+        raise ValueError("Exports are not configured")
+    compiled = get_compiled_template(template_fields, template_version) if template_fields else None
+    writer = writer_class(export_columns(compiled))
+    reads = export_read_requests(user_id, template_code, created_after, created_before, segments)
+    logger.info(f"Exporting forms of {user_id or 'all users'} as {export_format} to {key} with {len(reads)} reads")
+
+    items = iter_export_items(reads)
+    count = 0
+
+    def chunks():
+        nonlocal count
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= EXPORT_PAGE_SIZE:
+                count += len(batch)
+                yield writer.write(batch)
+                batch = []
+        count += len(batch)
+        yield writer.write(batch)
+        yield writer.close()
+
+    started = time.perf_counter()
+    try:
+        size = store.put_stream(key, chunks())
+    finally:
+        # Stops the readers when the upload fails part way
+        items.close()
+    duration_ms = (time.perf_counter() - started) * 1000
+    request_metrics.add('ExportedForms', count)
+    request_metrics.add('ExportBytes', size)
+    logger.info(f"Exported {count} forms to {key}: {size} bytes in {duration_ms:.0f} ms")
+    return {'key': key, 'count': count, 'bytes': size, 'durationMs': int(duration_ms)}
+
+def export_manifest_key(user_id: str, export_id: str) -> str:
+    return f"exports/{user_id}/{export_id}.json"
+
+def write_export_manifest(manifest: Dict[str, Any]) -> None:
+    export_store.put(
+        export_manifest_key(manifest['userId'], manifest['exportId']), encode_stored_json(manifest).encode('utf-8')
+    )
+
+def start_export(user_id: str, export_request: Dict[str, Any]) -> Dict[str, Any]:
+    """Record a new export and hand it to the worker, or run it inline when no queue is configured
+
+    Returns the export's manifest; clients poll GET /exports/{exportId} until it is ready.
+    """
+    if export_store is None:
+        raise ValueError("Exports are not configured")
+    export_format = export_request.get('format') or 'ndjson'
+    if export_format not in EXPORT_WRITERS:
+        raise ValueError(f"Invalid format: {export_format}")
+    if export_format == 'parquet' and pyarrow is None:
+        raise ValueError("Parquet export requires pyarrow, which is not installed")
+    resolve_template_fields(user_id, export_request)
+    created_after = parse_timestamp_param(export_request.get('createdAfter'), 'createdAfter')
+    created_before = parse_timestamp_param(export_request.get('createdBefore'), 'createdBefore')
+
+    export_id = str(uuid.uuid4())
+    manifest = {
+        'exportId': export_id,
+        'userId': user_id,
+        'status': EXPORT_STATUS_RUNNING,
+        'format': export_format,
+        'templateCode': export_request.get('templateCode'),
+        'createdAfter': created_after,
+        'createdBefore': created_before,
+        'key': f"exports/{user_id}/{export_id}.{EXPORT_WRITERS[export_format].extension}",
+        'createdAt': int(time.time())
+    }
+    write_export_manifest(manifest)
+    job = {
+        'type': 'export',
+        'manifest': manifest,
+        'templateFields': export_request.get('templateFields'),
+        'templateVersion': export_request.get('templateVersion')
+    }
+
+    if extraction_queue is None:
+        logger.warning("Export requested but no queue is configured, exporting inline")
+        return process_export_job(job)
+    try:
+        extraction_queue.send(job)
+        logger.info(f"Queued export {export_id}")
+    except Exception as e:
+        logger.error(f"Error queueing export job: {str(e)}")
+        manifest = {**manifest, 'status': EXPORT_STATUS_FAILED, 'error': 'Could not queue export job'}
+        write_export_manifest(manifest)
+    return manifest
+
+def process_export_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a queued export and record the outcome in its manifest"""
+    manifest = job['manifest']
+    try:
+        result = export_filled_forms(
+            manifest['userId'], manifest['format'], manifest['key'], manifest.get('templateCode'),
+            job.get('templateFields'), job.get('templateVersion'), manifest.get('createdAfter'),
+            manifest.get('createdBefore')
+        )
+    except Exception as e:
+        write_export_manifest({**manifest, 'status': EXPORT_STATUS_FAILED, 'error': str(e)})
+        raise
+    manifest = {**manifest, **result, 'status': EXPORT_STATUS_READY, 'completedAt': int(time.time())}
+    write_export_manifest(manifest)
+    return manifest
+
+def get_export(export_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """An export's manifest, with a download URL once it is ready"""
+    if export_store is None:
+        raise ValueError("Exports are not configured")
+    try:
+        uuid.UUID(export_id)
+    except ValueError:
+        return None
+    try:
+        manifest = decode_stored_json(export_store.get(export_manifest_key(user_id, export_id)))
+    except FileNotFoundError:
+        return None
+    except client_error() as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return None
+        raise
+    if manifest.get('status') == EXPORT_STATUS_READY:
+        url = export_store.download_url(manifest['key'], EXPORT_URL_TTL_SECONDS)
+        if url:
+            manifest['downloadUrl'] = url
+    return manifest
+
+def process_queued_job(job: Dict[str, Any], final_attempt: bool = True) -> Optional[Dict[str, Any]]:
+    """Dispatch a job from the worker queue by its type"""
+    if job.get('type') == 'export':
+        return process_export_job(job)
+    return process_extraction_job(job, final_attempt)
+
+def accepted_encodings(request_headers: Optional[Dict[str, str]]) -> set:
+    """Content codings the client accepts, from its Accept-Encoding header"""
+    header = next(
+        (value for name, value in (request_headers or {}).items() if name.lower() == 'accept-encoding'), None
+    )
+    encodings = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.partition(';')
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding.strip():
+            encodings.add(coding.strip().lower())
+    return encodings
+
+def compress_response(response: Dict[str, Any], request_headers: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """Compress a response body with br or gzip when the client accepts it"""
+    body = response.get('body') or ''
+    if len(body) < RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+    accepted = accepted_encodings(request_headers)
+    raw = body.encode('utf-8')
+    with request_metrics.timer('CompressionMs'):
+        if brotli is not None and 'br' in accepted:
+            encoding, compressed = 'br', brotli.compress(raw, quality=5)
+        elif 'gzip' in accepted or '*' in accepted:
+            encoding, compressed = 'gzip', gzip.compress(raw, compresslevel=6)
+        else:
+            return response
+    logger.info(f"Compressed response with {encoding}: {len(raw)} -> {len(compressed)} bytes")
+    return {
+        **response,
+        'headers': {**response['headers'], 'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'},
+        'body': base64.b64encode(compressed).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'OPTIONS,POST,GET,PUT,PATCH,DELETE'
+}
+
+def json_response(status_code: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Build an API Gateway response with CORS headers and a JSON body"""
+    return {
+        'statusCode': status_code,
+        'headers': {**CORS_HEADERS, **(headers or {})},
+        'body': json.dumps(payload)
+    }
+
+def error_response(status_code: int, message: str, headers: Optional[Dict[str, str]] = None,
+                   **details) -> Dict[str, Any]:
+    """Build an error response; details are added next to the message"""
+    return json_response(status_code, {'message': message, **details}, headers)
+
+class ApiRequest:
+    """The parts of an API Gateway event a route handler works with"""
+    def __init__(self, event: Dict[str, Any], user_id: str, body: Any, path_params: Dict[str, str]):
+        self.event = event
+        self.user_id = user_id
+        self.body = body
+        self.path_params = path_params
+        self.query_params = event.get('queryStringParameters') or {}
+
+class Route:
+    """A method and path pattern such as /forms/{formId}/extract, its handler and its body rules
+
+    body_fields maps body keys to the type they must have when present. Handlers
+    return a result to serialize, or None for 404.
+    """
+    BODY_TYPE_NAMES = {dict: 'an object', list: 'a list', str: 'a string'}
+
+    def __init__(self, method: str, pattern: str, handler: Callable[[ApiRequest], Any], body_required: bool = False,
+                 body_fields: Optional[Dict[str, type]] = None):
+        self.method = method
+        self.pattern = pattern
+        self.handler = handler
+        self.body_required = body_required
+        self.body_fields = body_fields or {}
+        self.name = f"{method} {pattern}"
+        segments = pattern.split('/')
+        if any(segment.startswith('{') for segment in segments):
+            self.regex = re.compile('^' + '/'.join(
+                f"(?P<{segment[1:-1]}>[^/]+)" if segment.startswith('{') else re.escape(segment)
+                for segment in segments
+            ) + '$')
+        else:
+            self.regex = None
+
+    def validate_body(self, body: Any) -> Optional[str]:
+        """Why the body is not acceptable for this route, or None"""
+        if self.body_required and not body:
+            return 'Request body is required'
+        if not isinstance(body, dict):
+            return 'Request body must be a JSON object'
+        for name, expected in self.body_fields.items():
+            if body.get(name) is not None and not isinstance(body[name], expected):
+                return f"{name} must be {self.BODY_TYPE_NAMES.get(expected, expected.__name__)}"
+        return None
+
+class Router:
+    """Precompiled route lookup: a dict for fixed paths, per-method regexes for paths with parameters"""
+    def __init__(self, routes: List[Route]):
+        self.static = {}
+        self.dynamic = defaultdict(list)
+        for route in routes:
+            if route.regex is None:
+                self.static[(route.method, route.pattern)] = route
+            else:
+                self.dynamic[route.method].append(route)
+
+    def match(self, method: str, path: str) -> Optional[tuple]:
+        """(route, path parameters) for a request, or None when no route matches"""
+        route = self.static.get((method, path))
+        if route is not None:
+            return route, {}
+        for route in self.dynamic.get(method, ()):
+            match = route.regex.match(path)
+            if match:
+                return route, match.groupdict()
+        return None
+
+def handle_list_templates(request: ApiRequest) -> Any:
+    projection = parse_list_projection(request.query_params, TEMPLATE_SUMMARY_ATTRIBUTES, ['templateId', 'userId'])
+    return list_templates(request.user_id, projection)
+
+def handle_create_template(request: ApiRequest) -> Any:
+    return create_template(request.user_id, request.body)
+
+def handle_batch_get_templates(request: ApiRequest) -> Any:
+    body = request.body
+    fields = parse_projection_fields(body['fields']) if body.get('fields') is not None else None
+    return batch_get_user_items(FORM_TEMPLATES_TABLE, 'templateId', request.user_id, body.get('ids'), fields)
+
+def handle_get_template(request: ApiRequest) -> Any:
+    # Read through to DynamoDB so edits from other containers show at once; the cache is for extraction
+    template_id = request.path_params['templateId']
+    item = get_template(template_id, request.user_id)
+    if item:
+        template_cache.put(item)
+    else:
+        template_cache.invalidate(request.user_id, template_id)
+    return item
+
+def handle_update_template(request: ApiRequest) -> Any:
+    return update_template(request.path_params['templateId'], request.user_id, request.body)
+
+def handle_delete_template(request: ApiRequest) -> Any:
+    return delete_template(request.path_params['templateId'], request.user_id)
+
+def handle_batch_get_forms(request: ApiRequest) -> Any:
+    body = request.body
+    # Checked before dataBlob is added, so the cap applies to what the client asked for
+    fields = form_projection(parse_projection_fields(body['fields']) if body.get('fields') is not None else None)
+    result = batch_get_user_items(FILLED_FORMS_TABLE, 'formId', request.user_id, body.get('ids'), fields)
+    project_form_data(hydrate_form_items(result['items']), fields)
+    return result
+
+def handle_batch_create_forms(request: ApiRequest) -> Any:
+    return create_filled_forms_batch(request.user_id, request.body.get('forms'))
+
+def handle_list_forms(request: ApiRequest) -> Any:
+    query_params = request.query_params
+    template_code = query_params.get('templateCode')
+    limit = parse_page_limit(query_params.get('limit'))
+    created_after = parse_timestamp_param(query_params.get('createdAfter'), 'createdAfter')
+    created_before = parse_timestamp_param(query_params.get('createdBefore'), 'createdBefore')
+    projection = parse_list_projection(query_params, FORM_SUMMARY_ATTRIBUTES, ['formId', 'userId'])
+    result = list_filled_forms(
+        request.user_id, template_code, limit, query_params.get('nextToken'), projection, created_after, created_before
+    )
+    logger.info(f"Found {len(result['items'])} forms")
+    return result
+
+def handle_search_forms(request: ApiRequest) -> Any:
+    query_params = request.query_params
+    return search_filled_forms(
+        request.user_id, query_params.get('q'), parse_page_limit(query_params.get('limit')),
+        query_params.get('nextToken'), query_params.get('templateCode')
+    )
+
+def handle_create_form(request: ApiRequest) -> Any:
+    body = request.body
+    log_body("Creating form with body", body)
+    conversation_text = body.pop('conversationText', None)
+    async_extraction = bool(body.pop('async', False))
+    return create_filled_form(request.user_id, body, conversation_text, async_extraction)
+
+def handle_extract_form(request: ApiRequest) -> Any:
+    body = request.body
+    resolve_template_fields(request.user_id, body)
+    if not body.get('templateFields') or not body.get('conversationText'):
+        raise ValueError("templateFields (or templateId) and conversationText are required")
+    return extract_form_data_incremental(
+        request.path_params['formId'], request.user_id, body['templateFields'], body['conversationText'],
+        body.get('templateVersion')
+    )
+
+def handle_get_form(request: ApiRequest) -> Any:
+    form_id = request.path_params['formId']
+    wait = request.query_params.get('wait')
+    if wait:
+        try:
+            wait_seconds = float(wait)
+        except ValueError:
+            raise ValueError(f"Invalid wait: {wait}")
+        after_version = parse_form_precondition(request.query_params.get('version'), 'version')
+        return wait_for_extraction(form_id, request.user_id, max(wait_seconds, 0), after_version)
+    return get_filled_form(form_id, request.user_id)
+
+def handle_update_form(request: ApiRequest) -> Any:
+    return update_filled_form(request.path_params['formId'], request.user_id, request.body)
+
+def handle_patch_form(request: ApiRequest) -> Any:
+    return patch_filled_form(request.path_params['formId'], request.user_id, request.body)
+
+def handle_delete_form(request: ApiRequest) -> Any:
+    return delete_filled_form(request.path_params['formId'], request.user_id)
+
+def handle_export_forms(request: ApiRequest) -> Any:
+    return start_export(request.user_id, request.body)
+
+def handle_get_export(request: ApiRequest) -> Any:
+    return get_export(request.path_params['exportId'], request.user_id)
+
+ROUTES = [
+    Route('GET', '/templates', handle_list_templates),
+    Route('POST', '/templates', handle_create_template, body_required=True),
+    Route('POST', '/templates:batchGet', handle_batch_get_templates),
+    Route('GET', '/templates/{templateId}', handle_get_template),
+    Route('PUT', '/templates/{templateId}', handle_update_template, body_required=True),
+    Route('DELETE', '/templates/{templateId}', handle_delete_template),
+    Route('POST', '/forms:batchGet', handle_batch_get_forms),
+    Route('POST', '/forms:batch', handle_batch_create_forms),
+    Route('POST', '/forms:export', handle_export_forms, body_fields={'templateCode': str, 'format': str}),
+    Route('GET', '/forms', handle_list_forms),
+    Route('GET', '/forms/search', handle_search_forms),
+    Route('POST', '/forms', handle_create_form, body_required=True, body_fields={'data': dict, 'conversationText': str}),
+    Route('POST', '/forms/{formId}/extract', handle_extract_form, body_fields={'conversationText': str}),
+    Route('GET', '/forms/{formId}', handle_get_form),
+    Route('PUT', '/forms/{formId}', handle_update_form, body_required=True, body_fields={'data': dict}),
+    Route('PATCH', '/forms/{formId}', handle_patch_form),
+    Route('DELETE', '/forms/{formId}', handle_delete_form),
+    Route('GET', '/exports/{exportId}', handle_get_export),
+]
+router = Router(ROUTES)
+
+def request_method(event: Dict[str, Any]) -> str:
+    """HTTP method of an API Gateway v2 event, falling back to the route key"""
+    method = event.get('requestContext', {}).get('http', {}).get('method', '')
+    if not method:
+        route_key = event.get('routeKey', '')
+        method = route_key.split(' ')[0] if ' ' in route_key else ''
+    return method
+
+def request_route(event: Dict[str, Any], matched: Optional[tuple]) -> str:
+    """Route name for metrics: the matched route pattern, so the dimension stays low-cardinality"""
+    if event.get('Records') and event['Records'][0].get('eventSource') == 'aws:sqs':
+        return 'SQS extraction'
+    method = request_method(event)
+    if method == 'OPTIONS':
+        return 'OPTIONS'
+    return matched[0].name if matched else f"{method} unmatched"
+
+def lambda_handler(event, context):
+    is_sqs = bool(event.get('Records')) and event['Records'][0].get('eventSource') == 'aws:sqs'
+    # Matched once here for the metrics dimension and reused to dispatch
+    matched = None if is_sqs else router.match(request_method(event), event.get('rawPath', ''))
+    request_metrics.start(request_route(event, matched), getattr(context, 'aws_request_id', None))
+    set_invocation_deadline(context, http_request=not is_sqs)
+    response = None
+    try:
+        response = handle_request(event, context, matched)
+        return response
+    finally:
+        status_code = response.get('statusCode') if isinstance(response, dict) else None
+        if isinstance(response, dict) and 'batchItemFailures' in response:
+            status_code = 200
+            request_metrics.add('FailedJobs', len(response['batchItemFailures']))
+        elif isinstance(response, dict):
+            request_metrics.add('ResponseBytes', len(response.get('body') or ''))
+        request_metrics.emit(status_code)
+
+def handle_request(event, context, matched):
+    # SQS trigger for the async extraction worker
+    if event.get('Records') and event['Records'][0].get('eventSource') == 'aws:sqs':
+        return handle_extraction_records(event)
+
+    if isinstance(event.get('body'), str):
+        request_metrics.add('RequestBytes', len(event['body']))
+
+    try:
+        log_body("Incoming event", event)
+        http_method = request_method(event)
         path = event.get('rawPath', '')
-        logger.info(f"Path: {path}")
-        
-        # Extract authorization context
+
         auth_context = event.get('requestContext', {}).get('authorizer', {}).get('lambda', {})
-        logger.info(f"Auth context: {json.dumps(auth_context)}")
-        
         if not auth_context:
             logger.error("No authorization context found")
-            return {
-                'statusCode': 401,
-                'headers': cors_headers,
-                'body': json.dumps({
-                    'message': 'No authorization context found'
-                })
-            }
-        
+            return error_response(401, 'No authorization context found')
         user_id = auth_context.get('userId')
         if not user_id:
             logger.error("No userId found in auth context")
-            return {
-                'statusCode': 401,
-                'headers': cors_headers,
-                'body': json.dumps({'message': 'Unauthorized: Missing userId'})
-            }
-        
+            return error_response(401, 'Unauthorized: Missing userId')
+
         # OPTIONS preflight response
         if http_method == 'OPTIONS':
-            return {
-                'statusCode': 200,
-                'headers': cors_headers,
-                'body': ''
-            }
-        
+            return {'statusCode': 200, 'headers': dict(CORS_HEADERS), 'body': ''}
+
+        if matched is None:
+            logger.warning(f"No handler found for path: {path} and method: {http_method}")
+            return error_response(404, 'Route not found', path=path, method=http_method)
+        route, path_params = matched
+        logger.info(f"Processing {route.name} {path_params or ''}".rstrip())
+
         # Parse body with better error handling
         body = {}
         if event.get('body'):
             try:
-                body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
-                logger.info(f"Parsed request body: {json.dumps(body)}")
+                # Fractional numbers parse straight to Decimal, so request data needs no float conversion pass
+                with request_metrics.timer('RequestParseMs'):
+                    body = decode_stored_json(event['body']) if isinstance(event['body'], str) else event['body']
+                log_body("Parsed request body", body)
             except json.JSONDecodeError as e:
                 logger.error(f"Error parsing request body: {str(e)}")
-                return {
-                    'statusCode': 400,
-                    'headers': cors_headers,
-                    'body': json.dumps({
-                        'message': 'Invalid JSON in request body',
-                        'error': str(e)
-                    })
-                }
-        
-        # Route handler with detailed logging
-        result = None
+                return error_response(400, 'Invalid JSON in request body', error=str(e))
+        invalid = route.validate_body(body)
+        if invalid:
+            logger.warning(f"Invalid request: {invalid}")
+            return error_response(400, invalid)
+
         try:
-            # Templates endpoints
-            if path == '/templates':
-                if http_method == 'GET':
-                    logger.info("Processing GET /templates request")
-                    result = list_templates(user_id)
-                elif http_method == 'POST':
-                    logger.info("Processing POST /templates request")
-                    if not body:
-                        return {
-                            'statusCode': 400,
-                            'headers': cors_headers,
-                            'body': json.dumps({'message': 'Request body is required'})
-                        }
-                    result = create_template(user_id, body)
-            
-            elif path.startswith('/templates/'):
-                template_id = path.split('/')[-1]
-                logger.info(f"Template ID from path: {template_id}")
-                
-                if http_method == 'GET':
-                    logger.info(f"Processing GET /templates/{template_id} request")
-                    result = get_template(template_id, user_id)
-                elif http_method == 'PUT':
-                    logger.info(f"Processing PUT /templates/{template_id} request")
-                    if not body:
-                        return {
-                            'statusCode': 400,
-                            'headers': cors_headers,
-                            'body': json.dumps({'message': 'Request body is required'})
-                        }
-                    result = update_template(template_id, user_id, body)
-                elif http_method == 'DELETE':
-                    logger.info(f"Processing DELETE /templates/{template_id} request")
-                    result = delete_template(template_id, user_id)
-            
-            # Forms endpoints
-            elif path == '/forms':
-                if http_method == 'GET':
-                    logger.info("Processing GET /forms request")
-                    template_code = event.get('queryStringParameters', {}).get('templateCode')  # Changed from templateId
-                    logger.info(f"Fetching forms for user {user_id} with template code: {template_code}")
-                    result = list_filled_forms(user_id, template_code)
-                    logger.info(f"Found {len(result)} forms")
-                elif http_method == 'POST':
-                    logger.info("Processing POST /forms request")
-                    if not body:
-                        return {
-                            'statusCode': 400,
-                            'headers': cors_headers,
-                            'body': json.dumps({'message': 'Request body is required'})
-                        }
-                    logger.info(f"Creating form with body: {json.dumps(body)}")
-                    conversation_text = body.pop('conversationText', None)
-                    result = create_filled_form(user_id, body, conversation_text)
-            
-            elif path.startswith('/forms/'):
-                form_id = path.split('/')[-1]
-                logger.info(f"Form ID from path: {form_id}")
-                
-                if http_method == 'GET':
-                    logger.info(f"Processing GET /forms/{form_id} request")
-                    result = get_filled_form(form_id, user_id)
-                elif http_method == 'PUT':
-                    logger.info(f"Processing PUT /forms/{form_id} request")
-                    if not body:
-                        return {
-                            'statusCode': 400,
-                            'headers': cors_headers,
-                            'body': json.dumps({'message': 'Request body is required'})
-                        }
-                    result = update_filled_form(form_id, user_id, body)
-                elif http_method == 'DELETE':
-                    logger.info(f"Processing DELETE /forms/{form_id} request")
-                    result = delete_filled_form(form_id, user_id)
-        
+            result = route.handler(ApiRequest(event, user_id, body, path_params))
+        except LLMUnavailableError as e:
+            logger.warning(f"Extraction unavailable: {str(e)}")
+            return error_response(
+                503, 'Extraction service is temporarily unavailable, please retry',
+                headers={'Retry-After': str(int(LLM_BREAKER_COOLDOWN_SECONDS))}
+            )
+        except ConflictError as e:
+            logger.warning(f"Conflict: {str(e)}")
+            return error_response(409, str(e))
+        except ValueError as e:
+            logger.warning(f"Invalid request: {str(e)}")
+            return error_response(400, str(e))
         except Exception as e:
             logger.error(f"Error processing route: {str(e)}")
             logger.error(traceback.format_exc())
-            return {
-                'statusCode': 500,
-                'headers': cors_headers,
-                'body': json.dumps({
-                    'message': 'Error processing request',
-                    'error': str(e)
-                })
-            }
-        
+            return error_response(500, 'Error processing request', error=str(e))
+
         if result is None:
-            logger.warning(f"No handler found for path: {path} and method: {http_method}")
-            return {
-                'statusCode': 404,
-                'headers': cors_headers,
-                'body': json.dumps({
-                    'message': 'Route not found',
-                    'path': path,
-                    'method': http_method
-                })
-            }
-        
-        logger.info(f"Successful response: {safe_json_dumps(result)}")
-        return {
+            logger.warning(f"Nothing found for {route.name} {path_params}")
+            return error_response(404, 'Route not found', path=path, method=http_method)
+
+        with request_metrics.timer('SerializationMs'):
+            response_body = safe_json_dumps(result)
+        log_body("Successful response", response_body)
+        return compress_response({
             'statusCode': 200,
-            'headers': cors_headers,
-            'body': safe_json_dumps(result)
-        }
-    
+            'headers': dict(CORS_HEADERS),
+            'body': response_body
+        }, event.get('headers'))
+
     except Exception as e:
         logger.error(f"Unhandled error: {str(e)}")
         logger.error(traceback.format_exc())
-        return {
-            'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({
-                'message': 'Internal server error',
-                'error': str(e)
-            })
-        }
\ No newline at end of file
+        return error_response(500, 'Internal server error', error=str(e))
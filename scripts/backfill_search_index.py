@@ -0,0 +1,76 @@
+"""Build the search index for existing FilledForms items.
+
+GET /forms/search reads the SEARCH_INDEX_TABLE postings that lambda.index_form
+writes on every save. Forms saved before the index existed, or while it was
+failing (SearchIndexErrors), are missing from it until this runs. The table is
+read with the same parallel segmented Scan as the bulk export, so offloaded
+data is loaded from blob storage when FORM_BLOB_BUCKET or FORM_BLOB_DIR is set.
+
+Usage:
+    SEARCH_INDEX_TABLE=FormSearchIndex python scripts/backfill_search_index.py \
+        [--user USER_ID] [--segments 8] [--workers 16] [--rebuild] [--dry-run]
+
+Safe to re-run: forms whose terms are unchanged are skipped. --rebuild rewrites
+every form's postings regardless, for repairing postings written by an older
+version of index_form.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+logger = logging.getLogger(__name__)
+
+LAMBDA_PATH = Path(__file__).resolve().parent.parent / 'lambda.py'
+# Forms handed to the index workers at a time
+BATCH_SIZE = 500
+
+def load_lambda_module():
+    """Load lambda.py, whose name is a keyword and cannot be imported directly"""
+    spec = importlib.util.spec_from_file_location('fills_lambda', LAMBDA_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--user', help='Index one user; default is every user')
+    parser.add_argument('--segments', type=int, default=8, help='Parallel scan segments or query ranges')
+    parser.add_argument('--workers', type=int, default=16, help='Forms indexed concurrently')
+    parser.add_argument('--rebuild', action='store_true', help='Rewrite postings of unchanged forms too')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    if not os.getenv('SEARCH_INDEX_TABLE'):
+        parser.error('SEARCH_INDEX_TABLE must be set')
+    fills = load_lambda_module()
+    # Keep per-form failure warnings, drop the per-page read logging
+    fills.logger.setLevel('WARNING')
+
+    def index(item):
+        if args.dry_run:
+            logger.info(f"[dry-run] {item['formId']}: {' '.join(fills.form_search_terms(item))}")
+        else:
+            fills.index_form(item, rebuild=args.rebuild)
+
+    indexed = 0
+    items = fills.iter_export_items(fills.export_read_requests(args.user, segments=args.segments))
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == BATCH_SIZE:
+                list(executor.map(index, batch))
+                indexed += len(batch)
+                logger.info(f"Indexed {indexed} forms")
+                batch = []
+        list(executor.map(index, batch))
+        indexed += len(batch)
+
+    logger.info(f"Backfill complete: {indexed} forms indexed")
+
+if __name__ == '__main__':
+    main()
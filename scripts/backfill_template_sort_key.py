@@ -0,0 +1,84 @@
+"""Backfill templateSortKey on existing FilledForms items.
+
+list_filled_forms serves template-filtered lists from the userTemplateIndex
+GSI (userId + "<templateCode>#<createdAt>"). Items written before that index
+existed have no templateSortKey and are invisible to it until this runs.
+
+Usage:
+    python scripts/backfill_template_sort_key.py [--table FilledForms] [--segments 4] [--dry-run]
+
+Safe to re-run: items that already have the key are skipped.
+"""
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.exceptions import ClientError
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+logger = logging.getLogger(__name__)
+
+# Must match lambda.build_template_sort_key
+TEMPLATE_SORT_KEY_WIDTH = 10
+
+def build_template_sort_key(template_code: str, created_at: int) -> str:
+    """Build the templateCode#createdAt sort key used by the template index"""
+    return f"{template_code}#{int(created_at):0{TEMPLATE_SORT_KEY_WIDTH}d}"
+
+def backfill_segment(table_name: str, segment: int, total_segments: int, dry_run: bool) -> int:
+    """Scan one segment and set templateSortKey on items missing it"""
+    table = boto3.resource('dynamodb').Table(table_name)
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'ProjectionExpression': 'formId, userId, templateCode, createdAt',
+        'FilterExpression': 'attribute_not_exists(templateSortKey) AND attribute_exists(templateCode)'
+    }
+    updated = 0
+
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            sort_key = build_template_sort_key(item['templateCode'], item.get('createdAt', 0))
+            if dry_run:
+                logger.info(f"[dry-run] {item['formId']} -> {sort_key}")
+                updated += 1
+                continue
+            try:
+                table.update_item(
+                    Key={'formId': item['formId'], 'userId': item['userId']},
+                    UpdateExpression='SET templateSortKey = :sk',
+                    ConditionExpression='attribute_not_exists(templateSortKey)',
+                    ExpressionAttributeValues={':sk': sort_key}
+                )
+                updated += 1
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    logger.info(f"Segment {segment}/{total_segments}: updated {updated} items")
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill templateSortKey on FilledForms')
+    parser.add_argument('--table', default='FilledForms')
+    parser.add_argument('--segments', type=int, default=4, help='Parallel scan segments')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    with ThreadPoolExecutor(max_workers=args.segments) as executor:
+        futures = [
+            executor.submit(backfill_segment, args.table, segment, args.segments, args.dry_run)
+            for segment in range(args.segments)
+        ]
+        total = sum(future.result() for future in futures)
+
+    logger.info(f"Backfill complete: {total} items updated")
+
+if __name__ == '__main__':
+    main()
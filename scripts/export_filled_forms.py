@@ -0,0 +1,67 @@
+"""Export filled forms to NDJSON, CSV or Parquet, for analytics pulls too big for the API.
+
+Runs lambda.export_filled_forms from an operator machine: without --user the
+whole FilledForms table is read with a parallel segmented Scan, optionally
+filtered by template; with --user it reads that user's forms the same way
+POST /forms:export does. Output streams to a local file or to s3://bucket/key
+with a multipart upload, so memory stays flat however many forms there are.
+
+Usage:
+    python scripts/export_filled_forms.py --output s3://bucket/exports/forms.parquet --format parquet \
+        [--template-code general] [--template-file template.json] [--user USER_ID] \
+        [--created-after EPOCH] [--created-before EPOCH] [--segments 16]
+
+--template-file holds the template's fields as JSON; CSV and Parquet then get a
+column per field instead of a single JSON data column.
+"""
+import argparse
+import importlib.util
+import json
+import logging
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+logger = logging.getLogger(__name__)
+
+LAMBDA_PATH = Path(__file__).resolve().parent.parent / 'lambda.py'
+
+def load_lambda_module():
+    """Load lambda.py, whose name is a keyword and cannot be imported directly"""
+    spec = importlib.util.spec_from_file_location('fills_lambda', LAMBDA_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', required=True, help='Local path or s3://bucket/key')
+    parser.add_argument('--format', choices=['ndjson', 'csv', 'parquet'], default='ndjson')
+    parser.add_argument('--user', help='Export one user; default is every user')
+    parser.add_argument('--template-code')
+    parser.add_argument('--template-file', help='JSON file with the template fields, for per-field columns')
+    parser.add_argument('--created-after', type=int)
+    parser.add_argument('--created-before', type=int)
+    parser.add_argument('--segments', type=int, default=16, help='Parallel scan segments or query ranges')
+    args = parser.parse_args()
+
+    fills = load_lambda_module()
+    if args.output.startswith('s3://'):
+        bucket, _, key = args.output[len('s3://'):].partition('/')
+        store = fills.S3BlobStore(bucket)
+    else:
+        path = Path(args.output).resolve()
+        store, key = fills.LocalBlobStore(str(path.parent)), path.name
+    template_fields = None
+    if args.template_file:
+        with open(args.template_file) as f:
+            template_fields = json.load(f)
+
+    result = fills.export_filled_forms(
+        args.user, args.format, key, args.template_code, template_fields,
+        created_after=args.created_after, created_before=args.created_before,
+        store=store, segments=args.segments
+    )
+    logger.info(f"Export complete: {json.dumps(result)}")
+
+if __name__ == '__main__':
+    main()
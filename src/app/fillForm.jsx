@@ -3,11 +3,26 @@ import { View, ScrollView, StyleSheet, TouchableOpacity, Text, Alert } from 'rea
 import { useLocalSearchParams, useRouter } from 'expo-router';
 import { getTemplateComponent, getTemplateDetails } from '../components/templates';
 import { useFormDataContext } from '../contexts/FormDataContext';
+import { filledFormsService } from '../aws/api/filledForms';
 import { Stack } from 'expo-router';
 import BackButton from '../components/BackButton';
 
+// Extracted values only go into fields the clinician has not filled in yet
+const fillEmptyFields = (current, extracted) => {
+  const merged = { ...current };
+  Object.entries(extracted || {}).forEach(([key, value]) => {
+    const existing = current?.[key];
+    if (value && typeof value === 'object' && !Array.isArray(value)) {
+      merged[key] = fillEmptyFields(existing && typeof existing === 'object' ? existing : {}, value);
+    } else if (existing === undefined || existing === null || existing === '') {
+      merged[key] = value;
+    }
+  });
+  return merged;
+};
+
 export default function FillForm() {
-  const { templateId, formId, isEditing, initialData } = useLocalSearchParams();
+  const { templateId, formId, isEditing, initialData, extracting } = useLocalSearchParams();
   const router = useRouter();
   const { saveForm, updateForm, loading, error, clearError } = useFormDataContext();
   
@@ -24,14 +39,48 @@ export default function FillForm() {
   });
 
   const [isSubmitting, setIsSubmitting] = useState(false);
+  const [isExtracting, setIsExtracting] = useState(extracting === 'true');
+
+  // The form was created with async extraction: long-poll it and fill fields in as they arrive
+  useEffect(() => {
+    if (!isExtracting || !formId) return;
+    let cancelled = false;
+
+    const poll = async () => {
+      let version = 0;
+      while (!cancelled) {
+        const form = await filledFormsService.waitForFilledForm(formId, version);
+        if (cancelled || !form) return;
+        version = form.version;
+        const extracted = form.status === 'extracting' ? form.extractionProgress : form.data;
+        setFormData(current => fillEmptyFields(current, extracted));
+        if (form.status !== 'extracting') {
+          if (form.status === 'failed') {
+            Alert.alert('Extraction failed', 'Please fill in the remaining fields.');
+          }
+          setIsExtracting(false);
+          return;
+        }
+      }
+    };
+
+    poll().catch(error => {
+      console.error('Error waiting for extraction:', error);
+      setIsExtracting(false);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [formId, isExtracting]);
 
   const handleSave = async () => {
-    if (loading || isSubmitting) return;
+    if (loading || isSubmitting || isExtracting) return;
 
     try {
       setIsSubmitting(true);
       
-      if (isEditing) {
+      // A form created by templateSelection already exists, so it is updated rather than saved again
+      if (isEditing || formId) {
         await updateForm(formId, {
           templateCode: templateId,
           data: formData
@@ -92,13 +141,13 @@ export default function FillForm() {
         <TouchableOpacity 
           style={[
             styles.saveButton, 
-            (loading || isSubmitting) && styles.saveButtonDisabled
+            (loading || isSubmitting || isExtracting) && styles.saveButtonDisabled
           ]}
           onPress={handleSave}
-          disabled={loading || isSubmitting}
+          disabled={loading || isSubmitting || isExtracting}
         >
           <Text style={styles.saveButtonText}>
-            {loading || isSubmitting ? 'Saving...' : isEditing ? 'Update Form' : 'Save Form'}
+            {isExtracting ? 'Extracting...' : loading || isSubmitting ? 'Saving...' : isEditing ? 'Update Form' : 'Save Form'}
           </Text>
         </TouchableOpacity>
       </View>
@@ -24,10 +24,12 @@ export default function TemplateSelection() {
       
       console.log('Received message:', selectedMessages);
 
+      // Extraction runs in the background; fillForm fills fields in as the server finds them
       const response = await filledFormsService.createFilledForm({
         templateCode: selectedTemplate,
         conversationText: selectedMessages,
-        templateFields: TEMPLATE_COMPONENTS[selectedTemplate].TEMPLATE_FIELDS
+        templateFields: TEMPLATE_COMPONENTS[selectedTemplate].TEMPLATE_FIELDS,
+        async: true
       });
 
       console.log('API Response:', response);
@@ -52,6 +54,8 @@ export default function TemplateSelection() {
           pathname: '/fillForm',
           params: {
             templateId: selectedTemplate,
+            formId: response.formId,
+            extracting: response.status === 'extracting' ? 'true' : '',
             initialData: JSON.stringify(formData)
           }
         });
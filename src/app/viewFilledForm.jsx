@@ -1,5 +1,5 @@
-import React, { useEffect } from 'react';
-import { View, StyleSheet, TouchableOpacity, Alert, SafeAreaView, Text, ScrollView } from 'react-native';
+import React, { useEffect, useState } from 'react';
+import { View, StyleSheet, TouchableOpacity, Alert, SafeAreaView, Text, ScrollView, ActivityIndicator } from 'react-native';
 import { useLocalSearchParams, useRouter } from 'expo-router';
 import { getTemplateComponent } from '../components/templates';
 import { generateAndSharePDF } from '../utils/pdfGenerator';
@@ -13,9 +13,17 @@ export default function ViewFilledForm() {
   const { formId } = useLocalSearchParams();
   const router = useRouter();
   const insets = useSafeAreaInsets();
-  const { forms } = useFormDataContext();
+  const { formDetails, loadForm } = useFormDataContext();
+  const [loadingForm, setLoadingForm] = useState(!formDetails[formId]);
 
-  const filledForm = forms.find(form => form.formId === formId);
+  // The forms list only carries summaries, so fetch the whole form on open
+  useEffect(() => {
+    loadForm(formId)
+      .catch(error => console.error('Error loading form:', error))
+      .finally(() => setLoadingForm(false));
+  }, [formId]);
+
+  const filledForm = formDetails[formId];
   
   // Debug logs
   useEffect(() => {
@@ -40,6 +48,14 @@ export default function ViewFilledForm() {
     }
   };
 
+  if (!filledForm && loadingForm) {
+    return (
+      <View style={styles.loadingContainer}>
+        <ActivityIndicator size="large" color="#007AFF" />
+      </View>
+    );
+  }
+
   if (!filledForm) {
     return (
       <SafeAreaView style={styles.container}>
@@ -118,6 +134,11 @@ const styles = StyleSheet.create({
     flex: 1,
     backgroundColor: '#FFFFFF',
   },
+  loadingContainer: {
+    flex: 1,
+    justifyContent: 'center',
+    alignItems: 'center',
+  },
   header: {
     flexDirection: 'row',
     alignItems: 'center',
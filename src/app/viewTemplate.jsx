@@ -1,5 +1,5 @@
-import React, { useState } from 'react';
-import { View, Text, ScrollView, StyleSheet, TouchableOpacity, Alert } from 'react-native';
+import React, { useEffect, useState } from 'react';
+import { View, Text, ScrollView, StyleSheet, TouchableOpacity, Alert, ActivityIndicator } from 'react-native';
 import { useLocalSearchParams, useRouter } from 'expo-router';
 import { useFormContext } from '../contexts/FormContext';
 import FormFieldEditor from '../components/FormFieldEditor';
@@ -7,13 +7,18 @@ import { AppIcons } from '../utils/icons';
 
 export default function ViewTemplate() {
   const { templateId } = useLocalSearchParams();
-  const { templates, updateTemplate } = useFormContext();
+  const { templates, loadTemplate, updateTemplate } = useFormContext();
   const router = useRouter();
   const [isEditing, setIsEditing] = useState(false);
   const [editedTemplate, setEditedTemplate] = useState(null);
 
   const template = templates.find(t => t.templateId === templateId);
 
+  // The templates list only carries summaries, so fetch the fields on open
+  useEffect(() => {
+    loadTemplate(templateId).catch(error => console.error('Error loading template:', error));
+  }, [templateId]);
+
   const handleSave = async () => {
     try {
       await updateTemplate(templateId, editedTemplate);
@@ -32,6 +37,14 @@ export default function ViewTemplate() {
     );
   }
 
+  if (!template.fields) {
+    return (
+      <View style={styles.loadingContainer}>
+        <ActivityIndicator size="large" color="#007AFF" />
+      </View>
+    );
+  }
+
   return (
     <View style={styles.container}>
       <View style={styles.header}>
@@ -93,6 +106,11 @@ const styles = StyleSheet.create({
     flex: 1,
     backgroundColor: '#FFFFFF',
   },
+  loadingContainer: {
+    flex: 1,
+    justifyContent: 'center',
+    alignItems: 'center',
+  },
   header: {
     flexDirection: 'row',
     alignItems: 'center',
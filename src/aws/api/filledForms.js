@@ -2,6 +2,11 @@ import { API_CONFIG } from '../config/aws-config';
 import { auth } from '../../configs/FirebaseConfig';
 import { TEMPLATE_COMPONENTS } from '../../components/templates';
 
+// What the forms list renders; the rest of a form is fetched with getFilledFormsByIds when it is opened
+const LIST_FIELDS = 'templateCode,status,createdAt,updatedAt,data.patientInfo.fullName';
+// The API's maximum page size, so long histories take as few round trips as possible
+const LIST_PAGE_LIMIT = 200;
+
 export const filledFormsService = {
   async getFilledForms() {
     try {
@@ -12,32 +17,106 @@ export const filledFormsService = {
       
       console.log('[FilledFormsService] Getting forms...');
       
-      const url = `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.FILLED_FORMS.GET}`;
-      console.log('[FilledFormsService] Request URL:', url);
+      const forms = [];
+      let nextToken = null;
+      do {
+        let url = `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.FILLED_FORMS.GET}`
+          + `?fields=${encodeURIComponent(LIST_FIELDS)}&limit=${LIST_PAGE_LIMIT}`;
+        if (nextToken) {
+          url += `&nextToken=${encodeURIComponent(nextToken)}`;
+        }
+        console.log('[FilledFormsService] Request URL:', url);
+        
+        const response = await fetch(url, {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+            'Content-Type': 'application/json'
+          }
+        });
+        
+        console.log('[FilledFormsService] Response status:', response.status);
+        
+        if (!response.ok) {
+          const errorText = await response.text();
+          console.error('[FilledFormsService] Error response:', errorText);
+          throw new Error(`Failed to fetch forms: ${response.status}`);
+        }
+        
+        const page = await response.json();
+        forms.push(...page.items);
+        nextToken = page.nextToken;
+      } while (nextToken);
       
-      const response = await fetch(url, {
+      console.log('[FilledFormsService] Received forms:', forms);
+      return forms;
+    } catch (error) {
+      console.error('[FilledFormsService] Error:', error);
+      if (error.response?.status === 401) {
+        throw new Error('Authentication expired. Please login again.');
+      }
+      throw error;
+    }
+  },
+
+  async getFilledFormsByIds(formIds, fields) {
+    try {
+      const token = await auth.currentUser?.getIdToken();
+      if (!token) {
+        throw new Error('No authentication token available');
+      }
+
+      const response = await fetch(`${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.FILLED_FORMS.BATCH_GET}`, {
+        method: 'POST',
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
-        }
+        },
+        body: JSON.stringify(fields ? { ids: formIds, fields } : { ids: formIds })
       });
-      
-      console.log('[FilledFormsService] Response status:', response.status);
-      
+
       if (!response.ok) {
         const errorText = await response.text();
-        console.error('[FilledFormsService] Error response:', errorText);
+        console.error('[FilledFormsService] Batch get error response:', errorText);
         throw new Error(`Failed to fetch forms: ${response.status}`);
       }
-      
-      const forms = await response.json();
-      console.log('[FilledFormsService] Received forms:', forms);
-      return forms;
+
+      return response.json();
     } catch (error) {
-      console.error('[FilledFormsService] Error:', error);
-      if (error.response?.status === 401) {
-        throw new Error('Authentication expired. Please login again.');
+      console.error('[FilledFormsService] Batch get error:', error);
+      throw error;
+    }
+  },
+
+  // Long-poll a form that is extracting: returns once the server writes newer progress than
+  // `version`, extraction finishes, or waitSeconds pass
+  async waitForFilledForm(formId, version = 0, waitSeconds = 10) {
+    try {
+      const token = await auth.currentUser?.getIdToken();
+      if (!token) {
+        throw new Error('No authentication token available');
+      }
+
+      const url = `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.FILLED_FORMS.GET_ONE.replace('{formId}', formId)}`
+        + `?wait=${waitSeconds}&version=${encodeURIComponent(version)}`;
+      const response = await fetch(url, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json'
+        }
+      });
+
+      if (response.status === 404) {
+        return null;
       }
+      if (!response.ok) {
+        const errorText = await response.text();
+        console.error('[FilledFormsService] Wait error response:', errorText);
+        throw new Error(`Failed to fetch form: ${response.status}`);
+      }
+
+      return response.json();
+    } catch (error) {
+      console.error('[FilledFormsService] Wait for form error:', error);
       throw error;
     }
   },
@@ -93,6 +172,24 @@ export const filledFormsService = {
     return response.json();
   },
 
+  async patchFilledForm(formId, changes, remove = [], updatedAt) {
+    const token = await auth.currentUser?.getIdToken();
+    const response = await fetch(
+      `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.FILLED_FORMS.PATCH}`.replace('{formId}', formId),
+      {
+        method: 'PATCH',
+        headers: {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ changes, remove, updatedAt })
+      }
+    );
+    if (response.status === 409) throw new Error('Form was changed elsewhere. Please reload.');
+    if (!response.ok) throw new Error('Failed to patch filled form');
+    return response.json();
+  },
+
   async deleteFilledForm(formId) {
     try {
       const token = await auth.currentUser?.getIdToken();
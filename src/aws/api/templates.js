@@ -5,6 +5,7 @@ export const templateService = {
   async getTemplates() {
     try {
       const token = await auth.currentUser?.getIdToken();
+      // Summaries only; viewTemplate loads a template's fields with getTemplateFields when opened
       const response = await fetch(`${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.TEMPLATES.GET}`, {
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -15,7 +15,10 @@ export const API_CONFIG = {
       FILLED_FORMS: {
         GET: '/forms',
         CREATE: '/forms',
+        BATCH_GET: '/forms:batchGet',
+        GET_ONE: '/forms/{formId}',
         UPDATE: '/forms/{formId}',
+        PATCH: '/forms/{formId}',
         DELETE: '/forms/{formId}'
       }
     }
@@ -16,6 +16,11 @@ const formReducer = (state, action) => {
   switch (action.type) {
     case 'SET_TEMPLATES':
       return { ...state, templates: action.payload };
+    case 'SET_TEMPLATE':
+      return {
+        ...state,
+        templates: state.templates.map(t => t.templateId === action.payload.templateId ? action.payload : t)
+      };
     case 'SET_FILLED_FORMS':
       return { ...state, filledForms: action.payload };
     case 'SET_ERROR':
@@ -65,10 +70,18 @@ export function FormProvider({ children }) {
     }
   }, [clearData]);
 
+  // The list holds template summaries; viewTemplate loads the fields when a template is opened
+  const loadTemplate = useCallback(async (templateId) => {
+    const template = await templateService.getTemplateFields(templateId);
+    dispatch({ type: 'SET_TEMPLATE', payload: template });
+    return template;
+  }, []);
+
   const updateTemplate = async (templateId, updatedTemplate) => {
     try {
       await templateService.updateTemplate(templateId, updatedTemplate);
       await loadData(); // Reload the data after update
+      await loadTemplate(templateId); // loadData only brings back summaries
     } catch (error) {
       console.error('Error updating template:', error);
       throw error;
@@ -81,6 +94,7 @@ export function FormProvider({ children }) {
     error: state.error,
     loading,
     loadData,
+    loadTemplate,
     clearData,
     updateTemplate,
   };
@@ -5,6 +5,7 @@ const FormDataContext = createContext();
 
 export function FormDataProvider({ children }) {
   const [forms, setForms] = useState([]);
+  const [formDetails, setFormDetails] = useState({});
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
 
@@ -21,6 +22,14 @@ export function FormDataProvider({ children }) {
     }
   };
 
+  // The list holds summaries; screens that render a whole form load it here when opened
+  const loadForm = async (formId) => {
+    const { items } = await filledFormsService.getFilledFormsByIds([formId]);
+    const form = items[0] || null;
+    setFormDetails(prevDetails => ({ ...prevDetails, [formId]: form }));
+    return form;
+  };
+
   const saveForm = async (formData) => {
     try {
       setLoading(true);
@@ -44,6 +53,7 @@ export function FormDataProvider({ children }) {
           form.formId === formId ? response : form
         )
       );
+      setFormDetails(prevDetails => ({ ...prevDetails, [formId]: response }));
       return response;
     } catch (err) {
       console.error('Update form error:', err);
@@ -67,9 +77,11 @@ export function FormDataProvider({ children }) {
 
   const value = {
     forms,
+    formDetails,
     loading,
     error,
     getForms,
+    loadForm,
     saveForm,
     updateForm,
     deleteForm,
@@ -26,10 +26,13 @@ interface FilledForm extends FormData {
 
 interface FormDataContextType {
   forms: FilledForm[];
+  formDetails: Record<string, FilledForm | null>;
   loading: boolean;
   error: string | null;
   getForms: () => Promise<void>;
+  loadForm: (formId: string) => Promise<FilledForm | null>;
   saveForm: (formData: FormData) => Promise<FilledForm>;
+  updateForm: (formId: string, formData: FormData) => Promise<FilledForm>;
   clearError: () => void;
   deleteForm: (formId: string) => Promise<void>;
 }
@@ -38,6 +41,7 @@ const FormDataContext = createContext<FormDataContextType | undefined>(undefined
 
 export function FormDataProvider({ children }: { children: ReactNode }) {
   const [forms, setForms] = useState<FilledForm[]>([]);
+  const [formDetails, setFormDetails] = useState<Record<string, FilledForm | null>>({});
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -55,6 +59,14 @@ export function FormDataProvider({ children }: { children: ReactNode }) {
     }
   };
 
+  // The list holds summaries; screens that render a whole form load it here when opened
+  const loadForm = async (formId: string): Promise<FilledForm | null> => {
+    const { items } = await filledFormsService.getFilledFormsByIds([formId]);
+    const form = items[0] || null;
+    setFormDetails(prevDetails => ({ ...prevDetails, [formId]: form }));
+    return form;
+  };
+
   const saveForm = async (formData: FormData): Promise<FilledForm> => {
     try {
       setLoading(true);
@@ -70,6 +82,22 @@ export function FormDataProvider({ children }: { children: ReactNode }) {
     }
   };
 
+  const updateForm = async (formId: string, formData: FormData): Promise<FilledForm> => {
+    try {
+      setLoading(true);
+      const response = await filledFormsService.updateFilledForm(formId, formData);
+      setForms(prevForms => prevForms.map(form => (form.formId === formId ? response : form)));
+      setFormDetails(prevDetails => ({ ...prevDetails, [formId]: response }));
+      return response;
+    } catch (err) {
+      console.error('Error updating form:', err);
+      setError(err instanceof Error ? err.message : 'Failed to update form');
+      throw err;
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const clearError = () => setError(null);
 
   const deleteForm = async (formId: string) => {
@@ -89,10 +117,13 @@ export function FormDataProvider({ children }: { children: ReactNode }) {
   return (
     <FormDataContext.Provider value={{
       forms,
+      formDetails,
       loading,
       error,
       getForms,
+      loadForm,
       saveForm,
+      updateForm,
       clearError,
       deleteForm
     }}>
@@ -0,0 +1,55 @@
+"""Fixtures for the lambda.py tests.
+
+Each test gets a freshly loaded lambda.py against moto tables, with the OpenAI
+client replaced by the benchmarks' FakeLLMClient at zero latency. Tests script
+the completion through llm.fields.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from _support import FakeLLMClient, create_search_index_table, create_tables, load_lambda_module  # noqa: E402
+
+@pytest.fixture
+def llm():
+    return FakeLLMClient(base_ms=0, per_1k_input_chars_ms=0, per_output_field_ms=0)
+
+@pytest.fixture
+def fills(llm):
+    os.environ.update({'AWS_DEFAULT_REGION': 'us-east-1', 'AWS_ACCESS_KEY_ID': 'test', 'AWS_SECRET_ACCESS_KEY': 'test'})
+    from moto import mock_aws
+    with mock_aws():
+        create_tables()
+        create_search_index_table()
+        module = load_lambda_module(
+            SEARCH_INDEX_TABLE='FormSearchIndex', EXTRACTION_CACHE_ENABLED='false', METRICS_ENABLED='false'
+        )
+        module.client = llm
+        # Fail fast instead of backing off between attempts
+        module.LLM_MAX_ATTEMPTS = 1
+        yield module
+
+@pytest.fixture
+def call(fills):
+    """Invoke lambda_handler with an API Gateway v2 event and return (status, decoded body)"""
+    def invoke(method, path, body=None, query=None, user_id='user-1'):
+        event = {
+            'rawPath': path,
+            'requestContext': {'http': {'method': method}, 'authorizer': {'lambda': {'userId': user_id}}},
+        }
+        if body is not None:
+            event['body'] = json.dumps(body)
+        if query is not None:
+            event['queryStringParameters'] = query
+        response = fills.lambda_handler(event, None)
+        return response['statusCode'], json.loads(response['body']) if response.get('body') else None
+    return invoke
+
+def extraction(value, confidence=0.95):
+    """One field of a completion, as the model returns it"""
+    return {'value': value, 'source_quote': str(value), 'confidence': confidence}
@@ -0,0 +1,35 @@
+"""Backend base classes are abstract: a half-implemented backend fails when it is built, not mid-request."""
+import pytest
+
+def test_queue_without_send_cannot_be_built(fills):
+    class ForgetfulQueue(fills.ExtractionQueue):
+        pass
+
+    with pytest.raises(TypeError, match='send'):
+        ForgetfulQueue()
+
+def test_cache_without_set_cannot_be_built(fills):
+    class ReadOnlyCache(fills.ExtractionCache):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match='set'):
+        ReadOnlyCache()
+
+def test_blob_store_without_delete_cannot_be_built(fills):
+    class AppendOnlyStore(fills.BlobStore):
+        def put(self, key, body):
+            pass
+
+        def get(self, key):
+            return b''
+
+    with pytest.raises(TypeError, match='delete'):
+        AppendOnlyStore()
+
+def test_export_writer_without_write_cannot_be_built(fills):
+    class HeaderOnlyWriter(fills.ExportWriter):
+        extension = 'txt'
+
+    with pytest.raises(TypeError, match='write'):
+        HeaderOnlyWriter([])
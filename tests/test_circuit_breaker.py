@@ -0,0 +1,93 @@
+"""The LLM circuit breaker opens on failures and recovers through a single trial call."""
+import pytest
+
+from conftest import extraction
+
+COOLDOWN = 30
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(fills, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fills.time, 'monotonic', clock)
+    return clock
+
+@pytest.fixture
+def breaker(fills, clock, monkeypatch):
+    breaker = fills.CircuitBreaker(window_seconds=60, min_calls=4, error_rate=0.5, cooldown_seconds=COOLDOWN)
+    monkeypatch.setattr(fills, 'llm_breaker', breaker)
+    return breaker
+
+def trip(breaker):
+    for success in (True, True, False, False):
+        assert breaker.allow()
+        breaker.record(success)
+
+def test_opens_at_the_error_rate(breaker):
+    for success in (True, True, False):
+        breaker.record(success)
+    assert breaker.allow()
+
+    breaker.record(False)
+
+    assert not breaker.allow()
+
+def test_failures_outside_the_window_do_not_count(breaker, clock):
+    breaker.record(False)
+    breaker.record(False)
+    clock.now += 61
+    breaker.record(True)
+    breaker.record(True)
+
+    assert breaker.allow()
+
+def test_half_open_trial_success_closes(breaker, clock):
+    trip(breaker)
+    clock.now += COOLDOWN
+
+    assert breaker.allow()
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record(True)
+
+    assert breaker.allow()
+    assert breaker.allow()
+
+def test_half_open_trial_failure_reopens(breaker, clock):
+    trip(breaker)
+    clock.now += COOLDOWN
+    assert breaker.allow()
+
+    breaker.record(False)
+
+    assert not breaker.allow()
+    clock.now += COOLDOWN
+    assert breaker.allow()
+
+def test_released_trial_lets_the_next_call_try(breaker, clock):
+    trip(breaker)
+    clock.now += COOLDOWN
+    assert breaker.allow()
+
+    breaker.release()
+
+    assert breaker.allow()
+
+def test_call_out_of_time_does_not_take_the_trial(fills, llm, breaker, clock, monkeypatch):
+    llm.fields = {'s.f': extraction('x')}
+    trip(breaker)
+    clock.now += COOLDOWN
+    monkeypatch.setattr(fills, 'invocation_deadline', clock.now)
+
+    with pytest.raises(fills.LLMUnavailableError, match='No time left'):
+        fills.call_llm(model='m', messages=[{'role': 'user', 'content': 'Conversation:\nhi'}])
+
+    monkeypatch.setattr(fills, 'invocation_deadline', None)
+    fills.call_llm(model='m', messages=[{'role': 'user', 'content': 'Conversation:\nhi'}])
+    assert breaker.opened_at is None
@@ -0,0 +1,63 @@
+"""export_filled_forms reads a user's forms through whichever userIdIndex the table has."""
+import json
+
+import boto3
+import pytest
+
+def create_form(call, template_code, name, user_id='user-1'):
+    status, form = call('POST', '/forms', {'templateCode': template_code, 'data': {'name': name}}, user_id=user_id)
+    assert status == 200
+    return form
+
+def set_created_at(fills, form, created_at):
+    fills.filled_forms_table.update_item(
+        Key={'formId': form['formId'], 'userId': form['userId']},
+        UpdateExpression='SET createdAt = :createdAt',
+        ExpressionAttributeValues={':createdAt': created_at}
+    )
+
+def export(fills, tmp_path, **kwargs):
+    store = fills.LocalBlobStore(str(tmp_path))
+    result = fills.export_filled_forms('user-1', 'ndjson', 'export.ndjson', store=store, segments=4, **kwargs)
+    lines = store.get('export.ndjson').decode('utf-8').splitlines()
+    assert result['count'] == len(lines)
+    return sorted(json.loads(line)['data']['name'] for line in lines)
+
+def recreate_table_without_created_at_range_key():
+    """FilledForms as deployed before userIdIndex had a range key"""
+    client = boto3.client('dynamodb')
+    client.delete_table(TableName='FilledForms')
+    client.create_table(
+        TableName='FilledForms',
+        KeySchema=[{'AttributeName': 'formId', 'KeyType': 'HASH'}, {'AttributeName': 'userId', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': name, 'AttributeType': 'S'} for name in ('formId', 'userId')],
+        GlobalSecondaryIndexes=[{
+            'IndexName': 'userIdIndex',
+            'KeySchema': [{'AttributeName': 'userId', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'}
+        }],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+@pytest.fixture(params=['createdAt range key', 'no range key'])
+def table(request, fills):
+    if request.param == 'no range key':
+        recreate_table_without_created_at_range_key()
+    return request.param
+
+def test_exports_every_form_of_the_user(fills, call, table, tmp_path):
+    for index, name in enumerate(('Ana', 'Ben', 'Cy')):
+        set_created_at(fills, create_form(call, 'general', name), 1_700_000_000 + index * 3600)
+    create_form(call, 'general', 'Someone else', user_id='user-2')
+
+    assert export(fills, tmp_path) == ['Ana', 'Ben', 'Cy']
+    assert export(fills, tmp_path, created_after=1_700_000_000 + 3600) == ['Ben', 'Cy']
+
+def test_reads_once_without_a_created_at_range_key(fills, call, tmp_path):
+    recreate_table_without_created_at_range_key()
+    create_form(call, 'general', 'Ana')
+
+    reads = fills.export_read_requests('user-1', segments=4)
+
+    assert [operation for operation, _ in reads] == ['query']
+    assert reads[0][1]['KeyConditionExpression'] == '#userId = :uid'
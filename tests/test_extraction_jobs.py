@@ -0,0 +1,116 @@
+"""Queued extraction jobs: transient failures are redelivered, the last attempt marks the form failed."""
+import pytest
+
+from conftest import extraction
+
+TEMPLATE_FIELDS = {'vitals': {'weight': {'type': 'number', 'label': 'Weight'}}}
+
+class RateLimited(Exception):
+    status_code = 429
+
+def rate_limited(request):
+    raise RateLimited("Rate limit reached")
+
+def queue_extraction(fills):
+    fills.extraction_queue = fills.LocalExtractionQueue()
+    form = fills.create_filled_form(
+        'user-1', {'templateCode': 'general', 'templateFields': TEMPLATE_FIELDS}, 'Weight is 70 kilos',
+        async_extraction=True
+    )
+    assert form['status'] == fills.FORM_STATUS_EXTRACTING
+    return form, fills.extraction_queue.jobs.pop()
+
+def sqs_event(job, fills, receive_count):
+    return {'Records': [{
+        'messageId': 'message-1',
+        'eventSource': 'aws:sqs',
+        'body': fills.encode_stored_json(job),
+        'attributes': {'ApproximateReceiveCount': str(receive_count)},
+    }]}
+
+def test_transient_failure_leaves_form_extracting_for_redelivery(fills, llm):
+    form, job = queue_extraction(fills)
+    llm.fields = rate_limited
+
+    result = fills.handle_extraction_records(sqs_event(job, fills, receive_count=1))
+
+    assert result == {'batchItemFailures': [{'itemIdentifier': 'message-1'}]}
+    assert fills.get_filled_form(form['formId'], 'user-1')['status'] == fills.FORM_STATUS_EXTRACTING
+
+    llm.fields = {'vitals.weight': extraction(70)}
+    assert fills.handle_extraction_records(sqs_event(job, fills, receive_count=2)) == {'batchItemFailures': []}
+    stored = fills.get_filled_form(form['formId'], 'user-1')
+    assert stored['status'] == fills.FORM_STATUS_READY
+    assert stored['data'] == {'vitals': {'weight': 70}}
+
+def test_final_attempt_marks_form_failed(fills, llm):
+    form, job = queue_extraction(fills)
+    llm.fields = rate_limited
+
+    result = fills.handle_extraction_records(sqs_event(job, fills, receive_count=fills.EXTRACTION_MAX_RECEIVES))
+
+    assert result == {'batchItemFailures': []}
+    stored = fills.get_filled_form(form['formId'], 'user-1')
+    assert stored['status'] == fills.FORM_STATUS_FAILED
+    assert 'Rate limit reached' in stored['extractionError']
+
+@pytest.mark.parametrize('receive_count', [1, 3])
+def test_non_retryable_failure_marks_form_failed_at_once(fills, llm, receive_count):
+    form, job = queue_extraction(fills)
+
+    def bad_request(request):
+        raise ValueError("Invalid request to the model")
+    llm.fields = bad_request
+
+    assert fills.handle_extraction_records(sqs_event(job, fills, receive_count)) == {'batchItemFailures': []}
+    assert fills.get_filled_form(form['formId'], 'user-1')['status'] == fills.FORM_STATUS_FAILED
+
+PROGRESS_FIELDS = {'vitals': {
+    'weight': {'type': 'number', 'label': 'Weight'},
+    'height': {'type': 'number', 'label': 'Height'},
+}}
+
+def test_fields_are_written_as_progress_while_extracting(fills, llm, monkeypatch):
+    monkeypatch.setattr(fills, 'EXTRACTION_PROGRESS_INTERVAL_SECONDS', 0)
+    fills.extraction_queue = fills.LocalExtractionQueue()
+    form = fills.create_filled_form(
+        'user-1', {'templateCode': 'general', 'templateFields': PROGRESS_FIELDS, 'data': {'notes': 'typed'}},
+        'Weight is 70 kilos, height 170', async_extraction=True
+    )
+    llm.fields = {'vitals.weight': extraction(70), 'vitals.height': extraction(170)}
+    seen = []
+    write = fills.write_extraction_progress
+
+    def recording(form_id, user_id, progress):
+        written = write(form_id, user_id, progress)
+        seen.append(fills.get_filled_form(form_id, user_id))
+        return written
+    monkeypatch.setattr(fills, 'write_extraction_progress', recording)
+
+    fills.extraction_queue.drain()
+
+    assert [stored['extractionProgress'] for stored in seen] == [
+        {'vitals': {'weight': 70}}, {'vitals': {'weight': 70, 'height': 170}}
+    ]
+    assert all(stored['status'] == fills.FORM_STATUS_EXTRACTING for stored in seen)
+    assert all(stored['data'] == {'notes': 'typed'} for stored in seen)
+    stored = fills.get_filled_form(form['formId'], 'user-1')
+    assert stored['status'] == fills.FORM_STATUS_READY
+    assert stored['data'] == {'notes': 'typed', 'vitals': {'weight': 70, 'height': 170}}
+    assert 'extractionProgress' not in stored
+
+def test_long_poll_returns_on_new_progress(fills, call):
+    form, _ = queue_extraction(fills)
+    path = f"/forms/{form['formId']}"
+
+    status, unchanged = call('GET', path, query={'wait': '0.2', 'version': str(form['version'])})
+    assert status == 200
+    assert 'extractionProgress' not in unchanged
+
+    fills.write_extraction_progress(form['formId'], 'user-1', {'vitals': {'weight': 70}})
+    status, progressed = call('GET', path, query={'wait': '5', 'version': str(form['version'])})
+
+    assert status == 200
+    assert progressed['status'] == fills.FORM_STATUS_EXTRACTING
+    assert progressed['extractionProgress'] == {'vitals': {'weight': '70'}}
+    assert int(progressed['version']) > form['version']
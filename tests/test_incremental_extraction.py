@@ -0,0 +1,44 @@
+"""Incremental re-extraction re-asks uncertain fields, but never overwrites the clinician's edits."""
+from conftest import extraction
+
+TEMPLATE_FIELDS = [{'id': 'vitals', 'type': 'section', 'fields': [
+    {'id': 'weight', 'label': 'Weight', 'type': 'number'},
+    {'id': 'height', 'label': 'Height', 'type': 'number'},
+]}]
+FIRST_SEGMENT = 'Doctor: How much do you weigh? Patient: About 70 kilos, I think.'
+SECOND_SEGMENT = ' Nurse: The scale says 71. Patient: I am 180 tall.'
+
+def extract(call, form_id, conversation_text):
+    return call('POST', f"/forms/{form_id}/extract", {
+        'templateFields': TEMPLATE_FIELDS, 'conversationText': conversation_text
+    })
+
+def create_form_with_uncertain_weight(call, llm):
+    status, form = call('POST', '/forms', {'templateCode': 'vitals', 'data': {}})
+    assert status == 200
+    llm.fields = {'vitals.weight': extraction(70, confidence=0.85)}
+    status, form = extract(call, form['formId'], FIRST_SEGMENT)
+    assert status == 200
+    assert form['data'] == {'vitals': {'weight': '70'}}
+    return form
+
+def test_uncertain_field_is_asked_for_again(call, llm):
+    form = create_form_with_uncertain_weight(call, llm)
+
+    llm.fields = {'vitals.weight': extraction(71), 'vitals.height': extraction(180)}
+    status, form = extract(call, form['formId'], FIRST_SEGMENT + SECOND_SEGMENT)
+
+    assert status == 200
+    assert form['data'] == {'vitals': {'weight': '71', 'height': '180'}}
+
+def test_clinician_correction_is_kept(call, llm):
+    form = create_form_with_uncertain_weight(call, llm)
+    status, _ = call('PUT', f"/forms/{form['formId']}", {'data': {'vitals': {'weight': 68}}})
+    assert status == 200
+
+    # The model still hears 71; the edited weight must not be asked for or overwritten
+    llm.fields = {'vitals.weight': extraction(71), 'vitals.height': extraction(180)}
+    status, form = extract(call, form['formId'], FIRST_SEGMENT + SECOND_SEGMENT)
+
+    assert status == 200
+    assert form['data'] == {'vitals': {'weight': '68', 'height': '180'}}
@@ -0,0 +1,68 @@
+"""List and batchGet projections can ask for nested data paths instead of whole forms."""
+LIST_FIELDS = 'templateCode,createdAt,data.patientInfo.fullName'
+DATA = {
+    'patientInfo': {'fullName': 'Ana Novak', 'age': 41},
+    'assessment': 'Intermittent headaches for two weeks. ' * 20,
+}
+
+def create_form(call):
+    status, form = call('POST', '/forms', {'templateCode': 'general', 'data': DATA})
+    assert status == 200
+    return form
+
+def test_list_returns_only_requested_data_paths(call):
+    form = create_form(call)
+
+    status, page = call('GET', '/forms', query={'fields': LIST_FIELDS})
+
+    assert status == 200
+    assert page['items'] == [{
+        'formId': form['formId'],
+        'userId': 'user-1',
+        'templateCode': 'general',
+        'createdAt': str(form['createdAt']),
+        'data': {'patientInfo': {'fullName': 'Ana Novak'}},
+    }]
+
+def test_offloaded_data_is_cut_to_requested_paths(fills, call, monkeypatch, tmp_path):
+    monkeypatch.setattr(fills, 'form_blob_store', fills.LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(fills, 'FORM_INLINE_MAX_BYTES', 64)
+    form = create_form(call)
+
+    status, page = call('GET', '/forms', query={'fields': LIST_FIELDS})
+    assert status == 200
+    assert page['items'][0]['data'] == {'patientInfo': {'fullName': 'Ana Novak'}}
+
+    status, result = call('POST', '/forms:batchGet', {'ids': [form['formId']], 'fields': ['data']})
+    assert status == 200
+    assert result['items'][0]['data']['assessment'] == DATA['assessment']
+
+def test_overlapping_paths_collapse_to_the_outer_one(call):
+    create_form(call)
+
+    status, page = call('GET', '/forms', query={'fields': 'data,data.patientInfo.fullName'})
+
+    assert status == 200
+    assert page['items'][0]['data']['assessment'] == DATA['assessment']
+
+def test_invalid_paths_are_rejected(call):
+    for fields in ('data..patientInfo', 'data.', 'data.patient-info'):
+        status, _ = call('GET', '/forms', query={'fields': fields})
+        assert status == 400
+
+def test_invalid_batch_get_fields_are_rejected(call):
+    form = create_form(call)
+
+    for path in ('/forms:batchGet', '/templates:batchGet'):
+        for fields in ([''], ['data..patientInfo'], ['data.patient-info'], 'data', [f"field{n}" for n in range(21)]):
+            status, _ = call('POST', path, {'ids': [form['formId']], 'fields': fields})
+            assert status == 400, (path, fields)
+
+def test_batch_get_fields_cap_ignores_the_blob_pointer(call):
+    form = create_form(call)
+    fields = ['data', *(f"field{n}" for n in range(19))]
+
+    status, result = call('POST', '/forms:batchGet', {'ids': [form['formId']], 'fields': fields})
+
+    assert status == 200
+    assert result['items'][0]['data']['assessment'] == DATA['assessment']
@@ -0,0 +1,60 @@
+"""The local extraction rules only answer fields they can read unambiguously."""
+from conftest import extraction
+
+TEMPLATE_FIELDS = [{'id': 'vitals', 'type': 'section', 'fields': [
+    {'id': 'children', 'label': 'Number of children', 'type': 'number'},
+    {'id': 'heartRate', 'label': 'Heart Rate', 'type': 'number'},
+]}]
+TRAP = "Heart rate 72 at rest. Number of children? None, but she has 3 dogs. Take it every 8 hr 30 minutes."
+
+def extract_locally(fills, template_fields, conversation_text):
+    compiled = fills.CompiledTemplate(template_fields, 'test')
+    extracted, unanswered = fills.LocalExtractionBackend().extract_locally(compiled, conversation_text)
+    return {field_id: field.value for field_id, field in extracted.items()}, unanswered
+
+def vitals(*fields):
+    return [{'id': 'vitals', 'type': 'section', 'fields': list(fields)}]
+
+def test_label_match_beats_later_abbreviation_and_loose_numbers(fills):
+    extracted, unanswered = extract_locally(fills, TEMPLATE_FIELDS, TRAP)
+
+    assert extracted == {'vitals.heartRate': 72}
+    assert unanswered == ['vitals.children']
+
+def test_routed_backend_asks_the_llm_for_unreadable_fields(fills, llm):
+    requests = []
+
+    def answer(request):
+        requests.append(request['messages'][-1]['content'])
+        return {'vitals.children': extraction(0)}
+    llm.fields = answer
+
+    data = fills.RoutedExtractionBackend().extract(fills.CompiledTemplate(TEMPLATE_FIELDS, 'test'), TRAP)
+
+    assert {field_id: field.value for field_id, field in data.items()} == {
+        'vitals.children': 0, 'vitals.heartRate': 72
+    }
+    assert len(requests) == 1
+    assert '(ID: vitals.children,' in requests[0] and '(ID: vitals.heartRate,' not in requests[0]
+
+def test_abbreviations_need_a_value_right_after_them(fills):
+    template = vitals({'id': 'heartRate', 'label': 'Heart Rate', 'type': 'number'})
+
+    assert extract_locally(fills, template, 'HR: 88, settled.')[0] == {'vitals.heartRate': 88}
+    assert extract_locally(fills, template, 'Dose every 8 hr 30 minutes.')[0] == {}
+    assert extract_locally(fills, template, 'HR seems fine, 88 earlier.')[0] == {}
+
+def test_generic_numbers_must_follow_the_label(fills):
+    template = vitals({'id': 'children', 'label': 'Number of children', 'type': 'number'})
+
+    assert extract_locally(fills, template, 'Number of children: 2.')[0] == {'vitals.children': 2}
+    assert extract_locally(fills, template, 'Number of children 2')[0] == {'vitals.children': 2}
+    assert extract_locally(fills, template, 'Number of children unknown, 4 siblings.')[0] == {}
+
+def test_loose_vital_is_left_for_the_llm(fills):
+    template = vitals({'id': 'bloodPressure', 'label': 'Blood Pressure', 'type': 'text'})
+
+    extracted, unanswered = extract_locally(fills, template, 'Blood pressure looked better today, 128/82.')
+    assert extracted == {}
+    assert unanswered == ['vitals.bloodPressure']
+    assert extract_locally(fills, template, 'Blood pressure 128/82.')[0] == {'vitals.bloodPressure': '128/82'}
@@ -0,0 +1,53 @@
+"""PATCH /forms/{formId} applies field changes and rejects stale writes."""
+import pytest
+
+DATA = {'patient': {'name': 'Jones'}, 'diagnosis': 'flu'}
+
+def create_form(call):
+    status, form = call('POST', '/forms', {'templateCode': 'intake', 'data': DATA})
+    assert status == 200
+    return form
+
+def read_form(call, form_id):
+    status, form = call('GET', f"/forms/{form_id}")
+    assert status == 200
+    return form
+
+@pytest.mark.parametrize('precondition', ['updatedAt', 'version'])
+def test_patch_with_what_get_returned(call, precondition):
+    form = read_form(call, create_form(call)['formId'])
+
+    status, patched = call('PATCH', f"/forms/{form['formId']}", {
+        'changes': {'diagnosis': 'cold'}, precondition: form[precondition]
+    })
+
+    assert status == 200
+    assert patched['data'] == {'patient': {'name': 'Jones'}, 'diagnosis': 'cold'}
+    assert read_form(call, form['formId'])['version'] == '2'
+
+def test_second_patch_from_same_read_conflicts(call):
+    form = read_form(call, create_form(call)['formId'])
+    patch = {'changes': {'diagnosis': 'cold'}, 'version': form['version']}
+
+    assert call('PATCH', f"/forms/{form['formId']}", patch)[0] == 200
+    # Within the same second updatedAt alone could not tell the saves apart
+    assert call('PATCH', f"/forms/{form['formId']}", patch)[0] == 409
+
+def test_stale_patch_of_offloaded_form_conflicts(fills, call, monkeypatch, tmp_path):
+    monkeypatch.setattr(fills, 'form_blob_store', fills.LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(fills, 'FORM_INLINE_MAX_BYTES', 16)
+    form = read_form(call, create_form(call)['formId'])
+    patch = {'changes': {'diagnosis': 'cold'}, 'version': form['version'], 'updatedAt': form['updatedAt']}
+
+    status, patched = call('PATCH', f"/forms/{form['formId']}", patch)
+    assert status == 200
+    assert patched['data']['diagnosis'] == 'cold'
+    assert call('PATCH', f"/forms/{form['formId']}", patch)[0] == 409
+
+@pytest.mark.parametrize('updated_at', ['yesterday', '12.5', True, -1])
+def test_non_numeric_precondition_is_rejected(call, updated_at):
+    form = create_form(call)
+
+    status, _ = call('PATCH', f"/forms/{form['formId']}", {'changes': {'diagnosis': 'cold'}, 'updatedAt': updated_at})
+
+    assert status == 400
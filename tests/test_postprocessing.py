@@ -0,0 +1,34 @@
+"""Coercing extracted values to the template: malformed template data drops values, never fails the extraction."""
+import pytest
+
+from conftest import extraction
+
+def scale_template(**bounds):
+    return [{'id': 's', 'type': 'section', 'fields': [
+        {'id': 'pain', 'label': 'Pain', 'type': 'scale', **bounds},
+        {'id': 'note', 'label': 'Note', 'type': 'text'},
+    ]}]
+
+@pytest.mark.parametrize('bounds, pain, expected', [
+    ({'scaleStart': '0', 'scaleEnd': '10'}, 7, {'pain': 7, 'note': 'ok'}),
+    ({'scaleStart': '0', 'scaleEnd': '10'}, 12, {'note': 'ok'}),
+    ({'scaleEnd': 10}, 7, {'pain': 7, 'note': 'ok'}),
+    ({'scaleEnd': 10}, 11, {'note': 'ok'}),
+    ({'scaleStart': 1}, 0, {'note': 'ok'}),
+    ({'scaleStart': 'low', 'scaleEnd': None}, 7, {'pain': 7, 'note': 'ok'}),
+    ({}, 7, {'pain': 7, 'note': 'ok'}),
+])
+def test_scale_bounds_are_normalized(fills, llm, bounds, pain, expected):
+    llm.fields = {'s.pain': extraction(pain), 's.note': extraction('ok')}
+
+    data = fills.extract_form_data(scale_template(**bounds), 'Pain is a seven')
+
+    assert data == {'s': expected}
+
+def test_invalid_min_confidence_falls_back_to_the_default(fills, llm):
+    template = [{'id': 's', 'type': 'section', 'fields': [
+        {'id': 'note', 'label': 'Note', 'type': 'text', 'minConfidence': 'high'},
+    ]}]
+    llm.fields = {'s.note': extraction('ok')}
+
+    assert fills.extract_form_data(template, 'Note: ok') == {'s': {'note': 'ok'}}
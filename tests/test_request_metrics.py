@@ -0,0 +1,43 @@
+"""Per-request metrics: AWS call timing and the route dimension."""
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import EndpointConnectionError
+
+def test_failed_aws_calls_are_timed_and_keep_their_error(fills):
+    dynamodb = fills.instrument_aws_client(
+        boto3.client('dynamodb', config=Config(retries={'total_max_attempts': 1}))
+    )
+
+    def refuse(request, **kwargs):
+        raise EndpointConnectionError(endpoint_url=request.url)
+    dynamodb.meta.events.register('before-send', refuse)
+    fills.request_metrics.start('test')
+
+    with pytest.raises(EndpointConnectionError):
+        dynamodb.list_tables()
+
+    assert fills.request_metrics.values['DynamoDBCalls'] == 1
+    assert 'DynamoDBMs' in fills.request_metrics.values
+
+def test_successful_aws_calls_are_timed(fills):
+    fills.request_metrics.start('test')
+
+    fills.dynamodb_client.list_tables()
+
+    assert fills.request_metrics.values['DynamoDBCalls'] == 1
+
+def test_route_is_matched_once_per_request(fills, call, monkeypatch):
+    matches = []
+    match = fills.router.match
+
+    def counted(method, path):
+        matches.append((method, path))
+        return match(method, path)
+    monkeypatch.setattr(fills.router, 'match', counted)
+
+    status, _ = call('GET', '/forms')
+
+    assert status == 200
+    assert matches == [('GET', '/forms')]
+    assert fills.request_metrics.route == 'GET /forms'
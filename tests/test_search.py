@@ -0,0 +1,49 @@
+"""GET /forms/search stays correct as forms are edited."""
+def search(call, query, **params):
+    status, page = call('GET', '/forms/search', query={'q': query, **params})
+    assert status == 200
+    return [hit['formId'] for hit in page['items']]
+
+def test_edits_keep_every_posting_current(call):
+    status, form = call('POST', '/forms', {'templateCode': 'intake', 'data': {'patient': {'name': 'Jones'}}})
+    assert status == 200
+    status, _ = call('PUT', f"/forms/{form['formId']}", {
+        'data': {'patient': {'name': 'John Jones'}, 'diagnosis': 'flu'}
+    })
+    assert status == 200
+
+    assert search(call, 'jo') == [form['formId']]
+    assert search(call, 'jones flu') == [form['formId']]
+    assert search(call, 'intake flu') == [form['formId']]
+
+    call('PATCH', f"/forms/{form['formId']}", {'changes': {'diagnosis': 'cold'}})
+    assert search(call, 'jones flu') == []
+    assert search(call, 'jones cold') == [form['formId']]
+
+def test_decimal_values_can_be_found(call):
+    status, form = call('POST', '/forms', {'templateCode': 'vitals', 'data': {'temperature': 98.6, 'pulse': 72}})
+    assert status == 200
+
+    assert search(call, '98.6') == [form['formId']]
+    assert search(call, '98') == [form['formId']]
+    assert search(call, '72') == [form['formId']]
+    assert search(call, '98.7') == []
+
+def test_delete_removes_form_from_results(call):
+    status, form = call('POST', '/forms', {'templateCode': 'intake', 'data': {'patient': {'name': 'Novak'}}})
+    call('DELETE', f"/forms/{form['formId']}")
+
+    assert search(call, 'novak') == []
+
+def test_rebuild_repairs_stale_postings(fills, call):
+    status, form = call('POST', '/forms', {'templateCode': 'intake', 'data': {'patient': {'name': 'Jones'}}})
+    posting_key = {'userId': 'user-1', 'termKey': fills.search_term_key('intake', form['createdAt'], form['formId'])}
+    fills.search_index_table.update_item(
+        Key=posting_key, UpdateExpression='SET #terms = :stale',
+        ExpressionAttributeNames={'#terms': 'terms'}, ExpressionAttributeValues={':stale': ' intake'}
+    )
+    assert search(call, 'jones intake') == []
+
+    fills.index_form(fills.get_filled_form(form['formId'], 'user-1'), rebuild=True)
+
+    assert search(call, 'jones intake') == [form['formId']]
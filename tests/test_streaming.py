@@ -0,0 +1,50 @@
+"""Streaming extraction splits the work into calls the way the non-streaming path does."""
+from conftest import extraction
+
+FIELD_IDS = [f"f{index}" for index in range(6)]
+TEMPLATE_FIELDS = [{'id': 's', 'type': 'section', 'fields': [
+    {'id': field_id, 'label': f"Field {field_id}", 'type': 'text'} for field_id in FIELD_IDS
+]}]
+ALL_FIELDS = {'s': {field_id: field_id for field_id in FIELD_IDS}}
+
+def prompt_text(request):
+    return request['messages'][-1]['content']
+
+def transcript(request):
+    return prompt_text(request).split('Conversation:\n', 1)[1].split('\n\nFormat the response as JSON', 1)[0]
+
+def answer_requested_fields(request):
+    """Answer each field the prompt lists, as the model would"""
+    return {f"s.{field_id}": extraction(field_id) for field_id in FIELD_IDS if f"(ID: s.{field_id}," in prompt_text(request)}
+
+def recording(requests):
+    def answer(request):
+        requests.append(request)
+        return answer_requested_fields(request)
+    return answer
+
+def test_large_templates_stream_in_shards(fills, llm, monkeypatch):
+    monkeypatch.setattr(fills, 'EXTRACTION_MAX_FIELDS_PER_CALL', 2)
+    requests = []
+    llm.fields = recording(requests)
+
+    events = list(fills.stream_form_data(TEMPLATE_FIELDS, 'Short visit'))
+
+    assert len(requests) == 3
+    assert all(request.get('stream') for request in requests)
+    assert all(len(answer_requested_fields(request)) == 2 for request in requests)
+    assert sorted(event['fieldId'] for event in events if event['event'] == 'field') == [f"s.{f}" for f in FIELD_IDS]
+    assert events[-1]['data'] == ALL_FIELDS
+
+def test_long_transcripts_are_chunked(fills, llm, monkeypatch):
+    monkeypatch.setattr(fills, 'EXTRACTION_CHUNK_CHARS', 200)
+    monkeypatch.setattr(fills, 'EXTRACTION_CHUNK_OVERLAP_CHARS', 20)
+    conversation_text = '\n'.join(f"Line {index}: the patient describes symptoms." for index in range(40))
+    requests = []
+    llm.fields = recording(requests)
+
+    events = list(fills.stream_form_data(TEMPLATE_FIELDS, conversation_text))
+
+    assert len(requests) > 1
+    assert all(len(transcript(request)) <= 200 for request in requests)
+    assert events[-1]['data'] == ALL_FIELDS
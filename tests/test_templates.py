@@ -0,0 +1,45 @@
+"""Stored templates: extraction always uses the template's current fields."""
+from conftest import extraction
+
+def section(*field_ids):
+    return [{'id': 's', 'type': 'section', 'fields': [
+        {'id': field_id, 'label': field_id.title(), 'type': 'number'} for field_id in field_ids
+    ]}]
+
+def test_update_within_the_same_second_gets_a_new_version(fills, call, llm, monkeypatch):
+    monkeypatch.setattr(fills.time, 'time', lambda: 1_800_000_000)
+    fills.extraction_cache = fills.MemoryExtractionCache(max_entries=16, ttl_seconds=60)
+    status, template = call('POST', '/templates', {'name': 'Vitals', 'fields': section('weight')})
+    assert status == 200
+    llm.fields = {'s.weight': extraction(70)}
+    status, form = call('POST', '/forms', {
+        'templateCode': 'vitals', 'templateId': template['templateId'], 'conversationText': 'Weight 70, height 180'
+    })
+    assert form['data'] == {'s': {'weight': '70'}}
+
+    status, _ = call('PUT', f"/templates/{template['templateId']}", {'name': 'Vitals', 'fields': section('weight', 'height')})
+    assert status == 200
+    llm.fields = {'s.weight': extraction(70), 's.height': extraction(180)}
+    status, form = call('POST', '/forms', {
+        'templateCode': 'vitals', 'templateId': template['templateId'], 'conversationText': 'Weight 70, height 180'
+    })
+    assert form['data'] == {'s': {'weight': '70', 'height': '180'}}
+
+def test_get_shows_an_edit_made_by_another_container(fills, call):
+    status, template = call('POST', '/templates', {'name': 'Vitals', 'fields': section('weight')})
+    assert status == 200
+    assert call('GET', f"/templates/{template['templateId']}")[1]['name'] == 'Vitals'
+
+    # Another container's write never touches this container's cache
+    fills.form_templates_table.update_item(
+        Key={'templateId': template['templateId'], 'userId': 'user-1'},
+        UpdateExpression='SET #name = :name, updatedAt = :updatedAt',
+        ExpressionAttributeNames={'#name': 'name'},
+        ExpressionAttributeValues={':name': 'Vital signs', ':updatedAt': template['updatedAt'] + 1}
+    )
+
+    status, current = call('GET', f"/templates/{template['templateId']}")
+    assert status == 200
+    assert current['name'] == 'Vital signs'
+    # The extraction path now sees the newer version too
+    assert fills.template_cache.get('user-1', template['templateId'])['name'] == 'Vital signs'